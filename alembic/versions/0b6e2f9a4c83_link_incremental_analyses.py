@@ -0,0 +1,42 @@
+"""add previous analysis to analyses and boundary to trained models
+
+Revision ID: 0b6e2f9a4c83
+Revises: e4a90c7b5d16
+Create Date: 2026-10-19 17:02:41.513907
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0b6e2f9a4c83"
+down_revision: Union[str, Sequence[str], None] = "e4a90c7b5d16"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("analyses", sa.Column("previous_analysis_id", sa.Integer(), nullable=True), schema="timeseries")
+    op.create_foreign_key(
+        "analyses_previous_analysis_id_fkey",
+        "analyses",
+        "analyses",
+        ["previous_analysis_id"],
+        ["id"],
+        source_schema="timeseries",
+        referent_schema="timeseries",
+        ondelete="SET NULL",
+    )
+    op.add_column("trained_models", sa.Column("boundary", sa.JSON(), nullable=True), schema="timeseries")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("trained_models", "boundary", schema="timeseries")
+    op.drop_constraint("analyses_previous_analysis_id_fkey", "analyses", schema="timeseries", type_="foreignkey")
+    op.drop_column("analyses", "previous_analysis_id", schema="timeseries")
@@ -0,0 +1,38 @@
+"""add job queue columns to analyses table
+
+Revision ID: 5d2c8e41a7b9
+Revises: ce068111380e
+Create Date: 2026-10-19 10:02:11.482913
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2c8e41a7b9"
+down_revision: Union[str, Sequence[str], None] = "ce068111380e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("analyses", sa.Column("config", sa.JSON(), nullable=True), schema="timeseries")
+    op.add_column(
+        "analyses", sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"), schema="timeseries"
+    )
+    op.add_column("analyses", sa.Column("heartbeat_at", sa.DateTime(), nullable=True), schema="timeseries")
+    # Workers poll for the oldest pending analyses.
+    op.create_index("ix_timeseries_analyses_status_id", "analyses", ["status", "id"], unique=False, schema="timeseries")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_timeseries_analyses_status_id", table_name="analyses", schema="timeseries")
+    op.drop_column("analyses", "heartbeat_at", schema="timeseries")
+    op.drop_column("analyses", "attempts", schema="timeseries")
+    op.drop_column("analyses", "config", schema="timeseries")
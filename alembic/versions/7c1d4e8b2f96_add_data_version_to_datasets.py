@@ -0,0 +1,33 @@
+"""add data version to datasets
+
+Revision ID: 7c1d4e8b2f96
+Revises: 0b6e2f9a4c83
+Create Date: 2026-10-19 18:24:07.331582
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1d4e8b2f96"
+down_revision: Union[str, Sequence[str], None] = "0b6e2f9a4c83"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "datasets",
+        sa.Column("data_version", sa.Integer(), nullable=False, server_default="0"),
+        schema="timeseries",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("datasets", "data_version", schema="timeseries")
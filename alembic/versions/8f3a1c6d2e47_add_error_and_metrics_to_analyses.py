@@ -0,0 +1,31 @@
+"""add error and metrics columns to analyses table
+
+Revision ID: 8f3a1c6d2e47
+Revises: 5d2c8e41a7b9
+Create Date: 2026-10-19 11:24:37.190254
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8f3a1c6d2e47"
+down_revision: Union[str, Sequence[str], None] = "5d2c8e41a7b9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("analyses", sa.Column("error", sa.String(), nullable=True), schema="timeseries")
+    op.add_column("analyses", sa.Column("metrics", sa.JSON(), nullable=True), schema="timeseries")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("analyses", "metrics", schema="timeseries")
+    op.drop_column("analyses", "error", schema="timeseries")
@@ -0,0 +1,53 @@
+"""add trained models table
+
+Revision ID: b71e9d3f0c25
+Revises: 8f3a1c6d2e47
+Create Date: 2026-10-19 14:08:52.631907
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b71e9d3f0c25"
+down_revision: Union[str, Sequence[str], None] = "8f3a1c6d2e47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "trained_models",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("dataset_id", sa.Integer(), nullable=False),
+        sa.Column("detection_method", sa.String(length=255), nullable=False),
+        sa.Column("config_hash", sa.String(length=64), nullable=False),
+        sa.Column("config", sa.JSON(), nullable=False),
+        sa.Column("state", sa.LargeBinary(), nullable=False),
+        sa.Column("last_time", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["dataset_id"],
+            ["timeseries.datasets.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        schema="timeseries",
+    )
+    op.create_index(
+        "ix_timeseries_trained_models_lookup",
+        "trained_models",
+        ["dataset_id", "detection_method", "config_hash"],
+        unique=False,
+        schema="timeseries",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_timeseries_trained_models_lookup", table_name="trained_models", schema="timeseries")
+    op.drop_table("trained_models", schema="timeseries")
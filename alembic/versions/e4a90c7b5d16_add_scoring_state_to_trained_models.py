@@ -0,0 +1,42 @@
+"""add analysis and statistics columns to trained models table
+
+Revision ID: e4a90c7b5d16
+Revises: b71e9d3f0c25
+Create Date: 2026-10-19 15:37:14.802361
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4a90c7b5d16"
+down_revision: Union[str, Sequence[str], None] = "b71e9d3f0c25"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("trained_models", sa.Column("analysis_id", sa.Integer(), nullable=True), schema="timeseries")
+    op.add_column("trained_models", sa.Column("statistics", sa.JSON(), nullable=True), schema="timeseries")
+    op.create_foreign_key(
+        "trained_models_analysis_id_fkey",
+        "trained_models",
+        "analyses",
+        ["analysis_id"],
+        ["id"],
+        source_schema="timeseries",
+        referent_schema="timeseries",
+        ondelete="SET NULL",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("trained_models_analysis_id_fkey", "trained_models", schema="timeseries", type_="foreignkey")
+    op.drop_column("trained_models", "statistics", schema="timeseries")
+    op.drop_column("trained_models", "analysis_id", schema="timeseries")
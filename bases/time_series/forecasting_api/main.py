@@ -1,12 +1,39 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import RedirectResponse
 from starlette.middleware.cors import CORSMiddleware
+from time_series.forecasting.executor import get_inference_executor
+from time_series.forecasting.scheduler import run_forecast_schedule
 from time_series.forecasting_api.routes import forecasting
+from time_series.settings import get_forecasting_settings
 from time_series.uvicorn_runner.logging_utils import setup_logging
 
 setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_forecasting_settings()
+    schedule = None
+    if settings.schedule_interval_minutes and settings.schedule_dataset_ids:
+        schedule = asyncio.create_task(
+            run_forecast_schedule(
+                interval_minutes=settings.schedule_interval_minutes,
+                dataset_ids=settings.schedule_dataset_ids,
+                model_name=settings.schedule_model_name,
+                city=settings.schedule_city,
+            )
+        )
+    yield
+    if schedule is not None:
+        schedule.cancel()
+    get_inference_executor().shutdown()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="forecasting",
     description="API for running forecasting",
     version="1.0.0",
@@ -29,8 +56,13 @@ async def docs_redirect():
 
 
 @app.get("/health", include_in_schema=False)
-def health_check():
+async def health_check():
     return "OK"
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return {"inference": get_inference_executor().metrics()}
+
+
 app.include_router(forecasting.router, prefix="/forecasting", tags=["forecasting"])
@@ -1,14 +1,36 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from loguru import logger
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 from time_series.forecasting.data_service import forecastingService
-from time_series.forecasting.prediction import predict
+from time_series.forecasting.executor import InferenceQueueFull, get_inference_executor
+from time_series.forecasting.prediction import TIMESTEPS, predict_batch
+from time_series.forecasting.weather import get_weather_provider
 from time_series.forecasting_api.helpers import get_forecasting_service
 
 router = APIRouter()
 
 
+class ForecastWindow(BaseModel):
+    dataset_id: int
+    user_data: Optional[list[float]] = Field(
+        default=None, description="Chronological readings (floats), read from the dataset when omitted"
+    )
+
+
+def stored_data_error(e: ValueError) -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail={
+            "code": "NOT_ENOUGH_DATAPOINTS",
+            "message": str(e),
+            "fix": f"Upload at least {TIMESTEPS} datapoints to the dataset or send user_data.",
+        },
+    )
+
+
 @router.get("/{dataset_id}")
 def get_all_predictions(
     dataset_id: int,
@@ -17,26 +39,21 @@ def get_all_predictions(
     return service.get_all_predictions(dataset_id)
 
 
-@router.post("/{dataset_id}", status_code=201)
-def add_prediction(
-    dataset_id: int,
-    model_name: Annotated[str, Query(min_length=1, description="Name of the model used")],
-    city: Annotated[str, Query(min_length=2, description="City name")],
-    user_data: Annotated[list[float], Body(..., description="Chronological readings (floats)")],
-    service: forecastingService = Depends(get_forecasting_service),
-) -> int:
-    if len(user_data) < 48:
+async def forecast(user_data: list[list[float]], city: str) -> list[list]:
+    temperature = await get_weather_provider().aget_temperature(city)
+
+    try:
+        return await get_inference_executor().run(predict_batch, user_data, temperature=temperature)
+    except InferenceQueueFull as e:
         raise HTTPException(
-            status_code=400,
+            status_code=503,
             detail={
-                "code": "USER_DATA_TOO_SHORT",
-                "message": f"user_data has {len(user_data)} values, expected at least 48.",
-                "fix": "Send at least 48 chronological readings (oldest -> newest).",
+                "code": "FORECAST_QUEUE_FULL",
+                "message": str(e),
+                "fix": "Retry the request later.",
             },
+            headers={"Retry-After": "5"},
         )
-
-    try:
-        predictions = predict(user_data, city=city)
     except ValueError as e:
         raise HTTPException(
             status_code=400,
@@ -47,7 +64,7 @@ def add_prediction(
             },
         )
     except Exception:
-        logger.exception("predict() crashed")
+        logger.exception("predict_batch() crashed")
         raise HTTPException(
             status_code=500,
             detail={
@@ -56,4 +73,74 @@ def add_prediction(
             },
         )
 
-    return service.add_prediction(model_name=model_name, dataset_id=dataset_id, prediction=predictions)
+
+@router.post("/batch", status_code=201)
+async def add_predictions(
+    model_name: Annotated[str, Query(min_length=1, description="Name of the model used")],
+    city: Annotated[str, Query(min_length=2, description="City name")],
+    windows: Annotated[list[ForecastWindow], Body(..., min_length=1, description="One window per series")],
+    service: forecastingService = Depends(get_forecasting_service),
+) -> list[int]:
+    def read_windows() -> list[list[float]]:
+        return [
+            window.user_data if window.user_data is not None else service.get_latest_window(window.dataset_id)
+            for window in windows
+        ]
+
+    try:
+        user_data = await run_in_threadpool(read_windows)
+    except ValueError as e:
+        raise stored_data_error(e)
+
+    short = [i for i, data in enumerate(user_data) if len(data) < TIMESTEPS]
+    if short:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "USER_DATA_TOO_SHORT",
+                "message": f"windows {short} have fewer than {TIMESTEPS} values.",
+                "fix": f"Send at least {TIMESTEPS} chronological readings (oldest -> newest) per window.",
+            },
+        )
+
+    predictions = await forecast(user_data, city=city)
+
+    return await run_in_threadpool(
+        service.add_predictions,
+        model_name=model_name,
+        predictions=[(window.dataset_id, prediction) for window, prediction in zip(windows, predictions)],
+    )
+
+
+@router.post("/{dataset_id}", status_code=201)
+async def add_prediction(
+    dataset_id: int,
+    model_name: Annotated[str, Query(min_length=1, description="Name of the model used")],
+    city: Annotated[str, Query(min_length=2, description="City name")],
+    user_data: Annotated[
+        Optional[list[float]],
+        Body(description="Chronological readings (floats), read from the dataset when omitted"),
+    ] = None,
+    service: forecastingService = Depends(get_forecasting_service),
+) -> int:
+    if user_data is None:
+        try:
+            user_data = await run_in_threadpool(service.get_latest_window, dataset_id)
+        except ValueError as e:
+            raise stored_data_error(e)
+
+    if len(user_data) < 48:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "USER_DATA_TOO_SHORT",
+                "message": f"user_data has {len(user_data)} values, expected at least 48.",
+                "fix": "Send at least 48 chronological readings (oldest -> newest).",
+            },
+        )
+
+    predictions = await forecast([user_data], city=city)
+
+    return await run_in_threadpool(
+        service.add_prediction, model_name=model_name, dataset_id=dataset_id, prediction=predictions[0]
+    )
@@ -1,7 +1,7 @@
 from fastapi import FastAPI
 from fastapi.responses import RedirectResponse
 from starlette.middleware.cors import CORSMiddleware
-from time_series.outlier_detection_api.routes import analyze
+from time_series.outlier_detection_api.routes import analyze, stream
 
 app = FastAPI(
     title="Outlier Detection API",
@@ -31,3 +31,4 @@ def health_check():
 
 
 app.include_router(analyze.router, prefix="/analyze", tags=["Analyze"])
+app.include_router(stream.router, prefix="/stream", tags=["Stream"])
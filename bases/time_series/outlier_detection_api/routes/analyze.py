@@ -1,33 +1,105 @@
 from typing import Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi import APIRouter, Depends
 from sqlmodel import Session
 from time_series.database import UnitOfWork
-from time_series.outlier_detection import AnalysisConfig
-from time_series.outlier_detection.run import run_lstmae_analysis
+from time_series.outlier_detection import (
+    AnalysisConfig,
+    DetectorConfig,
+    EWMAConfig,
+    HampelConfig,
+    IsolationForestConfig,
+    RollingZScoreConfig,
+    SeasonalConfig,
+)
 from time_series.outlier_detection_api.helpers import get_session
 
 router = APIRouter()
 
 
-@router.post("/{dataset_id}/lstmae")
-def create_lstmae_analysis(
+def queue_analysis(
+    session: Session,
     dataset_id: int,
-    config: AnalysisConfig,
-    background_tasks: BackgroundTasks,
+    detection_method: str,
+    config: DetectorConfig,
     name: str,
-    description: Optional[str] = None,
-    session: Session = Depends(get_session),
+    description: Optional[str],
 ):
+    # The analysis is queued as pending and picked up by an analysis worker (time_series.outlier_detection_worker).
     with UnitOfWork(session=session) as uow:
         analysis = uow.analyses.create(
             dataset_id=dataset_id,
-            detection_method="lstmae",
+            detection_method=detection_method,
             name=name,
             description=description,
+            config=config.model_dump(mode="json", exclude_unset=True),
         )
         uow.commit()
 
-    background_tasks.add_task(run_lstmae_analysis, dataset_id=dataset_id, analysis_id=analysis.id, config=config)  # type: ignore
-
     return analysis.id
+
+
+@router.post("/{dataset_id}/lstmae")
+def create_lstmae_analysis(
+    dataset_id: int,
+    config: AnalysisConfig,
+    name: str,
+    description: Optional[str] = None,
+    session: Session = Depends(get_session),
+):
+    return queue_analysis(session, dataset_id, "lstmae", config, name, description)
+
+
+@router.post("/{dataset_id}/zscore")
+def create_zscore_analysis(
+    dataset_id: int,
+    config: RollingZScoreConfig,
+    name: str,
+    description: Optional[str] = None,
+    session: Session = Depends(get_session),
+):
+    return queue_analysis(session, dataset_id, "zscore", config, name, description)
+
+
+@router.post("/{dataset_id}/hampel")
+def create_hampel_analysis(
+    dataset_id: int,
+    config: HampelConfig,
+    name: str,
+    description: Optional[str] = None,
+    session: Session = Depends(get_session),
+):
+    return queue_analysis(session, dataset_id, "hampel", config, name, description)
+
+
+@router.post("/{dataset_id}/seasonal")
+def create_seasonal_analysis(
+    dataset_id: int,
+    config: SeasonalConfig,
+    name: str,
+    description: Optional[str] = None,
+    session: Session = Depends(get_session),
+):
+    return queue_analysis(session, dataset_id, "seasonal", config, name, description)
+
+
+@router.post("/{dataset_id}/ewma")
+def create_ewma_analysis(
+    dataset_id: int,
+    config: EWMAConfig,
+    name: str,
+    description: Optional[str] = None,
+    session: Session = Depends(get_session),
+):
+    return queue_analysis(session, dataset_id, "ewma", config, name, description)
+
+
+@router.post("/{dataset_id}/iforest")
+def create_iforest_analysis(
+    dataset_id: int,
+    config: IsolationForestConfig,
+    name: str,
+    description: Optional[str] = None,
+    session: Session = Depends(get_session),
+):
+    return queue_analysis(session, dataset_id, "iforest", config, name, description)
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlmodel import Session
+from time_series.outlier_detection.streaming import (
+    StreamingScorer,
+    load_streaming_scorer,
+    streaming_model_id,
+)
+from time_series.outlier_detection_api.helpers import get_session
+
+router = APIRouter()
+
+# Seconds between SSE comments keeping idle connections open through proxies.
+KEEP_ALIVE_SECONDS = 15
+
+
+class StreamDatapoint(BaseModel):
+    time: datetime
+    value: float
+
+
+# Scorers and event subscribers live in this API process; run a single process to stream a dataset.
+# Scorers are kept per analysis and id of its model, for at most MAX_SCORERS analyses, least recently used first
+# out.
+MAX_SCORERS = 32
+_scorers: OrderedDict[tuple[int, int], StreamingScorer] = OrderedDict()
+_subscribers: Dict[int, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+_lock = threading.Lock()
+
+
+def get_scorer(analysis_id: int, session: Session) -> StreamingScorer:
+    try:
+        key = (analysis_id, streaming_model_id(session, analysis_id))
+        with _lock:
+            scorer = _scorers.get(key)
+            if scorer is not None:
+                _scorers.move_to_end(key)
+                return scorer
+        # Loading reads the database and deserializes the model, so it must not block publishing to other streams.
+        loaded = load_streaming_scorer(session, analysis_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "code": "NO_STREAMING_MODEL",
+                "message": str(e),
+                "fix": "Stream with a completed lstmae analysis of the dataset.",
+            },
+        )
+
+    # The model may have been retrained since its id was looked up, so the scorer is kept under what it loaded.
+    key = (analysis_id, loaded.model_id)  # type: ignore
+    with _lock:
+        # Scorers of earlier models of the analysis are stale.
+        for stale in [other for other in _scorers if other[0] == analysis_id and other != key]:
+            del _scorers[stale]
+        # A concurrent request may have loaded the same model first; its scorer holds the stream state.
+        scorer = _scorers.setdefault(key, loaded)
+        _scorers.move_to_end(key)
+        while len(_scorers) > MAX_SCORERS:
+            _scorers.popitem(last=False)
+        return scorer
+
+
+def publish(analysis_id: int, events: list[dict]):
+    with _lock:
+        subscribers = list(_subscribers.get(analysis_id, ()))
+    for loop, queue in subscribers:
+        for event in events:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+
+@router.post("/{analysis_id}/datapoints")
+def score_datapoints(analysis_id: int, datapoints: list[StreamDatapoint], session: Session = Depends(get_session)):
+    """
+    Score incoming datapoints of the analysed dataset with the model of the analysis, and return the anomaly
+    events they caused, which are also sent to the subscribers of /{analysis_id}/events.
+
+    The datapoints are not stored; upload them to the dataset as usual.
+    """
+    scorer = get_scorer(analysis_id, session)
+    try:
+        events = scorer.update(
+            [datapoint.time for datapoint in datapoints], [datapoint.value for datapoint in datapoints]
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "INVALID_INPUT",
+                "message": str(e),
+                "fix": "Send datapoints in time order, newer than those sent before.",
+            },
+        )
+    publish(analysis_id, events)
+    return events
+
+
+@router.get("/{analysis_id}/events")
+async def stream_events(analysis_id: int, request: Request):
+    """Server-Sent Events stream of the anomaly events of datapoints scored with the analysis."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    subscriber = (loop, queue)
+    with _lock:
+        _subscribers.setdefault(analysis_id, set()).add(subscriber)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=KEEP_ALIVE_SECONDS)
+                except TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: anomaly\ndata: {json.dumps(jsonable_encoder(event))}\n\n"
+        finally:
+            with _lock:
+                _subscribers[analysis_id].discard(subscriber)
+                if not _subscribers[analysis_id]:
+                    del _subscribers[analysis_id]
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,3 @@
+from time_series.outlier_detection_worker.main import main
+
+__all__ = ["main"]
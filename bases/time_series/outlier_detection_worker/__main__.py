@@ -0,0 +1,4 @@
+from time_series.outlier_detection_worker.main import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import signal
+
+from time_series.outlier_detection.worker import create_worker, serve_metrics
+from time_series.settings import get_outlier_detection_settings
+from time_series.uvicorn_runner.logging_utils import setup_logging
+
+
+def main() -> None:
+    setup_logging()
+    worker = create_worker()
+
+    metrics_port = get_outlier_detection_settings().worker_metrics_port
+    if metrics_port is not None:
+        serve_metrics(worker, port=metrics_port)
+
+    def handle_exit(sig, frame):
+        worker.stop()
+
+    signal.signal(signal.SIGINT, handle_exit)  # CTRL+C
+    signal.signal(signal.SIGTERM, handle_exit)  # pod/OS kill
+
+    worker.run()
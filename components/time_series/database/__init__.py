@@ -1,11 +1,12 @@
 from .engine import get_engine
-from .models import Anomaly, AnomalyType, Datapoint, Dataset, Prediction
+from .models import Anomaly, AnomalyType, Datapoint, Dataset, Prediction, TrainedModel
 from .repository import (
     AnalysisRepository,
     AnomalyRepository,
     DatapointRepository,
     DatasetRepository,
     PredictionRepository,
+    TrainedModelRepository,
 )
 from .unit_of_work import UnitOfWork
 
@@ -22,4 +23,6 @@ __all__ = [
     "UnitOfWork",
     "Prediction",
     "PredictionRepository",
+    "TrainedModel",
+    "TrainedModelRepository",
 ]
@@ -2,7 +2,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Column
+from sqlalchemy import JSON, Column, Index, LargeBinary
 from sqlalchemy import Enum as SQLAEnum
 from sqlmodel import Field, Relationship, SQLModel
 
@@ -26,9 +26,12 @@ class Dataset(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(unique=True, max_length=255, index=True)
     description: Optional[str] = None
+    # Incremented whenever the datapoints are written through the repository, so caches can tell a stale copy.
+    data_version: int = Field(default=0)
 
     datapoints: list["Datapoint"] = Relationship(back_populates="dataset", cascade_delete=True)
     analyses: list["Analysis"] = Relationship(back_populates="dataset", cascade_delete=True)
+    trained_models: list["TrainedModel"] = Relationship(back_populates="dataset", cascade_delete=True)
 
 
 class Datapoint(SQLModel, table=True):
@@ -44,7 +47,10 @@ class Datapoint(SQLModel, table=True):
 
 class Analysis(SQLModel, table=True):
     __tablename__ = "analyses"
-    __table_args__ = {"schema": "timeseries"}
+    __table_args__ = (
+        Index("ix_timeseries_analyses_status_id", "status", "id"),
+        {"schema": "timeseries"},
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     dataset_id: int = Field(foreign_key="timeseries.datasets.id", index=True)
@@ -56,6 +62,18 @@ class Analysis(SQLModel, table=True):
         sa_column=Column(SQLAEnum(StatusType, name="statustype", schema="timeseries")),
     )
 
+    # Job queue bookkeeping for analyses executed by workers.
+    config: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    attempts: int = Field(default=0)
+    heartbeat_at: Optional[datetime] = None
+
+    # Outcome of the last attempt: why it failed, and its stage timings and peak memory.
+    error: Optional[str] = None
+    metrics: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+
+    # The analysis an incremental analysis continues, which holds the anomalies before the ones it scored.
+    previous_analysis_id: Optional[int] = Field(default=None, foreign_key="timeseries.analyses.id", ondelete="SET NULL")
+
     dataset: Optional[Dataset] = Relationship(back_populates="analyses")
     anomalies: list["Anomaly"] = Relationship(back_populates="analysis", cascade_delete=True)
 
@@ -84,3 +102,31 @@ class Prediction(SQLModel, table=True):
     value: float
 
     analysis: Optional[Analysis] = Relationship(back_populates="predictions")
+
+
+class TrainedModel(SQLModel, table=True):
+    """A trained detection model, reusable by later analyses of the same dataset and model configuration."""
+
+    __tablename__ = "trained_models"
+    __table_args__ = (
+        Index("ix_timeseries_trained_models_lookup", "dataset_id", "detection_method", "config_hash"),
+        {"schema": "timeseries"},
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    dataset_id: int = Field(foreign_key="timeseries.datasets.id")
+    detection_method: str = Field(max_length=255)
+    config_hash: str = Field(max_length=64)
+    config: dict = Field(sa_column=Column(JSON, nullable=False))
+    # Serialized model weights and fitted scaler.
+    state: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    # Time of the last datapoint the model has scored, and the analysis holding the anomalies up to then.
+    last_time: datetime
+    analysis_id: Optional[int] = Field(default=None, foreign_key="timeseries.analyses.id", ondelete="SET NULL")
+    # Median and MAD of the log reconstruction errors, to threshold newly scored datapoints consistently.
+    statistics: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    # The anomaly range reaching the last scored datapoint, which incremental analyses extend and take over.
+    boundary: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    created_at: datetime
+
+    dataset: Optional[Dataset] = Relationship(back_populates="trained_models")
@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
-from sqlmodel import Session, col, select
+from sqlmodel import Session, col, delete, select, update
 
 from .models import (
     Analysis,
@@ -10,9 +10,16 @@ from .models import (
     Datapoint,
     Dataset,
     Prediction,
+    StatusType,
+    TrainedModel,
 )
 
 
+def utcnow() -> datetime:
+    # Timestamps are stored without time zone, in UTC.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class DatasetRepository:
     def __init__(self, session: Session):
         self.session = session
@@ -62,6 +69,7 @@ class DatapointRepository:
         self.session.add(datapoint)
         self.session.flush()
         self.session.refresh(datapoint)
+        self._bump_version([dataset_id])
         return datapoint
 
     def bulk_create(self, datapoints: List[dict]) -> int:
@@ -69,12 +77,23 @@ class DatapointRepository:
             datapoint = Datapoint(**dp_data)
             self.session.add(datapoint)
         self.session.flush()
+        self._bump_version({dp_data["dataset_id"] for dp_data in datapoints})
         return len(datapoints)
 
     def get_by_dataset(self, dataset_id: int) -> List[Datapoint]:
         statement = select(Datapoint).where(Datapoint.dataset_id == dataset_id).order_by(col(Datapoint.time))
         return list(self.session.exec(statement).all())
 
+    def get_latest(self, dataset_id: int, limit: int) -> List[Datapoint]:
+        """Return the newest `limit` datapoints of a dataset in chronological order."""
+        statement = (
+            select(Datapoint)
+            .where(Datapoint.dataset_id == dataset_id)
+            .order_by(col(Datapoint.time).desc())
+            .limit(limit)
+        )
+        return list(reversed(self.session.exec(statement).all()))
+
     def get_range(self, dataset_id: int, start_time: datetime, end_time: datetime) -> List[Datapoint]:
         statement = (
             select(Datapoint)
@@ -92,8 +111,20 @@ class DatapointRepository:
             self.session.delete(dp)
 
         self.session.flush()
+        if count:
+            self._bump_version([dataset_id])
         return count
 
+    def _bump_version(self, dataset_ids) -> None:
+        # Lets readers such as the array cache notice any write, including one that keeps count and sum.
+        if not dataset_ids:
+            return
+        statement = (
+            update(Dataset).where(col(Dataset.id).in_(dataset_ids)).values(data_version=Dataset.data_version + 1)
+        )
+        self.session.execute(statement)
+        self.session.flush()
+
 
 class AnalysisRepository:
     def __init__(self, session: Session):
@@ -105,12 +136,14 @@ class AnalysisRepository:
         detection_method: str,
         name: str,
         description: Optional[str] = None,
+        config: Optional[dict] = None,
     ) -> Analysis:
         analysis = Analysis(
             dataset_id=dataset_id,
             detection_method=detection_method,
             name=name,
             description=description,
+            config=config,
         )
         self.session.add(analysis)
         self.session.flush()
@@ -134,6 +167,75 @@ class AnalysisRepository:
             self.session.refresh(analysis)
         return analysis
 
+    def claim_pending(self, detection_methods: List[str]) -> Optional[Analysis]:
+        """
+        Mark the oldest pending analysis of the given methods as processing and return it.
+
+        The row is locked with FOR UPDATE SKIP LOCKED, so concurrent workers never claim the same analysis
+        and do not wait on each other. The claim is only visible to others once the caller commits.
+        """
+        statement = (
+            select(Analysis)
+            .where(Analysis.status == StatusType.pending, col(Analysis.detection_method).in_(detection_methods))
+            .order_by(col(Analysis.id))
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        analysis = self.session.exec(statement).first()
+        if analysis:
+            analysis.status = StatusType.processing
+            analysis.attempts += 1
+            analysis.heartbeat_at = utcnow()
+            self.session.add(analysis)
+            self.session.flush()
+            self.session.refresh(analysis)
+        return analysis
+
+    def heartbeat(self, analysis_ids: List[int]) -> int:
+        """Record that the given analyses are still being worked on."""
+        statement = (
+            update(Analysis)
+            .where(col(Analysis.id).in_(analysis_ids), Analysis.status == StatusType.processing)
+            .values(heartbeat_at=utcnow())
+        )
+        result = self.session.execute(statement)
+        self.session.flush()
+        return result.rowcount  # type: ignore
+
+    def recover_stale(self, stale_after: timedelta, max_attempts: int) -> List[Analysis]:
+        """
+        Requeue processing analyses whose worker stopped sending heartbeats.
+
+        Analyses that already used `max_attempts` attempts are marked as failed instead.
+        """
+        statement = (
+            select(Analysis)
+            .where(Analysis.status == StatusType.processing, col(Analysis.heartbeat_at) < utcnow() - stale_after)
+            .with_for_update(skip_locked=True)
+        )
+        analyses = list(self.session.exec(statement).all())
+        for analysis in analyses:
+            analysis.status = StatusType.pending if analysis.attempts < max_attempts else StatusType.error
+            self.session.add(analysis)
+        self.session.flush()
+        return analyses
+
+    def fail(self, analysis_id: int, error: str, max_attempts: int, retry: bool = True) -> Optional[Analysis]:
+        """
+        Record a failed attempt of an analysis.
+
+        The analysis is requeued if `retry` is set and it has not used `max_attempts` attempts yet,
+        otherwise it is marked as failed.
+        """
+        analysis = self.session.get(Analysis, analysis_id)
+        if analysis:
+            analysis.status = StatusType.pending if retry and analysis.attempts < max_attempts else StatusType.error
+            analysis.error = error
+            self.session.add(analysis)
+            self.session.flush()
+            self.session.refresh(analysis)
+        return analysis
+
     def delete(self, analysis_id: int) -> bool:
         analysis = self.session.get(Analysis, analysis_id)
         if analysis:
@@ -276,3 +378,85 @@ class PredictionRepository:
     def get_by_dataset(self, dataset_id: int) -> List[Prediction]:
         statement = select(Prediction).where(Analysis.dataset_id == dataset_id).order_by(col(Prediction.time))
         return list(self.session.exec(statement).all())
+
+
+class TrainedModelRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def create(
+        self,
+        dataset_id: int,
+        detection_method: str,
+        config_hash: str,
+        config: dict,
+        state: bytes,
+        last_time: datetime,
+        analysis_id: Optional[int] = None,
+        statistics: Optional[dict] = None,
+        boundary: Optional[dict] = None,
+    ) -> TrainedModel:
+        trained_model = TrainedModel(
+            dataset_id=dataset_id,
+            detection_method=detection_method,
+            config_hash=config_hash,
+            config=config,
+            state=state,
+            last_time=last_time,
+            analysis_id=analysis_id,
+            statistics=statistics,
+            boundary=boundary,
+            created_at=utcnow(),
+        )
+        self.session.add(trained_model)
+        self.session.flush()
+        self.session.refresh(trained_model)
+        return trained_model
+
+    def get_by_id(self, trained_model_id: int) -> Optional[TrainedModel]:
+        return self.session.get(TrainedModel, trained_model_id)
+
+    def get_latest(
+        self, dataset_id: int, detection_method: str, config_hash: str, for_update: bool = False
+    ) -> Optional[TrainedModel]:
+        """
+        The most recently trained model of a dataset with the given method and configuration.
+
+        With `for_update`, the row is locked with FOR UPDATE until the transaction ends, so concurrent analyses
+        scoring with the model wait for each other instead of overwriting its last scored time and boundary.
+        """
+        statement = (
+            select(TrainedModel)
+            .where(
+                TrainedModel.dataset_id == dataset_id,
+                TrainedModel.detection_method == detection_method,
+                TrainedModel.config_hash == config_hash,
+            )
+            .order_by(col(TrainedModel.id).desc())
+            .limit(1)
+        )
+        if for_update:
+            statement = statement.with_for_update()
+        return self.session.exec(statement).first()
+
+    def delete_superseded(self, trained_model: TrainedModel) -> int:
+        """Delete the models trained earlier on the same dataset with the same method and configuration."""
+        statement = delete(TrainedModel).where(
+            col(TrainedModel.dataset_id) == trained_model.dataset_id,
+            col(TrainedModel.detection_method) == trained_model.detection_method,
+            col(TrainedModel.config_hash) == trained_model.config_hash,
+            col(TrainedModel.id) < trained_model.id,
+        )
+        result = self.session.execute(statement)
+        self.session.flush()
+        return result.rowcount  # type: ignore
+
+    def update(self, trained_model_id: int, **kwargs) -> Optional[TrainedModel]:
+        trained_model = self.session.get(TrainedModel, trained_model_id)
+        if trained_model:
+            for key, value in kwargs.items():
+                setattr(trained_model, key, value)
+            self.session.add(trained_model)
+            self.session.flush()
+            self.session.refresh(trained_model)
+        return trained_model
@@ -8,6 +8,7 @@ from .repository import (
     DatapointRepository,
     DatasetRepository,
     PredictionRepository,
+    TrainedModelRepository,
 )
 
 logger = logging.getLogger(__name__)
@@ -21,6 +22,7 @@ class UnitOfWork:
         self.analyses: AnalysisRepository = AnalysisRepository(self._session)
         self.anomalies: AnomalyRepository = AnomalyRepository(self._session)
         self.prediction: PredictionRepository = PredictionRepository(self._session)
+        self.trained_models: TrainedModelRepository = TrainedModelRepository(self._session)
 
     def __enter__(self):
         return self
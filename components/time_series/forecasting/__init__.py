@@ -1,5 +1,26 @@
 from time_series.forecasting.data_service import forecastingService
-from time_series.forecasting.prediction import predict
-from time_series.forecasting.weather import get_todays_temp, get_upcoming_temps
+from time_series.forecasting.executor import InferenceExecutor, InferenceQueueFull, get_inference_executor
+from time_series.forecasting.prediction import predict, predict_batch
+from time_series.forecasting.weather import (
+    StaticWeatherBackend,
+    Weather,
+    WeatherProvider,
+    get_todays_temp,
+    get_upcoming_temps,
+    get_weather_provider,
+)
 
-__all__ = ["get_todays_temp", "get_upcoming_temps", "predict", "forecastingService"]
+__all__ = [
+    "get_todays_temp",
+    "get_upcoming_temps",
+    "get_weather_provider",
+    "predict",
+    "predict_batch",
+    "forecastingService",
+    "get_inference_executor",
+    "InferenceExecutor",
+    "InferenceQueueFull",
+    "StaticWeatherBackend",
+    "Weather",
+    "WeatherProvider",
+]
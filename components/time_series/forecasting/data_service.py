@@ -1,8 +1,9 @@
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import List, Tuple
 
 from time_series.database.models import Analysis
 from time_series.database.unit_of_work import UnitOfWork
+from time_series.forecasting.prediction import TIMESTEPS
 
 
 class forecastingService:
@@ -13,30 +14,55 @@ class forecastingService:
         """
         Create an analysis entry and store prediction values linked to it.
         """
+        return self.add_predictions(model_name=model_name, predictions=[(dataset_id, prediction)])[0]
 
-        # 1. Create analysis record with timezone-aware datetime
+    def add_predictions(self, model_name: str, predictions: List[Tuple[int, list]]) -> List[int]:
+        """
+        Create one analysis per (dataset_id, prediction) pair and store all prediction values in bulk.
+
+        Returns the analysis ids in the same order as `predictions`.
+        """
+
+        # 1. Create analysis records with timezone-aware datetime
         now_utc = datetime.now(timezone.utc)
 
-        analysis = self.uow.analyses.create(
-            dataset_id=dataset_id,
-            detection_method=model_name,
-            name=f"{model_name}-{now_utc.isoformat()}",
-            description="Generated forecast",
-        )
-
-        # 2. Save prediction results with UTC timestamps
-        #    If you want each prediction to have a unique timestamp:
-        base_time = now_utc
-
-        assert analysis.id is not None
-        for i, value in enumerate(prediction):
-            self.uow.prediction.create(
-                analysis_id=analysis.id,
-                time=base_time + timedelta(seconds=i),  # unique timestamp per prediction
-                value=float(value),
+        analysis_ids = []
+        rows = []
+        for dataset_id, prediction in predictions:
+            analysis = self.uow.analyses.create(
+                dataset_id=dataset_id,
+                detection_method=model_name,
+                name=f"{model_name}-{now_utc.isoformat()}",
+                description="Generated forecast",
+            )
+            assert analysis.id is not None
+            analysis_ids.append(analysis.id)
+
+            # 2. Collect prediction results with UTC timestamps
+            #    If you want each prediction to have a unique timestamp:
+            base_time = now_utc
+            rows.extend(
+                {
+                    "analysis_id": analysis.id,
+                    "time": base_time + timedelta(seconds=i),  # unique timestamp per prediction
+                    "value": float(value),
+                }
+                for i, value in enumerate(prediction)
             )
 
-        return analysis.id
+        # 3. Store every prediction in a single commit
+        self.uow.prediction.bulk_create(rows)
+
+        return analysis_ids
+
+    def get_latest_window(self, dataset_id: int) -> List[float]:
+        """
+        Return the newest TIMESTEPS stored readings of a dataset, oldest first.
+        """
+        datapoints = self.uow.datapoints.get_latest(dataset_id, limit=TIMESTEPS)
+        if len(datapoints) < TIMESTEPS:
+            raise ValueError(f"Dataset {dataset_id} has {len(datapoints)} datapoints, expected at least {TIMESTEPS}.")
+        return [datapoint.value for datapoint in datapoints]
 
     def get_all_predictions(self, dataset_id: int) -> List[dict] | dict:
         """
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Callable, TypeVar
+
+from time_series.settings import get_forecasting_settings
+
+T = TypeVar("T")
+
+
+class InferenceQueueFull(RuntimeError):
+    pass
+
+
+class InferenceExecutor:
+    """
+    Runs model inference on a dedicated, bounded thread pool.
+
+    At most `max_workers` jobs run at once and at most `max_queue` more may wait. Further submissions are
+    rejected with InferenceQueueFull, so a burst of forecasts sheds load instead of occupying the server
+    threadpool that health checks and other requests rely on.
+    """
+
+    def __init__(self, max_workers: int = 1, max_queue: int = 32):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+
+        self.pending = 0  # Queued and running jobs
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        with self._lock:
+            if self.pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise InferenceQueueFull(f"Inference queue is full ({self.max_queue} jobs waiting)")
+            self.pending += 1
+
+        future = self._executor.submit(self._call, partial(fn, *args, **kwargs))
+        # Release the slot when the job finishes, even if the awaiting request was cancelled meanwhile.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _call(self, fn: Callable[[], T]) -> T:
+        with self._lock:
+            self.running += 1
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def _release(self, future: Future):
+        with self._lock:
+            self.pending -= 1
+            # Jobs still queued at shutdown are cancelled, and exception() would raise for them.
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "queue_depth": self.pending - self.running,
+                "running": self.running,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache
+def get_inference_executor() -> InferenceExecutor:
+    settings = get_forecasting_settings()
+    return InferenceExecutor(max_workers=settings.inference_workers, max_queue=settings.inference_queue_size)
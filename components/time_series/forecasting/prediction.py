@@ -1,14 +1,40 @@
-import asyncio
 import pickle
+from functools import lru_cache
 from importlib.resources import files
+from typing import Optional
 
 import numpy as np
 from tensorflow.keras.models import load_model
-from time_series.forecasting.weather import get_todays_temp
+from time_series.forecasting.weather import get_weather_provider
 
 TIMESTEPS = 48
 
 
+NUMERIC_COLS = ["energy(kWh/hh)", "temperature"]
+
+
+class ScalerParams:
+    """
+    Per-column affine parameters of fitted scalers, so scaling is a single array expression.
+
+    Every scaler we use (MinMax, Standard, Robust) is affine, so `transform(x) == x * scale + offset`. The
+    parameters are read off the scalers once by transforming 0 and 1, instead of going through sklearn's
+    input validation on every call.
+    """
+
+    def __init__(self, scalers, numeric_cols=NUMERIC_COLS):
+        self.offset = np.array([scalers[col].transform([[0.0]])[0, 0] for col in numeric_cols])
+        self.scale = np.array([scalers[col].transform([[1.0]])[0, 0] for col in numeric_cols]) - self.offset
+
+    def transform(self, values: np.ndarray) -> np.ndarray:
+        """Scale an array whose last axis holds the columns."""
+        return values * self.scale + self.offset
+
+    def inverse_transform(self, values: np.ndarray) -> np.ndarray:
+        return (values - self.offset) / self.scale
+
+
+@lru_cache(maxsize=1)
 def load_model_and_scalers():
     base = files("time_series.forecasting.assets")
 
@@ -20,52 +46,69 @@ def load_model_and_scalers():
     with scaler_path.open("rb") as f:
         scalers = pickle.load(f)
 
-    return model, scalers
-
+    return model, ScalerParams(scalers)
 
-def scale_last(last, scalers):
-    last_scaled = last.copy()
-    last_scaled[:, 0] = scalers["energy(kWh/hh)"].transform(last_scaled[:, 0].reshape(-1, 1)).flatten()
-    last_scaled[:, 1] = scalers["temperature"].transform(last_scaled[:, 1].reshape(-1, 1)).flatten()
 
-    return last_scaled
+def scale_last(last, scalers: ScalerParams):
+    return scalers.transform(last)
 
 
 def recursive_predict(
     last_scaled,
     model,
-    scalers,
+    scalers: ScalerParams,
     future_steps=12,
-    numeric_cols=["energy(kWh/hh)", "temperature"],
+    numeric_cols=NUMERIC_COLS,
 ):
-    predictions_scaled = []
-    input_window = last_scaled.copy()
+    """
+    Forecast `future_steps` steps by feeding each prediction back into the window.
 
+    `last_scaled` is either a single window of shape (TIMESTEPS, features) or a batch of windows
+    of shape (N, TIMESTEPS, features). A batch is forecast with one model call per step for all
+    series at once, and the returned arrays then have shape (N, future_steps).
+    """
+    single = last_scaled.ndim == 2
+    input_windows = last_scaled.reshape(-1, TIMESTEPS, len(numeric_cols)).copy()
+
+    predictions_scaled = np.empty((len(input_windows), future_steps, len(numeric_cols)))
     for step in range(future_steps):
-        X = input_window.reshape(1, TIMESTEPS, len(numeric_cols))
-        pred_scaled = model.predict(X)[0]  # shape (2,)
-        predictions_scaled.append(pred_scaled)
-        input_window = np.vstack([input_window[1:], pred_scaled])
-    predictions_scaled = np.array(predictions_scaled)
-    pred_energy_real = scalers["energy(kWh/hh)"].inverse_transform(predictions_scaled[:, 0].reshape(-1, 1)).flatten()
-    pred_temp_real = scalers["temperature"].inverse_transform(predictions_scaled[:, 1].reshape(-1, 1)).flatten()
+        pred_scaled = model.predict(input_windows, batch_size=len(input_windows), verbose=0)  # shape (N, 2)
+        predictions_scaled[:, step] = pred_scaled
+        input_windows = np.concatenate([input_windows[:, 1:], pred_scaled[:, np.newaxis, :]], axis=1)
+
+    predictions_real = scalers.inverse_transform(predictions_scaled)
+    pred_energy_real, pred_temp_real = predictions_real[..., 0], predictions_real[..., 1]
 
+    if single:
+        return pred_energy_real[0], pred_temp_real[0]
     return pred_energy_real, pred_temp_real
 
 
-def predict(user_data: list, city: str) -> list:
-    if len(user_data) < TIMESTEPS:
-        raise ValueError(f"Invalid user_data length: {len(user_data)}. Expected {TIMESTEPS}.")
-    data = np.asarray(user_data)
+def predict(user_data: list, city: Optional[str] = None, temperature: Optional[float] = None) -> list:
+    return predict_batch([user_data], city=city, temperature=temperature)[0]
+
+
+def predict_batch(
+    windows: list[list[float]], city: Optional[str] = None, temperature: Optional[float] = None
+) -> list[list]:
+    """
+    Forecast many series at once, stacking their windows into one (N, TIMESTEPS, 2) batch.
+
+    The temperature is looked up for `city` unless it is passed in directly.
+    """
+    if not windows:
+        return []
+    for i, user_data in enumerate(windows):
+        if len(user_data) < TIMESTEPS:
+            raise ValueError(f"Invalid user_data length at index {i}: {len(user_data)}. Expected {TIMESTEPS}.")
+    data = np.stack([np.asarray(user_data[:TIMESTEPS], dtype=float) for user_data in windows])
     # based on values from https://weatherspark.com/y/45062/Average-Weather-in-London-United-Kingdom-Year-Round
     avg_temp = 12  # (6 + 6 + 8 + 11 + 14 + 17 + 19 + 19 + 16 + 13 + 9 + 7) / 12
-    temp = asyncio.run(get_todays_temp(city))
-    if temp is not None:
-        data = np.c_[data, np.full(len(user_data), temp)]
-    else:
-        data = np.c_[data, np.full(len(user_data), avg_temp)]
+    temp = temperature
+    if temp is None and city is not None:
+        temp = get_weather_provider().get_temperature(city)
+    data = np.stack([data, np.full(data.shape, temp if temp is not None else avg_temp, dtype=float)], axis=-1)
     model, scalers = load_model_and_scalers()
-    last_raw = data[0:48]
-    last_scaled = scale_last(last_raw, scalers)
+    last_scaled = scale_last(data, scalers)
     energy_pred_12, temp_pred_12 = recursive_predict(last_scaled, model, scalers)
     return energy_pred_12.tolist()
@@ -0,0 +1,64 @@
+import asyncio
+from typing import List, Tuple
+
+from loguru import logger
+from sqlmodel import Session
+from time_series.database import UnitOfWork, get_engine
+from time_series.forecasting.data_service import forecastingService
+from time_series.forecasting.executor import get_inference_executor
+from time_series.forecasting.prediction import predict_batch
+from time_series.forecasting.weather import get_weather_provider
+
+
+def read_latest_windows(dataset_ids: List[int]) -> List[Tuple[int, List[float]]]:
+    """
+    The latest window of every dataset with enough datapoints. Datasets with too few are skipped and logged,
+    so they do not hold up the forecasts of the others.
+    """
+    windows = []
+    with Session(get_engine()) as session:
+        service = forecastingService(UnitOfWork(session))
+        for dataset_id in dataset_ids:
+            try:
+                windows.append((dataset_id, service.get_latest_window(dataset_id)))
+            except ValueError as e:
+                logger.warning(f"Skipping dataset {dataset_id} in scheduled forecast: {e}")
+    return windows
+
+
+def store_predictions(model_name: str, dataset_ids: List[int], predictions: List[list]) -> List[int]:
+    with Session(get_engine()) as session:
+        return forecastingService(UnitOfWork(session)).add_predictions(
+            model_name=model_name, predictions=list(zip(dataset_ids, predictions))
+        )
+
+
+async def forecast_datasets(dataset_ids: List[int], model_name: str, city: str) -> List[int]:
+    """
+    Forecast the datasets from their stored datapoints and store the predictions.
+
+    Only the inference runs on the inference executor, so scheduled and requested forecasts share one
+    concurrency limit without the database reads and the weather lookup holding a slot.
+    """
+    windows = await asyncio.to_thread(read_latest_windows, dataset_ids)
+    if not windows:
+        return []
+    forecast_ids = [dataset_id for dataset_id, _window in windows]
+    temperature = await get_weather_provider().aget_temperature(city)
+    predictions = await get_inference_executor().run(
+        predict_batch, [window for _dataset_id, window in windows], temperature=temperature
+    )
+    return await asyncio.to_thread(store_predictions, model_name, forecast_ids, predictions)
+
+
+async def run_forecast_schedule(interval_minutes: int, dataset_ids: List[int], model_name: str, city: str):
+    """
+    Forecast the given datasets from their stored datapoints every `interval_minutes`.
+    """
+    while True:
+        try:
+            analysis_ids = await forecast_datasets(dataset_ids, model_name, city)
+            logger.info(f"Scheduled forecast stored analyses {analysis_ids}")
+        except Exception:
+            logger.exception("Scheduled forecast failed")
+        await asyncio.sleep(interval_minutes * 60)
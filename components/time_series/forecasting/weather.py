@@ -1,39 +1,161 @@
-from typing import List, Optional, cast
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Protocol, Tuple, cast
 
 import python_weather
+from loguru import logger
+from time_series.settings import get_forecasting_settings
 
 
-async def get_todays_temp(city) -> Optional[int]:
-    try:
-        client = python_weather.Client()
-        weather = await client.get(city)
-        print("weather data recceived:" + str(weather))
-        await client.close()
-        return weather.temperature
-    except TypeError:
-        await client.close()
-        return None
-    except Exception as e:
-        print("unexpected exception " + str(e))
-        await client.close()
-        return None
-
-
-async def get_upcoming_temps(city) -> Optional[List[int]]:
-    try:
-        client = python_weather.Client()
-        weather = await client.get(city)
-        print("weather data recceived:" + str(weather))
-        await client.close()
-        ret = []
-        weather = cast(python_weather.forecast.Forecast, weather)
-        for daily in weather.daily_forecasts:
-            ret.append(daily.temperature)
-        return ret
-    except TypeError:
-        await client.close()
-        return None
-    except Exception as e:
-        print("unexpected exception " + str(e))
-        await client.close()
-        return None
+@dataclass(frozen=True)
+class Weather:
+    temperature: float
+    daily_temperatures: List[float] = field(default_factory=list)
+
+
+class WeatherBackend(Protocol):
+    async def fetch(self, city: str) -> Weather: ...
+
+    async def close(self) -> None: ...
+
+
+class PythonWeatherBackend:
+    """Weather backend sharing one long-lived python_weather client for all lookups."""
+
+    def __init__(self):
+        self._client: Optional[python_weather.Client] = None
+
+    async def fetch(self, city: str) -> Weather:
+        if self._client is None:
+            # Created lazily so the client is bound to the provider's event loop.
+            self._client = python_weather.Client()
+        forecast = cast(python_weather.forecast.Forecast, await self._client.get(city))
+        return Weather(
+            temperature=forecast.temperature,
+            daily_temperatures=[daily.temperature for daily in forecast.daily_forecasts],
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+class StaticWeatherBackend:
+    """Weather backend returning fixed values, for tests and offline development."""
+
+    def __init__(self, temperature: float, daily_temperatures: Optional[List[float]] = None):
+        self.weather = Weather(temperature=temperature, daily_temperatures=daily_temperatures or [temperature])
+        self.calls = 0
+
+    async def fetch(self, city: str) -> Weather:
+        self.calls += 1
+        return self.weather
+
+    async def close(self) -> None:
+        pass
+
+
+class WeatherProvider:
+    """
+    Shared weather lookups with a per-city TTL cache.
+
+    The backend lives on a dedicated event loop thread, so one client is reused by sync and async callers
+    alike, and concurrent lookups of the same city are coalesced into a single backend request.
+    Failed lookups return None and are cached for `failure_ttl_seconds` to avoid hammering the backend.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[WeatherBackend] = None,
+        ttl_seconds: float = 1800,
+        failure_ttl_seconds: float = 60,
+        timeout_seconds: float = 10,
+    ):
+        self.backend: WeatherBackend = backend or PythonWeatherBackend()
+        self.ttl_seconds = ttl_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self.timeout_seconds = timeout_seconds
+
+        # Only touched from the provider loop, so no locking is needed.
+        self._cache: Dict[str, Tuple[float, Optional[Weather]]] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="weather-provider", daemon=True)
+        self._thread.start()
+
+    def get(self, city: str) -> Optional[Weather]:
+        """Blocking lookup, for use outside of an event loop."""
+        future = asyncio.run_coroutine_threadsafe(self._get(city), self._loop)
+        return future.result(timeout=self.timeout_seconds + 1)
+
+    async def aget(self, city: str) -> Optional[Weather]:
+        """Non-blocking lookup, for use from any event loop."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._get(city), self._loop))
+
+    def get_temperature(self, city: str) -> Optional[float]:
+        weather = self.get(city)
+        return weather.temperature if weather is not None else None
+
+    async def aget_temperature(self, city: str) -> Optional[float]:
+        weather = await self.aget(city)
+        return weather.temperature if weather is not None else None
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.backend.close(), self._loop).result(timeout=self.timeout_seconds)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=self.timeout_seconds)
+
+    async def _get(self, city: str) -> Optional[Weather]:
+        key = city.strip().lower()
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch(key, city))
+            self._pending[key] = pending
+        return await asyncio.shield(pending)
+
+    async def _fetch(self, key: str, city: str) -> Optional[Weather]:
+        try:
+            weather: Optional[Weather] = await asyncio.wait_for(self.backend.fetch(city), self.timeout_seconds)
+            ttl = self.ttl_seconds
+        except Exception as e:
+            logger.warning(f"Weather lookup for {city!r} failed: {e!r}")
+            weather = None
+            ttl = self.failure_ttl_seconds
+        finally:
+            self._pending.pop(key, None)
+
+        self._cache[key] = (time.monotonic() + ttl, weather)
+        return weather
+
+
+@lru_cache
+def get_weather_provider() -> WeatherProvider:
+    settings = get_forecasting_settings()
+    backend: WeatherBackend
+    if settings.weather_static_temperature is not None:
+        backend = StaticWeatherBackend(temperature=settings.weather_static_temperature)
+    else:
+        backend = PythonWeatherBackend()
+    return WeatherProvider(
+        backend=backend,
+        ttl_seconds=settings.weather_cache_ttl_seconds,
+        timeout_seconds=settings.weather_timeout_seconds,
+    )
+
+
+async def get_todays_temp(city) -> Optional[float]:
+    return await get_weather_provider().aget_temperature(city)
+
+
+async def get_upcoming_temps(city) -> Optional[List[float]]:
+    weather = await get_weather_provider().aget(city)
+    return weather.daily_temperatures if weather is not None else None
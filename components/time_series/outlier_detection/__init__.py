@@ -1,8 +1,24 @@
-from time_series.outlier_detection.datasets import DatapointSQLDataset, SlidingWindowDataset
+from time_series.outlier_detection.cache import DatasetArrayCache, get_dataset_cache
+from time_series.outlier_detection.datasets import (
+    DatapointSQLDataset,
+    SlidingWindowDataset,
+    create_window_dataloader,
+    load_datapoint_columns,
+    load_datapoint_tail,
+    sliding_windows,
+)
 from time_series.outlier_detection.helpers import (
     AnalysisConfig,
     DatasetConfig,
+    DetectorConfig,
+    EWMAConfig,
+    GroupingConfig,
+    HampelConfig,
     HyperparameterConfig,
+    IsolationForestConfig,
+    RollingZScoreConfig,
+    ScoringConfig,
+    SeasonalConfig,
     TrainingConfig,
     create_train_test_split,
 )
@@ -10,12 +26,26 @@ from time_series.outlier_detection.models import LSTMAutoencoder
 from time_series.outlier_detection.trainer import AutoencoderTrainer
 
 __all__ = [
+    "DatasetArrayCache",
+    "get_dataset_cache",
     "DatapointSQLDataset",
     "SlidingWindowDataset",
+    "create_window_dataloader",
+    "load_datapoint_columns",
+    "load_datapoint_tail",
+    "sliding_windows",
     "DatasetConfig",
     "HyperparameterConfig",
     "TrainingConfig",
+    "ScoringConfig",
     "AnalysisConfig",
+    "DetectorConfig",
+    "GroupingConfig",
+    "RollingZScoreConfig",
+    "HampelConfig",
+    "SeasonalConfig",
+    "EWMAConfig",
+    "IsolationForestConfig",
     "create_train_test_split",
     "LSTMAutoencoder",
     "AutoencoderTrainer",
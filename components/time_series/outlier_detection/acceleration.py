@@ -0,0 +1,67 @@
+import warnings
+from contextlib import AbstractContextManager, nullcontext
+from typing import Literal
+
+import torch
+from loguru import logger
+from torch import nn
+
+ExecutionMode = Literal["eager", "compile", "trace"]
+Precision = Literal["fp32", "bf16", "int8"]
+
+
+def unwrap_model(model: nn.Module) -> nn.Module:
+    """The eager module behind a torch.compile wrapper, e.g. to save its weights without the wrapper prefix."""
+    return getattr(model, "_orig_mod", model)
+
+
+def compile_model(model: nn.Module, example: torch.Tensor) -> nn.Module:
+    """
+    Compile the model with torch.compile, for training and inference.
+
+    Compilation happens on the first call, so the model is run once on `example` to surface failures here.
+    If compiling fails, e.g. because no C++ compiler is available, the eager model is returned instead.
+    """
+    if model is not unwrap_model(model):
+        return model
+
+    compiled = torch.compile(model)
+    try:
+        compiled(example)
+    except Exception as e:
+        logger.warning(f"torch.compile failed, falling back to eager execution: {e!r}")
+        return model
+    return compiled
+
+
+def trace_model(model: nn.Module, example: torch.Tensor) -> nn.Module:
+    """
+    Trace the model in eval mode with TorchScript, for inference only.
+
+    If tracing fails, the eager model is returned instead.
+    """
+    model = unwrap_model(model).eval()
+    try:
+        with torch.no_grad(), warnings.catch_warnings():
+            # Newer torch versions deprecate tracing in favour of torch.compile.
+            warnings.simplefilter("ignore", FutureWarning)
+            # nn.LSTM checks the feature and hidden sizes, which are fixed; the batch size stays dynamic.
+            warnings.simplefilter("ignore", torch.jit.TracerWarning)
+            return torch.jit.trace(model, example)
+    except Exception as e:
+        logger.warning(f"TorchScript tracing failed, falling back to eager execution: {e!r}")
+        return model
+
+
+def quantize_model(model: nn.Module, device: str) -> nn.Module:
+    """Copy of the model with int8 dynamically quantized LSTM and Linear layers, for CPU inference."""
+    if device != "cpu":
+        raise ValueError(f"int8 scoring is only supported on cpu, not {device}")
+    return torch.ao.quantization.quantize_dynamic(unwrap_model(model), {nn.LSTM, nn.Linear}, dtype=torch.qint8)
+
+
+def autocast(precision: Precision, device: str) -> AbstractContextManager:
+    """Autocast context running the model in bfloat16 where it is numerically safe, if requested."""
+    if precision == "bf16":
+        return torch.autocast(device_type=device, dtype=torch.bfloat16)
+    return nullcontext()
@@ -0,0 +1,73 @@
+import hashlib
+import os
+import shutil
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlmodel import Session, select
+from time_series.database import Datapoint, Dataset
+from time_series.outlier_detection.datasets import load_datapoint_columns
+from time_series.settings import get_outlier_detection_settings
+
+
+class DatasetArrayCache:
+    """
+    On-disk cache of each dataset's time and value columns as .npy files, opened memory-mapped.
+
+    Entries live in `<root>/<dataset_id>/<marker>/`, where the marker is derived from the dataset's data version
+    and row count. Every write through the datapoint repository bumps the data version, so entries go stale on
+    any edit made by the application; the count catches most appends and deletes made directly in the database.
+    Because the arrays are memory-mapped, repeated analyses only count the datapoints, an index-only scan,
+    instead of reading them, and worker processes share the same pages.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def marker(self, session: Session, dataset_id: int) -> Optional[str]:
+        statement = select(func.count()).select_from(Datapoint).where(Datapoint.dataset_id == dataset_id)
+        count = session.exec(statement).one()
+        if not count:
+            return None
+        version = session.exec(select(Dataset.data_version).where(Dataset.id == dataset_id)).one()
+        return hashlib.sha1(f"{version}|{count}".encode()).hexdigest()[:16]
+
+    def load(self, session: Session, dataset_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Load the columns from the cache, querying and storing them first if the entry is missing or stale."""
+        marker = self.marker(session, dataset_id)
+        if marker is None:
+            return load_datapoint_columns(session, dataset_id)
+
+        entry = self.root / str(dataset_id) / marker
+        if not (entry / "value.npy").exists():
+            timestamps, values = load_datapoint_columns(session, dataset_id)
+            self._store(entry, timestamps, values)
+
+        return np.load(entry / "time.npy", mmap_mode="r"), np.load(entry / "value.npy", mmap_mode="r")
+
+    def _store(self, entry: Path, timestamps: np.ndarray, values: np.ndarray):
+        # Write into a private directory and rename it into place, so readers never see a partial entry.
+        tmp = entry.with_name(f".{entry.name}.{uuid.uuid4().hex}")
+        tmp.mkdir(parents=True)
+        np.save(tmp / "time.npy", timestamps)
+        np.save(tmp / "value.npy", values)
+        try:
+            os.rename(tmp, entry)
+        except OSError:
+            # Another process stored the same entry first.
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+
+        for stale in entry.parent.iterdir():
+            if stale != entry and not stale.name.startswith("."):
+                shutil.rmtree(stale, ignore_errors=True)
+
+
+@lru_cache
+def get_dataset_cache() -> Optional[DatasetArrayCache]:
+    cache_dir = get_outlier_detection_settings().cache_dir
+    return DatasetArrayCache(cache_dir) if cache_dir else None
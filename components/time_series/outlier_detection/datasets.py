@@ -1,64 +1,200 @@
-from typing import Any, Optional
+import io
+import warnings
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Optional, Sequence, Tuple
 
 import numpy as np
 import torch
-from sqlmodel import Session, select
-from time_series.database import DatapointRepository, Dataset
+from sqlmodel import Session, col, select
+from time_series.database import Datapoint, Dataset
+from torch.utils.data import BatchSampler, DataLoader, RandomSampler, SequentialSampler
+
+if TYPE_CHECKING:
+    from time_series.outlier_detection.cache import DatasetArrayCache
+
+
+def load_datapoint_columns(session: Session, dataset_id: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load the time and value columns of a dataset, ordered by time.
+
+    Returns a datetime64[ns] array of timestamps and a float32 array of values. On PostgreSQL the rows
+    are streamed with COPY and parsed in bulk by NumPy, elsewhere they are fetched as plain tuples;
+    neither path builds a Datapoint object per row.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        return _copy_datapoint_columns(session, dataset_id)
+
+    statement = (
+        select(Datapoint.time, Datapoint.value).where(Datapoint.dataset_id == dataset_id).order_by(col(Datapoint.time))
+    )
+    rows = session.exec(statement).all()
+    if not rows:
+        return np.empty(0, dtype="datetime64[ns]"), np.empty(0, dtype=np.float32)
+
+    times, values = zip(*rows)
+    return np.array(times, dtype="datetime64[ns]"), np.array(values, dtype=np.float32)
+
+
+def load_datapoint_tail(
+    session: Session, dataset_id: int, after: datetime, overlap: int
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Load the datapoints after `after`, preceded by up to `overlap` datapoints up to and including it.
+
+    Returns the time and value columns like load_datapoint_columns, and the number of overlap datapoints
+    at their start.
+    """
+    columns = select(Datapoint.time, Datapoint.value).where(Datapoint.dataset_id == dataset_id)
+    previous = session.exec(
+        columns.where(Datapoint.time <= after).order_by(col(Datapoint.time).desc()).limit(overlap)
+    ).all()
+    new = session.exec(columns.where(Datapoint.time > after).order_by(col(Datapoint.time))).all()
+
+    rows = [*reversed(previous), *new]
+    if not rows:
+        return np.empty(0, dtype="datetime64[ns]"), np.empty(0, dtype=np.float32), 0
+
+    times, values = zip(*rows)
+    return np.array(times, dtype="datetime64[ns]"), np.array(values, dtype=np.float32), len(previous)
+
+
+def _copy_datapoint_columns(session: Session, dataset_id: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Timestamps are sent as integer microseconds since the epoch, which NumPy converts without parsing dates.
+    query = (
+        "COPY (SELECT (EXTRACT(EPOCH FROM time) * 1000000)::bigint, value "
+        f"FROM {Datapoint.__table__.fullname} WHERE dataset_id = {int(dataset_id)} ORDER BY time) "  # type: ignore
+        "TO STDOUT WITH (FORMAT csv)"
+    )
+    buffer = io.StringIO()
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(query, buffer)  # type: ignore
+    finally:
+        cursor.close()
+
+    if not buffer.tell():
+        return np.empty(0, dtype="datetime64[ns]"), np.empty(0, dtype=np.float32)
+
+    buffer.seek(0)
+    columns = np.loadtxt(buffer, delimiter=",", dtype=[("time", np.int64), ("value", np.float32)], ndmin=1)
+    return columns["time"].astype("datetime64[us]").astype("datetime64[ns]"), columns["value"]
+
+
+def sliding_windows(data: torch.Tensor, window_size: int, stride: int) -> torch.Tensor:
+    """
+    All windows of `data` along its first dimension as one strided view, without copying.
+
+    Returns a tensor of shape [num_windows, window_size, *data.shape[1:]].
+    """
+    if len(data) < window_size:
+        return data.new_empty((0, window_size, *data.shape[1:]))
+    # unfold appends the window dimension last; move it right after the window index.
+    return data.unfold(0, window_size, stride).movedim(-1, 1)
+
+
+def create_window_dataloader(
+    dataset: torch.utils.data.Dataset,
+    batch_size: int,
+    shuffle: bool = False,
+    generator: Optional[torch.Generator] = None,
+    drop_last: bool = False,
+) -> DataLoader:
+    """
+    DataLoader that fetches each batch with a single indexing op on the dataset.
+
+    The batch sampler hands the dataset a whole list of indices at once, which the window datasets
+    (and Subsets of them) answer by indexing their window view, instead of collating windows one by one.
+    """
+    sampler = RandomSampler(dataset, generator=generator) if shuffle else SequentialSampler(dataset)  # type: ignore
+    return DataLoader(
+        dataset=dataset,
+        sampler=BatchSampler(sampler, batch_size=batch_size, drop_last=drop_last),
+        batch_size=None,
+    )
 
 
 class DatapointSQLDataset(torch.utils.data.Dataset):
     def __init__(
-        self, session: Session, dataset_id: int, sequence_length: int, stride: int, scaler: Optional[Any] = None
+        self,
+        session: Session,
+        dataset_id: int,
+        sequence_length: int,
+        stride: int,
+        scaler: Optional[Any] = None,
+        cache: Optional["DatasetArrayCache"] = None,
+        fit_scaler: bool = True,
+        after: Optional[datetime] = None,
+        overlap: int = 0,
     ):
         self.session = session
         self.dataset_id = dataset_id
         self.sequence_length = sequence_length
         self.stride = stride
         self.scaler = scaler
+        self.cache = cache
+        # A scaler fitted before, e.g. stored with a trained model, is only applied.
+        self.fit_scaler = fit_scaler
+        # With `after` set, only the datapoints after it are loaded, plus `overlap` datapoints before them.
+        self.after = after
+        self.overlap = overlap
+        self.overlap_count = 0
 
         self._load_data()
 
     def _load_data(self):
         # Load everything to speed up learning over chunking this into a bunch of queries.
         # Database may not be locally available.
-        datapoints = DatapointRepository(session=self.session).get_by_dataset(self.dataset_id)
+        if self.after is not None:
+            timestamps, values, self.overlap_count = load_datapoint_tail(
+                self.session, self.dataset_id, after=self.after, overlap=self.overlap
+            )
+        elif self.cache is not None:
+            timestamps, values = self.cache.load(self.session, self.dataset_id)
+        else:
+            timestamps, values = load_datapoint_columns(self.session, self.dataset_id)
 
         # Handle empty response explicitly as an error, as we cannot continue without some data.
-        if not datapoints:
+        if not len(timestamps):
             dataset_exists = self.session.exec(select(True).where(Dataset.id == self.dataset_id).limit(1)).first()
             if not dataset_exists:
                 raise ValueError(f"Dataset with id={self.dataset_id} does not exist")
             raise ValueError(f"No datapoints found for dataset_id={self.dataset_id}")
 
-        # List to map actual timestamps to each time step for all values.
-        self.timestamps = [datapoint.time for datapoint in datapoints]
+        # Array (datetime64[ns]) to map actual timestamps to each time step for all values.
+        self.timestamps = timestamps
 
         # Normalization
-        values = np.array([datapoint.value for datapoint in datapoints], dtype=np.float32)
         if self.scaler is not None:
             # Log1p to handle zero and near zero values.
             # values = np.log1p(data.reshape(-1, 1))
-            self.values = torch.tensor(self.scaler.fit_transform(values.reshape(-1, 1)).flatten(), dtype=torch.float32)
+            transform = self.scaler.fit_transform if self.fit_scaler else self.scaler.transform
+            self.values = torch.tensor(transform(values.reshape(-1, 1)).flatten(), dtype=torch.float32)
         else:
             # Assume data is already normalized by the caller.
-            self.values = torch.tensor(values, dtype=torch.float32)
+            with warnings.catch_warnings():
+                # Cached values are a read-only memory map, shared instead of copied; they are never written to.
+                warnings.filterwarnings("ignore", message="The given NumPy array is not writable")
+                self.values = torch.from_numpy(values)
 
-        self.num_sequences = max(0, (len(self.values) - self.sequence_length) // self.stride + 1)
+        # View of all sequences, shape [num_sequences, sequence_length, 1]
+        self.windows = sliding_windows(self.values.reshape(-1, 1), self.sequence_length, self.stride)
+        self.num_sequences = len(self.windows)
 
     def __len__(self) -> int:
         return self.num_sequences
 
-    def __getitem__(self, idx: int) -> torch.Tensor:
+    def __getitem__(self, idx: int | Sequence[int]) -> torch.Tensor:
+        if not isinstance(idx, int):
+            # Batch of indices, shape [batch_size, sequence_length, 1]
+            return self.windows[torch.as_tensor(idx)]
+
         if idx < 0 or idx >= self.num_sequences:
             raise IndexError(f"Index {idx} out of range [0, {self.num_sequences})")
 
-        start_idx = idx * self.stride
-        sequence = self.values[start_idx : start_idx + self.sequence_length]
-
-        # Reshape into [sequence_length, 1]
-        return sequence.reshape(-1, 1)
+        # Shape [sequence_length, 1]
+        return self.windows[idx]
 
-    def get_timestamps(self, idx: int) -> list:
+    def get_timestamps(self, idx: int) -> np.ndarray:
         if idx < 0 or idx >= self.num_sequences:
             raise IndexError(f"Index {idx} out of range [0, {self.num_sequences})")
 
@@ -75,12 +211,13 @@ class SlidingWindowDataset(torch.utils.data.Dataset):
         self.stride = window_size - overlap
         self.data = data
         self.data_length = len(self.data)
-        self.num_windows = max(0, (self.data_length - window_size) // self.stride + 1)
+        self.windows = sliding_windows(self.data, self.window_size, self.stride)
+        self.num_windows = len(self.windows)
 
     def __len__(self):
         return self.num_windows
 
     def __getitem__(self, idx):
-        start_idx = idx * self.stride
-        end_idx = start_idx + self.window_size
-        return self.data[start_idx:end_idx]
+        if not isinstance(idx, int):
+            return self.windows[torch.as_tensor(idx)]
+        return self.windows[idx]
@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Deque, Optional
+
+import torch
+from loguru import logger
+
+
+def threads_per_job(concurrency: int, cpu_count: Optional[int] = None) -> int:
+    """Split the machine's cores evenly between `concurrency` jobs, so they do not oversubscribe the CPU."""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return max(1, cpu_count // concurrency)
+
+
+def _init_job_process(num_threads: int):
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only allowed before any inter-op parallel work has started.
+        pass
+
+
+class AnalysisExecutor:
+    """
+    Runs every analysis in its own worker process.
+
+    Each process runs a single job and exits, so jobs do not share a GIL or leak memory into each other,
+    and gets `threads` torch intra-op threads, so `concurrency` jobs together use the machine's cores
+    without oversubscription. Throughput is measured over the last `throughput_window` seconds.
+    """
+
+    def __init__(self, concurrency: int, threads: Optional[int] = None, throughput_window: float = 3600):
+        self.concurrency = concurrency
+        self.threads = threads or threads_per_job(concurrency)
+        self.throughput_window = throughput_window
+
+        self._lock = threading.Lock()
+        self._pool = self._create_pool()
+        self._started_at = time.monotonic()
+        self._finished_at: Deque[float] = deque()
+
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.concurrency,
+            # Fresh interpreters, as forking a process with torch and database connections is unsafe.
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=1,
+            initializer=_init_job_process,
+            initargs=(self.threads,),
+        )
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            try:
+                future = self._pool.submit(fn, *args, **kwargs)
+            except BrokenProcessPool:
+                # A job process died abruptly (e.g. killed for using too much memory); start over.
+                logger.warning("Analysis process pool broke, recreating it")
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._create_pool()
+                future = self._pool.submit(fn, *args, **kwargs)
+            self.running += 1
+        future.add_done_callback(self._record)
+        return future
+
+    def _record(self, future: Future):
+        now = time.monotonic()
+        with self._lock:
+            self.running -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+                self._finished_at.append(now)
+
+    def analyses_per_hour(self) -> float:
+        now = time.monotonic()
+        with self._lock:
+            while self._finished_at and self._finished_at[0] < now - self.throughput_window:
+                self._finished_at.popleft()
+            window = min(self.throughput_window, now - self._started_at)
+            return len(self._finished_at) * 3600 / window if window > 0 else 0.0
+
+    def metrics(self) -> dict:
+        analyses_per_hour = self.analyses_per_hour()
+        with self._lock:
+            return {
+                "concurrency": self.concurrency,
+                "threads_per_job": self.threads,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "analyses_per_hour": round(analyses_per_hour, 2),
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
@@ -1,9 +1,12 @@
+import hashlib
+import json
 import math
 from random import randrange
-from typing import Literal, Optional, Tuple
+from typing import Annotated, Literal, Optional, Tuple
 
 import torch
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+from time_series.outlier_detection.acceleration import ExecutionMode, Precision
 from torch.utils.data import Dataset, Subset
 
 
@@ -26,25 +29,112 @@ class HyperparameterConfig(BaseModel):
     # latent_size: int = Field(default=1, gt=0)
     learning_rate: float = Field(default=1e-3, gt=0.0, le=1.0)
     # num_layers: int = Field(default=2, gt=0)
+    scheduler: Optional[Literal["onecycle", "cosine", "plateau"]] = Field(
+        default=None, description="Learning rate schedule, constant if unset"
+    )
+    lr_scaling: Optional[Literal["linear", "sqrt"]] = Field(
+        default=None, description="Scale the learning rate with batch_size relative to base_batch_size"
+    )
+    base_batch_size: int = Field(default=32, gt=0, description="Batch size the learning rate was tuned for")
+
+    @property
+    def effective_learning_rate(self) -> float:
+        """Learning rate after scaling it for large-batch training."""
+        ratio = self.batch_size / self.base_batch_size
+        match self.lr_scaling:
+            case "linear":
+                return self.learning_rate * ratio
+            case "sqrt":
+                return self.learning_rate * math.sqrt(ratio)
+            case _:
+                return self.learning_rate
+
+    @model_validator(mode="after")
+    def check_effective_learning_rate(self):
+        # learning_rate is bounded on its own, but scaling it up for a large batch_size can push it past the bound.
+        if self.effective_learning_rate > 1.0:
+            raise ValueError(
+                f"learning_rate scaled for batch_size {self.batch_size} is {self.effective_learning_rate:g}, "
+                "which exceeds 1.0; lower learning_rate or raise base_batch_size"
+            )
+        return self
 
 
 class TrainingConfig(BaseModel):
     """Configuration for training settings"""
 
     epochs: int = Field(default=100, gt=0)
-    log_interval: int = Field(default=10, gt=0)
+    log_interval: int = Field(default=10, gt=0, description="Log progress every this many epochs")
+    quiet: bool = Field(default=False, description="Do not log training progress")
+    patience: Optional[int] = Field(
+        default=10, gt=0, description="Stop after this many epochs without test loss improvement"
+    )
+    min_delta: float = Field(default=0.0, ge=0.0, description="Smallest test loss decrease counted as improvement")
+    restore_best: bool = Field(default=True, description="Restore the weights of the epoch with the lowest test loss")
+    time_budget_seconds: Optional[float] = Field(default=None, gt=0, description="Wall-clock limit for training")
+
+
+class ScoringConfig(BaseModel):
+    """Configuration for scoring a dataset with a trained model"""
+
+    batch_size: int = Field(default=1024, gt=0, description="Windows scored per model call")
+    precision: Precision = Field(
+        default="fp32", description="Score in bfloat16 autocast or with an int8 dynamically quantized model"
+    )
+    verify_parity: bool = Field(
+        default=False, description="Also score in fp32 and report how well the outlier masks agree"
+    )
+    threshold_window: Optional[int] = Field(
+        default=None,
+        gt=1,
+        description="Compare each block of this many time steps to its own median and MAD, instead of the whole series",
+    )
+    chunk_size: int = Field(default=1_000_000, gt=0, description="Errors thresholded at once")
+
+
+class GroupingConfig(BaseModel):
+    """Configuration for grouping flagged datapoints into anomaly ranges"""
+
+    max_gap: int = Field(default=0, ge=0, description="Merge ranges separated by at most this many datapoints")
+    min_length: int = Field(default=1, gt=0, description="Drop ranges of fewer datapoints, after merging")
 
 
-class AnalysisConfig(BaseModel):
+class DetectorConfig(BaseModel):
+    """Settings shared by the configurations of every detection method"""
+
+    grouping: GroupingConfig = Field(default_factory=GroupingConfig)
+
+
+class AnalysisConfig(DetectorConfig):
     """Complete analysys configuration."""
 
+    mode: Literal["train", "existing", "incremental"] = Field(
+        default="train",
+        description=(
+            "Train a new model, score with the latest model trained on the dataset with this configuration, "
+            "or score only the datapoints appended since that model last scored the dataset"
+        ),
+    )
     seed: Optional[int] = Field(default=None, gt=0)
     threshold: float = Field(default=3.5, gt=0)
     device: Optional[Literal["cpu", "cuda", "mtia", "xpu", "mps", "hpu"]] = Field(default=None)
+    execution: ExecutionMode = Field(
+        default="eager",
+        description="torch.compile the model for training and scoring, or TorchScript trace it for scoring",
+    )
 
     dataset: DatasetConfig = Field(default_factory=DatasetConfig)
     hyperparameters: HyperparameterConfig = Field(default_factory=HyperparameterConfig)
     training: TrainingConfig = Field(default_factory=TrainingConfig)
+    scoring: ScoringConfig = Field(default_factory=ScoringConfig)
+
+    def model_hash(self) -> str:
+        """Hash of the settings that determine the trained model, to find models reusable with this config."""
+        model_settings = self.model_dump(
+            mode="json",
+            include={"dataset": True, "hyperparameters": True, "training": {"epochs", "patience", "min_delta"}},
+        )
+        return hashlib.sha256(json.dumps(model_settings, sort_keys=True).encode()).hexdigest()
 
     @field_validator("seed", mode="before")
     @classmethod
@@ -65,6 +155,54 @@ class AnalysisConfig(BaseModel):
         return v
 
 
+class RollingZScoreConfig(DetectorConfig):
+    """Configuration for the rolling z-score detector"""
+
+    window: int = Field(default=60, gt=1, description="Datapoints before each datapoint its z-score is relative to")
+    threshold: float = Field(default=3.0, gt=0, description="Standard deviations from the mean flagged as outlier")
+
+
+class HampelConfig(DetectorConfig):
+    """Configuration for the Hampel (rolling median and MAD) detector"""
+
+    window: int = Field(default=31, gt=2, description="Datapoints in the centered window, rounded up to odd")
+    threshold: float = Field(default=3.0, gt=0, description="Scaled MADs from the median flagged as outlier")
+
+
+class SeasonalConfig(DetectorConfig):
+    """Configuration for the seasonal decomposition residual detector"""
+
+    period: int = Field(default=1440, gt=1, description="Datapoints per season, e.g. 1440 for days of minute data")
+    threshold: float = Field(default=3.5, gt=0, description="Scaled MADs of the residual flagged as outlier")
+
+
+class EWMAConfig(DetectorConfig):
+    """Configuration for the EWMA control chart detector"""
+
+    alpha: float = Field(default=0.1, gt=0, le=1, description="Weight of the newest datapoint in the moving average")
+    threshold: float = Field(default=3.0, gt=0, description="Width of the control limits in standard deviations")
+
+
+class IsolationForestConfig(DetectorConfig):
+    """Configuration for the Isolation Forest detector"""
+
+    lags: int = Field(default=5, ge=0, description="Previous values used as features")
+    windows: list[Annotated[int, Field(gt=1)]] = Field(
+        default=[10, 60], description="Lengths of the trailing windows whose mean and standard deviation are features"
+    )
+    n_estimators: int = Field(default=100, gt=0)
+    max_samples: int = Field(default=256, gt=1, description="Datapoints each tree is built from")
+    contamination: Optional[float] = Field(
+        default=0.01, gt=0, le=0.5, description="Expected share of outliers, scikit-learn's 'auto' offset if unset"
+    )
+    fit_samples: int = Field(default=100_000, ge=1000, description="Datapoints sampled to fit the forest on")
+    chunk_size: int = Field(default=100_000, gt=0, description="Datapoints whose features are scored at once")
+    n_jobs: Optional[int] = Field(
+        default=None, description="Threads for fitting and scoring, the job's budget if unset"
+    )
+    seed: Optional[int] = Field(default=None)
+
+
 def create_train_test_split(
     dataset: Dataset, test_size: float = 0.2, shuffle: bool = False, generator: Optional[torch.Generator] = None
 ) -> Tuple[Subset, Subset]:
@@ -0,0 +1,82 @@
+from typing import Iterator
+
+import numpy as np
+import torch
+from sklearn.ensemble import IsolationForest
+from time_series.outlier_detection.helpers import IsolationForestConfig
+
+
+def rolling_features(values: np.ndarray, lags: int, windows: list[int]) -> np.ndarray:
+    """
+    Lag and trailing rolling mean/standard deviation features of each column of a [n, k] series.
+
+    Returns a [n, k * (1 + lags + 2 * len(windows))] array: the values, the `lags` previous values and the mean
+    and standard deviation over each of `windows` datapoints up to and including each datapoint. At the start
+    lags repeat the first value and windows cover the datapoints available.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    n = len(values)
+    index = np.arange(n)
+
+    columns = [values]
+    for lag in range(1, lags + 1):
+        columns.append(values[np.maximum(index - lag, 0)])
+
+    # Window sums from cumulative sums, centered on the first value so the squares keep their precision.
+    shifted = values - values[:1]
+    sums = np.concatenate([np.zeros((1, values.shape[1])), np.cumsum(shifted, axis=0)])
+    squares = np.concatenate([np.zeros((1, values.shape[1])), np.cumsum(shifted**2, axis=0)])
+    for window in windows:
+        start = np.maximum(index + 1 - window, 0)
+        count = (index + 1 - start)[:, None]
+        mean = (sums[index + 1] - sums[start]) / count
+        variance = np.maximum((squares[index + 1] - squares[start]) / count - mean**2, 0.0)
+        columns += [mean + values[:1], np.sqrt(variance)]
+
+    return np.concatenate(columns, axis=1)
+
+
+def feature_chunks(values: np.ndarray, config: IsolationForestConfig) -> Iterator[tuple[int, np.ndarray]]:
+    """
+    Features of the series `config.chunk_size` datapoints at a time, with the start index of each chunk.
+
+    Every chunk is computed with the datapoints its lags and windows reach back to, so the features equal those
+    of the whole series while only one chunk of them is in memory.
+    """
+    context = max([config.lags, *(window - 1 for window in config.windows)])
+    for start in range(0, len(values), config.chunk_size):
+        end = min(start + config.chunk_size, len(values))
+        offset = min(start, context)
+        yield start, rolling_features(values[start - offset : end], config.lags, config.windows)[offset:]
+
+
+def isolation_forest(values: np.ndarray, config: IsolationForestConfig) -> np.ndarray:
+    """
+    Flag outliers with an Isolation Forest fitted on lag and rolling features of the series.
+
+    The forest is fitted on a random sample of at most `config.fit_samples` datapoints, as each tree only sees
+    `max_samples` of them anyway, and every datapoint is scored chunk by chunk. Trees are built and evaluated on
+    `config.n_jobs` threads, by default the torch threads the analysis was given.
+    """
+    rng = np.random.default_rng(config.seed)
+    n = len(values)
+    sample_rate = min(config.fit_samples / n, 1.0) if n else 1.0
+
+    fit_rows = []
+    for _start, features in feature_chunks(values, config):
+        fit_rows.append(features[rng.random(len(features)) < sample_rate])
+
+    forest = IsolationForest(
+        n_estimators=config.n_estimators,
+        max_samples=config.max_samples,
+        contamination=config.contamination if config.contamination is not None else "auto",
+        n_jobs=config.n_jobs if config.n_jobs is not None else torch.get_num_threads(),
+        random_state=config.seed,
+    ).fit(np.concatenate(fit_rows))
+
+    mask = np.zeros(n, dtype=bool)
+    for start, features in feature_chunks(values, config):
+        mask[start : start + len(features)] = forest.predict(features) == -1
+    return mask
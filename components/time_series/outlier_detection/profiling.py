@@ -0,0 +1,39 @@
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+import torch
+
+
+def peak_memory_mb() -> float:
+    """Peak resident memory of the current process, in MiB."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in KiB elsewhere.
+    return max_rss / 1024**2 if sys.platform == "darwin" else max_rss / 1024
+
+
+class JobProfile:
+    """
+    Wall-clock time spent in each stage of an analysis, and the peak memory of the process running it.
+
+    Workers run every analysis in a fresh process, so the peak memory is that of the analysis alone.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 3)
+
+    def to_dict(self) -> dict:
+        metrics = {"timings_seconds": dict(self.timings), "peak_memory_mb": round(peak_memory_mb(), 1)}
+        if torch.cuda.is_available():
+            metrics["peak_cuda_memory_mb"] = round(torch.cuda.max_memory_allocated() / 1024**2, 1)
+        return metrics
@@ -0,0 +1,109 @@
+import io
+import pickle
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+import torch
+from time_series.database import TrainedModel, UnitOfWork
+from time_series.outlier_detection.acceleration import unwrap_model
+from time_series.outlier_detection.helpers import AnalysisConfig
+from time_series.outlier_detection.models import LSTMAutoencoder
+
+
+@dataclass
+class RegisteredModel:
+    """A trained autoencoder loaded from the model registry, with the scaler fitted on its training data."""
+
+    id: int
+    model: LSTMAutoencoder
+    scaler: Optional[Any]
+    last_time: datetime
+    analysis_id: Optional[int]
+    statistics: Optional[dict]
+    boundary: Optional[dict]
+
+
+def serialize_model(model: torch.nn.Module, scaler: Optional[Any]) -> bytes:
+    model = unwrap_model(model)
+    buffer = io.BytesIO()
+    torch.save(
+        {
+            "model_kwargs": {
+                "sequence_length": model.seq_len,
+                "n_features": model.n_features,
+                "internal_size": model.internal_dim,
+                "hidden_size": model.outer_dim,
+            },
+            "model_state_dict": model.state_dict(),
+            # Scalers are scikit-learn objects, which torch.load only accepts pickled separately.
+            "scaler": pickle.dumps(scaler),
+        },
+        buffer,
+    )
+    return buffer.getvalue()
+
+
+def deserialize_model(state: bytes, device: Optional[str] = None) -> tuple[LSTMAutoencoder, Optional[Any]]:
+    # The registry is written by our own workers only, so unpickling the scaler is safe.
+    checkpoint = torch.load(io.BytesIO(state), map_location=device, weights_only=True)
+    model = LSTMAutoencoder(**checkpoint["model_kwargs"])
+    model.load_state_dict(checkpoint["model_state_dict"])
+    return model.to(device), pickle.loads(checkpoint["scaler"])
+
+
+def register_model(
+    uow: UnitOfWork,
+    dataset_id: int,
+    model: torch.nn.Module,
+    scaler: Optional[Any],
+    config: AnalysisConfig,
+    last_time: datetime,
+    analysis_id: Optional[int] = None,
+    statistics: Optional[dict] = None,
+    boundary: Optional[dict] = None,
+) -> TrainedModel:
+    """
+    Store a trained model, so later analyses with the same configuration can score without training.
+
+    Only the latest model of a configuration is ever loaded, so the models it supersedes are deleted.
+    """
+    trained_model = uow.trained_models.create(
+        dataset_id=dataset_id,
+        detection_method="lstmae",
+        config_hash=config.model_hash(),
+        config=config.model_dump(mode="json"),
+        state=serialize_model(model, scaler),
+        last_time=last_time,
+        analysis_id=analysis_id,
+        statistics=statistics,
+        boundary=boundary,
+    )
+    uow.trained_models.delete_superseded(trained_model)
+    return trained_model
+
+
+def load_registered_model(
+    uow: UnitOfWork, dataset_id: int, config: AnalysisConfig, lock: bool = False
+) -> RegisteredModel:
+    """
+    Load the latest model trained on the dataset with the same model configuration.
+
+    With `lock`, its row stays locked until the unit of work commits, see TrainedModelRepository.get_latest.
+    """
+    trained_model = uow.trained_models.get_latest(
+        dataset_id=dataset_id, detection_method="lstmae", config_hash=config.model_hash(), for_update=lock
+    )
+    if trained_model is None:
+        raise ValueError(f"No trained model found for dataset_id={dataset_id} with this configuration")
+
+    model, scaler = deserialize_model(trained_model.state, device=config.device)
+    return RegisteredModel(
+        id=trained_model.id,  # type: ignore
+        model=model,
+        scaler=scaler,
+        last_time=trained_model.last_time,
+        analysis_id=trained_model.analysis_id,
+        statistics=trained_model.statistics,
+        boundary=trained_model.boundary,
+    )
@@ -1,19 +1,29 @@
 import datetime
-from itertools import compress
+from typing import Callable, Optional
 
+import numpy as np
 import torch
 from sklearn.preprocessing import RobustScaler, StandardScaler
 from sqlmodel import Session
 from time_series.database import UnitOfWork, get_engine
-from time_series.database.models import StatusType
+from time_series.database.models import AnomalyType, StatusType
 from time_series.outlier_detection import (
     AnalysisConfig,
     AutoencoderTrainer,
     DatapointSQLDataset,
+    DetectorConfig,
+    GroupingConfig,
     LSTMAutoencoder,
     create_train_test_split,
+    create_window_dataloader,
+    get_dataset_cache,
+    load_datapoint_columns,
 )
-from torch.utils.data import DataLoader, Dataset
+from time_series.outlier_detection.acceleration import autocast, compile_model, quantize_model, trace_model
+from time_series.outlier_detection.profiling import JobProfile
+from time_series.outlier_detection.registry import load_registered_model, register_model
+from time_series.outlier_detection.statistical import detect_outliers
+from torch.utils.data import Dataset
 
 
 def get_scaler(name: str | None):
@@ -30,32 +40,285 @@ def get_scaler(name: str | None):
             raise ValueError(f"Unrecognized scaler: {name}")
 
 
+def describe_error(error: BaseException, max_length: int = 1000) -> str:
+    """Short failure reason to store on an analysis."""
+    return f"{type(error).__name__}: {error}"[:max_length]
+
+
 def run_lstmae_analysis(dataset_id: int, analysis_id: int, config: AnalysisConfig):
+    """
+    Score the dataset with an autoencoder and store the anomalies of the analysis.
+
+    In "train" mode a new model is trained and stored in the model registry. In "existing" mode the latest
+    registered model trained with the same configuration scores the dataset, without any training. In
+    "incremental" mode that model only scores the datapoints appended since it last scored the dataset,
+    see run_incremental_lstmae_analysis.
+
+    On failure the analysis is marked as failed with the reason and the profile of the stages that ran,
+    and the exception is re-raised so the caller can decide whether to retry.
+    """
+    profile = JobProfile()
+    try:
+        with Session(get_engine()) as session, UnitOfWork(session=session) as uow:
+            uow.analyses.update(analysis_id, status=StatusType.processing, error=None, metrics=None)
+            uow.commit()
+
+            if config.mode == "incremental":
+                incremental = run_incremental_lstmae_analysis(session, uow, dataset_id, analysis_id, config, profile)
+                uow.analyses.update(analysis_id, metrics={**profile.to_dict(), **incremental})
+                uow.commit()
+                return
+
+            with profile.stage("load"):
+                # The model stays locked until the persist commit, so an incremental analysis running meanwhile
+                # does not continue from the last scored time and boundary this analysis replaces.
+                registered = (
+                    load_registered_model(uow, dataset_id, config, lock=True) if config.mode == "existing" else None
+                )
+                datapoint_dataset = DatapointSQLDataset(
+                    session=session,
+                    dataset_id=dataset_id,
+                    sequence_length=config.dataset.sequence_length,
+                    stride=config.dataset.stride,
+                    scaler=registered.scaler if registered else get_scaler(config.dataset.normalize),
+                    cache=get_dataset_cache(),
+                    fit_scaler=registered is None,
+                )
+
+            if registered is None:
+
+                def report_progress(progress: dict):
+                    # Lets clients polling the analysis follow training.
+                    uow.analyses.update(analysis_id, metrics={"progress": progress})
+                    uow.commit()
+
+                with profile.stage("train"):
+                    trainer = train_lstmae(datapoint_dataset, config=config, on_epoch_end=report_progress)
+                model = trainer.model
+                training = trainer.summary()
+            else:
+                model = registered.model
+                training = {}
+
+            with profile.stage("score"):
+                _prediction, error = run_lstmae_prediction(datapoint_dataset, model=model, config=config)
+                statistics = outlier_statistics(error)
+                outlier_mask = create_outlier_mask(
+                    error,
+                    threshold=config.threshold,
+                    statistics=statistics,
+                    window=config.scoring.threshold_window,
+                    chunk_size=config.scoring.chunk_size,
+                )
+                last_index = last_scored_index(datapoint_dataset)
+                starts, ends = continue_runs(
+                    outlier_mask[: last_index + 1], boundary=None, max_gap=config.grouping.max_gap
+                )
+
+            parity = None
+            if config.scoring.verify_parity and config.scoring.precision != "fp32":
+                with profile.stage("verify_parity"):
+                    parity = verify_scoring_parity(
+                        datapoint_dataset, model=model, config=config, outlier_mask=outlier_mask
+                    )
+
+            # The anomalies, the model and the completed status are committed together, so a retry never
+            # duplicates them.
+            with profile.stage("persist"):
+                last_time = last_scored_time(datapoint_dataset)
+                boundary = store_runs(
+                    uow,
+                    analysis_id,
+                    timestamps=datapoint_dataset.timestamps[: last_index + 1],
+                    starts=starts,
+                    ends=ends,
+                    boundary=None,
+                    grouping=config.grouping,
+                )
+                if registered is None:
+                    trained_model = register_model(
+                        uow,
+                        dataset_id,
+                        model=model,
+                        scaler=datapoint_dataset.scaler,
+                        config=config,
+                        last_time=last_time,
+                        analysis_id=analysis_id,
+                        statistics=statistics,
+                        boundary=boundary,
+                    )
+                    training["trained_model_id"] = trained_model.id
+                else:
+                    uow.trained_models.update(
+                        registered.id,
+                        last_time=last_time,
+                        analysis_id=analysis_id,
+                        statistics=statistics,
+                        boundary=boundary,
+                    )
+                    training["trained_model_id"] = registered.id
+                uow.analyses.update(analysis_id, status=StatusType.completed)
+                uow.commit()
+
+            metrics = {**profile.to_dict(), "training": training}
+            if parity is not None:
+                metrics["scoring_parity"] = parity
+            uow.analyses.update(analysis_id, metrics=metrics)
+            uow.commit()
+    except Exception as e:
+        record_failure(analysis_id, error=e, profile=profile)
+        raise
+
+
+def record_failure(analysis_id: int, error: BaseException, profile: JobProfile):
+    """Mark the analysis as failed with the reason and the profile of the stages that ran."""
     with Session(get_engine()) as session, UnitOfWork(session=session) as uow:
-        uow.analyses.update(analysis_id, status=StatusType.processing)
+        uow.analyses.update(
+            analysis_id, status=StatusType.error, error=describe_error(error), metrics=profile.to_dict()
+        )
         uow.commit()
 
+
+def run_statistical_analysis(dataset_id: int, analysis_id: int, config: DetectorConfig):
+    """
+    Flag outliers with the statistical detector the configuration is for and store the anomalies of the analysis.
+
+    Failures are recorded and re-raised like in run_lstmae_analysis.
+    """
+    profile = JobProfile()
+    try:
+        with Session(get_engine()) as session, UnitOfWork(session=session) as uow:
+            uow.analyses.update(analysis_id, status=StatusType.processing, error=None, metrics=None)
+            uow.commit()
+
+            with profile.stage("load"):
+                cache = get_dataset_cache()
+                if cache is not None:
+                    timestamps, values = cache.load(session, dataset_id)
+                else:
+                    timestamps, values = load_datapoint_columns(session, dataset_id)
+                if not len(timestamps):
+                    raise ValueError(f"No datapoints found for dataset_id={dataset_id}")
+
+            with profile.stage("score"):
+                outlier_mask = detect_outliers(values, config)
+                anomalies = group_anomalies(
+                    analysis_id, timestamps=timestamps, outlier_mask=outlier_mask, **config.grouping.model_dump()
+                )
+
+            with profile.stage("persist"):
+                uow.anomalies.bulk_create(anomalies)
+                uow.analyses.update(analysis_id, status=StatusType.completed)
+                uow.commit()
+
+            uow.analyses.update(analysis_id, metrics={**profile.to_dict(), "outliers": int(outlier_mask.sum())})
+            uow.commit()
+    except Exception as e:
+        record_failure(analysis_id, error=e, profile=profile)
+        raise
+
+
+def run_incremental_lstmae_analysis(
+    session: Session,
+    uow: UnitOfWork,
+    dataset_id: int,
+    analysis_id: int,
+    config: AnalysisConfig,
+    profile: JobProfile,
+) -> dict:
+    """
+    Score only the datapoints appended since the registered model last scored the dataset.
+
+    The new datapoints are scored together with the `sequence_length - 1` datapoints before them, so every
+    new datapoint is covered by full windows, and flagged against the median and MAD of the log errors stored
+    with the model, so the threshold matches that of the full scoring. Only the new anomalies are stored with
+    the analysis, which links to the analysis that scored the dataset before it, and the run at the boundary
+    stored with the model is continued like in a full scoring with the same grouping, see continue_runs, its
+    range moving to this analysis. So the cost does not grow with the anomaly history. If the earlier analysis
+    was deleted, so was the boundary range, and scoring continues without a boundary.
+
+    Returns the metrics to store on the analysis, besides its profile.
+    """
+    with profile.stage("load"):
+        # Locked until the persist commit, so concurrent analyses with the model never score the same datapoints.
+        registered = load_registered_model(uow, dataset_id, config, lock=True)
+        if registered.statistics is None:
+            raise ValueError(
+                f"Trained model with id={registered.id} has no stored scoring statistics, score the whole dataset "
+                "in existing mode first"
+            )
+        # The foreign key clears analysis_id when the earlier analysis is deleted, but not the boundary.
+        previous = uow.analyses.get_by_id(registered.analysis_id) if registered.analysis_id is not None else None
+        boundary = registered.boundary if previous is not None else None
         datapoint_dataset = DatapointSQLDataset(
             session=session,
             dataset_id=dataset_id,
             sequence_length=config.dataset.sequence_length,
             stride=config.dataset.stride,
-            scaler=get_scaler(config.dataset.normalize),
+            scaler=registered.scaler,
+            fit_scaler=False,
+            after=registered.last_time,
+            # At least the last scored datapoint, which locates the boundary when nothing else overlaps.
+            overlap=max(config.dataset.sequence_length - 1, 1),
         )
 
-        trainer = train_lstmae(datapoint_dataset, config=config)
-        _prediction, error = run_lstmae_prediction(datapoint_dataset, model=trainer.model, config=config)
-        outlier_mask = create_outlier_mask(error, threshold=config.threshold)
-        anomalies = group_anomalies(analysis_id, timestamps=datapoint_dataset.timestamps, outlier_mask=outlier_mask)
-
-        uow.anomalies.bulk_create(anomalies)
+    overlap_count = datapoint_dataset.overlap_count
+    new_datapoints = len(datapoint_dataset.timestamps) - overlap_count
+
+    # Until enough datapoints were appended to fill a window past the overlap, nothing is scored and they wait
+    # for the next run.
+    scored = bool(new_datapoints and len(datapoint_dataset)) and last_scored_index(datapoint_dataset) >= overlap_count
+
+    with profile.stage("score"):
+        last_time = registered.last_time
+        if scored:
+            _prediction, error = run_lstmae_prediction(datapoint_dataset, model=registered.model, config=config)
+            outlier_mask = create_outlier_mask(error, threshold=config.threshold, statistics=registered.statistics)
+            # The overlap datapoints were flagged by the previous analysis already.
+            new = slice(overlap_count, last_scored_index(datapoint_dataset) + 1)
+            starts, ends = continue_runs(outlier_mask[new], boundary=boundary, max_gap=config.grouping.max_gap)
+            last_time = last_scored_time(datapoint_dataset)
+
+    with profile.stage("persist"):
+        if scored:
+            boundary = store_runs(
+                uow,
+                analysis_id,
+                timestamps=datapoint_dataset.timestamps[new],
+                starts=starts,
+                ends=ends,
+                boundary=boundary,
+                grouping=config.grouping,
+            )
+        uow.trained_models.update(registered.id, last_time=last_time, analysis_id=analysis_id, boundary=boundary)
+        uow.analyses.update(
+            analysis_id, status=StatusType.completed, previous_analysis_id=previous.id if previous else None
+        )
         uow.commit()
 
-        uow.analyses.update(analysis_id, status=StatusType.completed)
-        uow.commit()
+    return {
+        "training": {"trained_model_id": registered.id},
+        "incremental": {
+            "new_datapoints": new_datapoints,
+            "overlap_datapoints": overlap_count,
+            "scored": scored,
+        },
+    }
+
 
+def last_scored_index(dp_ds: DatapointSQLDataset) -> int:
+    """Index of the last datapoint covered by a window."""
+    if not len(dp_ds):
+        raise ValueError(f"Dataset with id={dp_ds.dataset_id} has fewer datapoints than the sequence length")
+    return (len(dp_ds) - 1) * dp_ds.stride + dp_ds.sequence_length - 1
 
-def train_lstmae(dataset: Dataset, config: AnalysisConfig):
+
+def last_scored_time(dp_ds: DatapointSQLDataset) -> datetime.datetime:
+    """Time of the last datapoint covered by a window, which later incremental analyses continue from."""
+    return dp_ds.timestamps[last_scored_index(dp_ds)].astype("datetime64[us]").item()
+
+
+def train_lstmae(dataset: Dataset, config: AnalysisConfig, on_epoch_end: Optional[Callable[[dict], None]] = None):
     generator = torch.Generator(config.device).manual_seed(config.seed) if config.seed else None
 
     train_dataset, test_dataset = create_train_test_split(
@@ -76,18 +339,28 @@ def train_lstmae(dataset: Dataset, config: AnalysisConfig):
         model=model,
         device=config.device,
         epochs=config.training.epochs,
-        learning_rate=config.hyperparameters.learning_rate,
+        learning_rate=config.hyperparameters.effective_learning_rate,
         log_interval=config.training.log_interval,
+        patience=config.training.patience,
+        min_delta=config.training.min_delta,
+        restore_best=config.training.restore_best,
+        time_budget=config.training.time_budget_seconds,
+        scheduler=config.hyperparameters.scheduler,
+        on_epoch_end=on_epoch_end,
+        quiet=config.training.quiet,
     )
 
-    train_dataloader = DataLoader(
+    if config.execution == "compile":
+        trainer.model = compile_model(trainer.model, example=example_batch(dataset, config).to(config.device))
+
+    train_dataloader = create_window_dataloader(
         dataset=train_dataset,
         batch_size=config.hyperparameters.batch_size,
         shuffle=config.dataset.shuffle,
         generator=generator,
     )
 
-    test_dataloader = DataLoader(
+    test_dataloader = create_window_dataloader(
         dataset=test_dataset,
         batch_size=config.hyperparameters.batch_size,
         shuffle=config.dataset.shuffle,
@@ -99,86 +372,273 @@ def train_lstmae(dataset: Dataset, config: AnalysisConfig):
     return trainer
 
 
-def run_lstmae_prediction(dp_ds: DatapointSQLDataset, model: torch.nn.Module, config: AnalysisConfig):
-    predictions_list = []
-
-    model.eval()
-    with torch.no_grad():
-        for idx in range(len(dp_ds)):
-            actual = dp_ds[idx].unsqueeze(0)  # shape: [1, n, 1]
+def example_batch(dataset: Dataset, config: AnalysisConfig) -> torch.Tensor:
+    """A batch of the first windows, to compile or trace the model with."""
+    return dataset[list(range(min(config.hyperparameters.batch_size, len(dataset))))]  # type: ignore
 
-            prediction = model(actual)
-            predictions_list.append(prediction)
 
-    predictions = torch.cat(predictions_list)
+def run_lstmae_prediction(dp_ds: DatapointSQLDataset, model: torch.nn.Module, config: AnalysisConfig):
+    """
+    Reconstruct every window and average the overlapping predictions and errors per time step.
 
+    Time steps not covered by any window (the tail left over when the stride does not divide the series)
+    get NaN.
+    """
     n_timesteps = len(dp_ds.timestamps)
-    pred_counts = torch.zeros(n_timesteps)
-    pred_sums = torch.zeros(n_timesteps)
-    error_sums = torch.zeros(n_timesteps)
-
-    for idx in range(len(dp_ds)):
-        start_idx = idx
-        end_idx = start_idx + config.dataset.sequence_length
-
-        actual_seq = dp_ds[idx].squeeze()  # shape: [sequence_length]
-        pred_seq = predictions[idx].squeeze()  # shape: [sequence_length]
-
-        error_seq = torch.abs(actual_seq - pred_seq)
-
-        pred_sums[start_idx:end_idx] += pred_seq
-        error_sums[start_idx:end_idx] += error_seq
-        pred_counts[start_idx:end_idx] += 1
-
-    averaged_prediction = pred_sums / pred_counts
-    averaged_error = error_sums / pred_counts
-
-    return averaged_prediction, averaged_error
+    pred_counts = torch.zeros(n_timesteps, device=config.device)
+    pred_sums = torch.zeros(n_timesteps, device=config.device)
+    error_sums = torch.zeros(n_timesteps, device=config.device)
 
+    # Position of each element of a window relative to the window start.
+    offsets = torch.arange(dp_ds.sequence_length, device=config.device)
 
-def create_outlier_mask(error, threshold: float = 3.5):
-    log_error = torch.log(error + 1e-6)
-
-    median = torch.median(log_error)
-    mad = torch.median(torch.abs(log_error - median))
-    # z-score against 75th percentile
-    modified_z_scores = 0.6745 * (log_error - median) / (mad + 1e-8)
+    # Score many windows per model call and stream each batch into the overlap-add accumulators.
+    dataloader = create_window_dataloader(dataset=dp_ds, batch_size=config.scoring.batch_size)
 
-    outlier_mask = torch.abs(modified_z_scores) > threshold
+    model.to(config.device)
+    model.eval()
+    window_idx = 0
+    with torch.no_grad():
+        if config.scoring.precision == "int8":
+            model = quantize_model(model, device=config.device)
 
-    return outlier_mask
+        match config.execution:
+            case "compile":
+                model = compile_model(model, example=example_batch(dp_ds, config).to(config.device))
+            case "trace":
+                model = trace_model(model, example=example_batch(dp_ds, config).to(config.device))
 
+        for batch in dataloader:
+            actual = batch.to(config.device)  # shape: [batch_size, sequence_length, 1]
+            with autocast(config.scoring.precision, device=config.device):
+                prediction = model(actual).float()
 
-def group_anomalies(analysis_id: int, timestamps: list[datetime.datetime], outlier_mask):
-    distance = timestamps[1] - timestamps[0]
-    outlier_timestamps = list(compress(timestamps, outlier_mask))
-    group_outlier_timestamps = group_timestamps(outlier_timestamps, distance=distance)
+            actual_seqs = actual.squeeze(-1)  # shape: [batch_size, sequence_length]
+            pred_seqs = prediction.squeeze(-1)  # shape: [batch_size, sequence_length]
+            error_seqs = torch.abs(actual_seqs - pred_seqs)
 
-    def to_anomaly_dict(start: datetime.datetime, end: datetime.datetime):
-        return {"analysis_id": analysis_id, "start": start, "end": end, "type": "point"}
+            # Time step of every element in the batch, shape: [batch_size * sequence_length]
+            starts = torch.arange(window_idx, window_idx + len(batch), device=config.device) * dp_ds.stride
+            positions = (starts[:, None] + offsets).flatten()
 
-    anomalies = list(map(lambda args: to_anomaly_dict(*args), group_outlier_timestamps))
-    return anomalies
+            pred_sums.index_add_(0, positions, pred_seqs.flatten())
+            error_sums.index_add_(0, positions, error_seqs.flatten())
+            pred_counts.index_add_(0, positions, torch.ones_like(positions, dtype=pred_counts.dtype))
+            window_idx += len(batch)
 
+    averaged_prediction = (pred_sums / pred_counts).cpu()
+    averaged_error = (error_sums / pred_counts).cpu()
 
-def group_timestamps(
-    timestamps: list[datetime.datetime], distance: datetime.timedelta
-) -> list[tuple[datetime.datetime, datetime.datetime]]:
-    if not timestamps:
-        return []
+    return averaged_prediction, averaged_error
 
-    groups = []
-    start = timestamps[0]
-    end = timestamps[0]
 
-    for i in range(1, len(timestamps)):
-        if timestamps[i] - timestamps[i - 1] == distance:
-            end = timestamps[i]
-        else:
-            groups.append((start, end))
-            start = timestamps[i]
-            end = timestamps[i]
+def outlier_statistics(error) -> dict:
+    """Median and MAD of the log reconstruction errors, which the outlier threshold is relative to."""
+    log_error = torch.log(error + 1e-6)
+    # NaN marks time steps without a score; they are ignored.
+    median = torch.nanmedian(log_error)
+    mad = torch.nanmedian(torch.abs(log_error - median))
+    return {"median": float(median), "mad": float(mad)}
+
+
+def windowed_statistics(error, window: int) -> tuple[torch.Tensor, torch.Tensor]:
+    """Median and MAD of the log errors of every block of `window` time steps, repeated for each time step."""
+    log_error = torch.log(torch.as_tensor(error) + 1e-6)
+    # NaN padding fills the last block, and is ignored like unscored time steps.
+    padding = -len(log_error) % window
+    blocks = torch.nn.functional.pad(log_error, (0, padding), value=float("nan")).reshape(-1, window)
+    median = torch.nanmedian(blocks, dim=1, keepdim=True).values
+    mad = torch.nanmedian(torch.abs(blocks - median), dim=1, keepdim=True).values
+    return (
+        median.expand_as(blocks).flatten()[: len(log_error)],
+        mad.expand_as(blocks).flatten()[: len(log_error)],
+    )
 
-    groups.append((start, end))
 
-    return groups
+def create_outlier_mask(
+    error,
+    threshold: float = 3.5,
+    statistics: Optional[dict] = None,
+    window: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+):
+    """
+    Flag time steps whose log error is more than `threshold` modified z-scores from the median.
+
+    The median and MAD are those of `error` itself, unless `statistics` from outlier_statistics are given,
+    e.g. those of the full scoring when only newly appended datapoints are scored. With a `window`, every block
+    of that many time steps is compared to its own median and MAD instead, so the threshold follows changes
+    in the error level. Scores are computed `chunk_size` time steps at a time, to bound their temporaries.
+    """
+    error = torch.as_tensor(error)
+    if window is not None:
+        median, mad = windowed_statistics(error, window)
+    else:
+        if statistics is None:
+            statistics = outlier_statistics(error)
+        median, mad = statistics["median"], statistics["mad"]
+
+    chunk_size = chunk_size or max(len(error), 1)
+    masks = []
+    for start in range(0, len(error), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        log_error = torch.log(error[chunk] + 1e-6)
+        chunk_median = median[chunk] if window is not None else median
+        chunk_mad = mad[chunk] if window is not None else mad
+        # z-score against 75th percentile
+        modified_z_scores = 0.6745 * (log_error - chunk_median) / (chunk_mad + 1e-8)
+        # NaN marks time steps without a score; they are never flagged.
+        masks.append(torch.abs(modified_z_scores) > threshold)
+
+    return torch.cat(masks) if masks else torch.zeros(0, dtype=torch.bool)
+
+
+def compare_outlier_masks(reference, candidate) -> dict:
+    """How well an outlier mask agrees with a reference mask, e.g. fp32 scores versus reduced precision."""
+    reference = torch.as_tensor(reference, dtype=torch.bool)
+    candidate = torch.as_tensor(candidate, dtype=torch.bool)
+    union = int((reference | candidate).sum())
+    return {
+        "agreement": float((reference == candidate).float().mean()),
+        "jaccard": int((reference & candidate).sum()) / union if union else 1.0,
+        "reference_outliers": int(reference.sum()),
+        "outliers": int(candidate.sum()),
+    }
+
+
+def verify_scoring_parity(dp_ds: DatapointSQLDataset, model: torch.nn.Module, config: AnalysisConfig, outlier_mask):
+    """Score again in fp32 and compare the outlier masks, to check a reduced precision mode is safe."""
+    reference_config = config.model_copy(update={"scoring": config.scoring.model_copy(update={"precision": "fp32"})})
+    _prediction, reference_error = run_lstmae_prediction(dp_ds, model=model, config=reference_config)
+    reference_mask = create_outlier_mask(
+        reference_error, threshold=config.threshold, window=config.scoring.threshold_window
+    )
+    return compare_outlier_masks(reference_mask, outlier_mask)
+
+
+def group_anomalies(
+    analysis_id: int, timestamps: np.ndarray, outlier_mask, max_gap: int = 0, min_length: int = 1
+) -> list[dict]:
+    """
+    Anomaly ranges of the runs of consecutive flagged datapoints, see group_runs.
+
+    Runs are consecutive in datapoint order rather than at a fixed time distance, so irregularly sampled series
+    and gaps in the data do not split them.
+    """
+    starts, ends = group_runs(outlier_mask, max_gap=max_gap, min_length=min_length)
+    start_times = timestamps[starts].astype("datetime64[us]").tolist()
+    end_times = timestamps[ends].astype("datetime64[us]").tolist()
+    return [
+        {"analysis_id": analysis_id, "start": start, "end": end, "type": "point"}
+        for start, end in zip(start_times, end_times)
+    ]
+
+
+def group_runs(outlier_mask, max_gap: int = 0, min_length: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    """
+    First and last index of every run of True in the mask.
+
+    Runs separated by at most `max_gap` unflagged datapoints are merged, and runs of fewer than `min_length`
+    datapoints, counted after merging, are dropped.
+    """
+    starts, ends = merge_runs(*find_runs(outlier_mask), max_gap=max_gap)
+
+    if min_length > 1:
+        long_enough = ends - starts + 1 >= min_length
+        starts, ends = starts[long_enough], ends[long_enough]
+
+    return starts, ends
+
+
+def find_runs(outlier_mask) -> tuple[np.ndarray, np.ndarray]:
+    """First and last index of every run of consecutive True in the mask."""
+    mask = np.asarray(outlier_mask, dtype=bool)
+    # +1 where a run starts and -1 one past where it ends.
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1
+
+
+def merge_runs(starts: np.ndarray, ends: np.ndarray, max_gap: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Merge the runs separated by at most `max_gap` datapoints, and runs that are adjacent."""
+    if len(starts) > 1:
+        separate = starts[1:] - ends[:-1] - 1 > max_gap
+        starts = starts[np.concatenate([[True], separate])]
+        ends = ends[np.concatenate([separate, [True]])]
+    return starts, ends
+
+
+def continue_runs(outlier_mask, boundary: Optional[dict], max_gap: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Runs of the mask merged like in group_runs, continuing the run at the `boundary` of an earlier scoring.
+
+    The boundary run is placed at negative indices, `trailing` datapoints before the mask, so a run within
+    `max_gap` datapoints of it across the boundary is merged into it and the length of the merged run counts
+    the datapoints on both sides, like in a full scoring. Short runs are not dropped yet, see store_runs.
+    """
+    starts, ends = find_runs(outlier_mask)
+    if boundary is not None:
+        starts = np.concatenate([[-boundary["length"] - boundary["trailing"]], starts])
+        ends = np.concatenate([[-boundary["trailing"] - 1], ends])
+    return merge_runs(starts, ends, max_gap=max_gap)
+
+
+def store_runs(
+    uow: UnitOfWork,
+    analysis_id: int,
+    timestamps: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    boundary: Optional[dict],
+    grouping: GroupingConfig,
+) -> Optional[dict]:
+    """
+    Store the anomaly ranges of the runs from continue_runs of at least `min_length` datapoints, and return the
+    boundary to store with the model.
+
+    `timestamps` are those of the scored datapoints, up to the last scored one. A run at negative indices
+    continues the boundary run: its stored range is extended and moved to the analysis, so every range is held
+    by the analysis that scored its end, or stored with the analysis if it was not stored before. The last run
+    is the new boundary while it is within `max_gap` datapoints of the last scored datapoint, since a later
+    incremental analysis may still continue it.
+    """
+    times = timestamps.astype("datetime64[us]")
+    lengths = ends - starts + 1
+    keep = lengths >= grouping.min_length
+    continued = boundary is not None and len(starts) > 0 and starts[0] < 0
+    first = int(continued)
+
+    start_times = times[np.maximum(starts, 0)].tolist()
+    end_times = times[np.maximum(ends, 0)].tolist()
+
+    # Id of the stored range of the last run, if any.
+    anomaly_id = None
+    if continued:
+        start_times[0] = datetime.datetime.fromisoformat(boundary["start"])  # type: ignore
+        anomaly_id = boundary["anomaly_id"]  # type: ignore
+        # A boundary run with no datapoint past the boundary is unchanged.
+        if ends[0] >= 0 and keep[0]:
+            extended = None
+            if anomaly_id is not None:
+                extended = uow.anomalies.update(anomaly_id, analysis_id=analysis_id, end=end_times[0])
+            # Not stored yet because it was too short, or deleted along with the earlier analysis.
+            if extended is None:
+                anomaly_id = uow.anomalies.create(analysis_id, start_times[0], end_times[0], AnomalyType.point).id
+
+    anomalies = [
+        {"analysis_id": analysis_id, "start": start_times[i], "end": end_times[i], "type": "point"}
+        for i in np.flatnonzero(keep[first:]) + first
+    ]
+    if len(starts) > first:
+        # The last run is not the boundary run, it is stored on its own for its id.
+        anomaly_id = uow.anomalies.create(**anomalies.pop()).id if keep[-1] else None
+    uow.anomalies.bulk_create(anomalies)
+
+    trailing = len(timestamps) - 1 - int(ends[-1]) if len(starts) else None
+    if trailing is None or trailing > grouping.max_gap:
+        return None
+    return {
+        "start": start_times[-1].isoformat(),
+        "length": int(lengths[-1]),
+        "trailing": trailing,
+        "anomaly_id": anomaly_id,
+    }
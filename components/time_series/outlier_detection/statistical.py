@@ -0,0 +1,141 @@
+from typing import Dict, Type
+
+import numpy as np
+from scipy.signal import lfilter
+from time_series.outlier_detection.helpers import (
+    DetectorConfig,
+    EWMAConfig,
+    HampelConfig,
+    IsolationForestConfig,
+    RollingZScoreConfig,
+    SeasonalConfig,
+)
+from time_series.outlier_detection.isolation_forest import isolation_forest
+
+# Scales the MAD of normally distributed data to its standard deviation.
+MAD_SCALE = 1.4826
+
+# Upper bound on the elements of the window views reduced at once, to bound memory on long series.
+CHUNK_ELEMENTS = 1 << 22
+
+
+def _deviations(difference: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Absolute deviations in units of `scale`; infinite where the scale is 0 and the difference is not."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.abs(difference) / scale
+
+
+def rolling_zscore(values: np.ndarray, window: int, threshold: float) -> np.ndarray:
+    """
+    Flag datapoints more than `threshold` standard deviations from the mean of the `window` datapoints before them.
+
+    The first `window` datapoints have no full window before them and are never flagged.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    mask = np.zeros(len(values), dtype=bool)
+    if len(values) <= window:
+        return mask
+
+    # The window [i - window, i) before each datapoint from `window` on. The mean and variance are reduced per
+    # window rather than from differences of cumulative sums, which leave a rounding residue on flat stretches
+    # following varied data and flag them against a variance of 0.
+    windows = np.lib.stride_tricks.sliding_window_view(values[:-1], window)
+    chunk = max(CHUNK_ELEMENTS // window, 1)
+    for start in range(0, len(windows), chunk):
+        part = windows[start : start + chunk]
+        index = slice(window + start, window + start + len(part))
+        mask[index] = _deviations(values[index] - part.mean(axis=1), part.std(axis=1)) > threshold
+    return mask
+
+
+def rolling_median(values: np.ndarray, window: int) -> np.ndarray:
+    """Median of the centered `window` datapoints around each datapoint, with the series reflected at its ends."""
+    half = window // 2
+    padded = np.pad(values, half, mode="reflect" if len(values) > half else "edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1)
+    chunk = max(CHUNK_ELEMENTS // windows.shape[1], 1)
+    return np.concatenate([np.median(windows[i : i + chunk], axis=1) for i in range(0, len(windows), chunk)])
+
+
+def hampel(values: np.ndarray, window: int, threshold: float) -> np.ndarray:
+    """Flag datapoints more than `threshold` scaled MADs from the median of the centered window around them."""
+    values = np.asarray(values, dtype=np.float64)
+    median = rolling_median(values, window)
+    mad = rolling_median(np.abs(values - median), window)
+    return _deviations(values - median, MAD_SCALE * mad) > threshold
+
+
+def centered_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean of the centered `window` datapoints around each datapoint, over fewer datapoints at the ends."""
+    sums = np.concatenate([[0.0], np.cumsum(values)])
+    index = np.arange(len(values))
+    start = np.clip(index - window // 2, 0, len(values))
+    end = np.clip(index - window // 2 + window, 0, len(values))
+    return (sums[end] - sums[start]) / (end - start)
+
+
+def seasonal_residual(values: np.ndarray, period: int, threshold: float) -> np.ndarray:
+    """
+    Flag datapoints whose residual after removing trend and seasonality is more than `threshold` scaled MADs
+    from the median residual.
+
+    The trend is the centered moving average over one period and the seasonal component the mean detrended value
+    at each position in the period, like a classical additive decomposition.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    detrended = values - centered_mean(values, period)
+    phase = np.arange(len(values)) % period
+    seasonal = np.bincount(phase, weights=detrended, minlength=period) / np.maximum(
+        np.bincount(phase, minlength=period), 1
+    )
+    residual = detrended - seasonal[phase]
+
+    median = np.median(residual)
+    mad = np.median(np.abs(residual - median))
+    return _deviations(residual - median, MAD_SCALE * mad) > threshold
+
+
+def ewma(values: np.ndarray, alpha: float, threshold: float) -> np.ndarray:
+    """
+    EWMA control chart: flag datapoints where the exponentially weighted moving average leaves the control limits.
+
+    The center line and standard deviation are the median and scaled MAD of the series, and the limits are
+    `threshold` standard deviations of the EWMA statistic, which narrow towards their asymptote at the start.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    center = np.median(values)
+    sigma = MAD_SCALE * np.median(np.abs(values - center))
+
+    # z_t = alpha * x_t + (1 - alpha) * z_(t-1), starting from the center line.
+    statistic, _ = lfilter([alpha], [1.0, alpha - 1.0], values, zi=[(1.0 - alpha) * center])
+    steps = np.arange(1, len(values) + 1)
+    limit = sigma * np.sqrt(alpha / (2.0 - alpha) * (1.0 - (1.0 - alpha) ** (2 * steps)))
+    return _deviations(statistic - center, limit) > threshold
+
+
+# Detection methods computing an outlier mask from the values without a neural network, and the configuration
+# each of them takes.
+STATISTICAL_DETECTORS: Dict[str, Type[DetectorConfig]] = {
+    "zscore": RollingZScoreConfig,
+    "hampel": HampelConfig,
+    "seasonal": SeasonalConfig,
+    "ewma": EWMAConfig,
+    "iforest": IsolationForestConfig,
+}
+
+
+def detect_outliers(values: np.ndarray, config: DetectorConfig) -> np.ndarray:
+    """Outlier mask of the values with the statistical detector the configuration is for."""
+    match config:
+        case RollingZScoreConfig():
+            return rolling_zscore(values, window=config.window, threshold=config.threshold)
+        case HampelConfig():
+            return hampel(values, window=config.window, threshold=config.threshold)
+        case SeasonalConfig():
+            return seasonal_residual(values, period=config.period, threshold=config.threshold)
+        case EWMAConfig():
+            return ewma(values, alpha=config.alpha, threshold=config.threshold)
+        case IsolationForestConfig():
+            return isolation_forest(values, config)
+        case _:
+            raise ValueError(f"Unsupported detector configuration: {type(config).__name__}")
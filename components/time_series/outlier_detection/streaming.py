@@ -0,0 +1,216 @@
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+import numpy as np
+import torch
+from sqlmodel import Session, col, select
+from time_series.database import Datapoint, TrainedModel, UnitOfWork
+from time_series.database.models import Analysis
+from time_series.outlier_detection.datasets import sliding_windows
+from time_series.outlier_detection.helpers import AnalysisConfig
+from time_series.outlier_detection.registry import load_registered_model
+
+
+class StreamingScorer:
+    """
+    Scores a live stream of datapoints of one dataset with a trained autoencoder.
+
+    The last `sequence_length` datapoints are kept in memory, and every incoming datapoint is reconstructed in
+    the one window ending at it, so each datapoint costs O(sequence_length) work regardless of the size of the
+    dataset. Like batch scoring with a stride of 1, the error of a datapoint is averaged over the
+    `sequence_length` windows covering it and flagged against the median and MAD stored with the model, which
+    are those of such averaged errors. A datapoint is therefore scored `sequence_length - 1` datapoints after it
+    arrives, once the last window covering it is reconstructed.
+    """
+
+    def __init__(
+        self,
+        dataset_id: int,
+        model: torch.nn.Module,
+        scaler: Optional[Any],
+        sequence_length: int,
+        statistics: dict,
+        threshold: float = 3.5,
+        device: str = "cpu",
+        model_id: Optional[int] = None,
+    ):
+        self.dataset_id = dataset_id
+        self.model = model.to(device).eval()
+        self.scaler = scaler
+        self.sequence_length = sequence_length
+        self.statistics = statistics
+        self.threshold = threshold
+        self.device = device
+        # Id of the registered model, see streaming_model_id.
+        self.model_id = model_id
+
+        self.times: deque[datetime] = deque(maxlen=sequence_length)
+        self.values: deque[float] = deque(maxlen=sequence_length)
+        # Error sums of the datapoints of the last window over the windows reconstructed so far, oldest first,
+        # and the time and value of the streamed datapoints among them, which are scored once it is complete.
+        self.error_sums = np.zeros(sequence_length)
+        self.pending: deque[tuple[datetime, float]] = deque()
+        # Start and last time of the anomaly range the stream is in, if any.
+        self.anomaly: Optional[tuple[datetime, datetime]] = None
+        # Micro-batches of the same dataset may arrive concurrently.
+        self.lock = threading.Lock()
+
+    def prime(self, times: Sequence[datetime], values: Sequence[float]):
+        """Fill the window with stored datapoints, without scoring them."""
+        with self.lock:
+            self.times.extend(times)
+            self.values.extend(self._scale(values))
+
+    def update(self, times: Sequence[datetime], values: Sequence[float]) -> list[dict]:
+        """
+        Score a micro-batch of datapoints in time order and return the anomaly events it caused.
+
+        An "open" event is emitted for every flagged datapoint with the range it extends, and a "closed" event
+        with the final range once a datapoint is no longer flagged. Events are about the datapoints scored
+        with this batch, the `sequence_length - 1` last ones waiting for their remaining windows. Datapoints
+        arriving before the window is full are not scored.
+        """
+        if len(times) != len(values):
+            raise ValueError("times and values must have the same length")
+        if not len(times):
+            return []
+
+        with self.lock:
+            if any(later <= earlier for earlier, later in zip(times, times[1:])) or (
+                self.times and times[0] <= self.times[-1]
+            ):
+                raise ValueError("Datapoints must be newer than the previous ones and in time order")
+
+            history = list(self.values)[1 - self.sequence_length :] if self.sequence_length > 1 else []
+            scaled = self._scale(values)
+            series = torch.tensor([*history, *scaled], dtype=torch.float32).reshape(-1, 1)
+            # The windows ending at each new datapoint, one per datapoint once the window has filled.
+            windows = sliding_windows(series, self.sequence_length, stride=1)
+            errors = self._errors(windows)
+
+            unscored = len(times) - len(errors)
+            events = []
+            for time, value, window_errors in zip(times[unscored:], values[unscored:], errors):
+                # The datapoints move one position back in the new window, and the oldest one leaves it.
+                self.error_sums = np.append(self.error_sums[1:], 0.0) + window_errors
+                self.pending.append((time, value))
+                if len(self.pending) < self.sequence_length:
+                    continue
+                # The oldest datapoint of the window has been reconstructed in every window covering it.
+                time, value = self.pending.popleft()
+                score = self._score(self.error_sums[0] / self.sequence_length)
+                if abs(score) > self.threshold:
+                    start = self.anomaly[0] if self.anomaly else time
+                    self.anomaly = (start, time)
+                    events.append(self._event("open", value=value, score=score))
+                elif self.anomaly is not None:
+                    events.append(self._event("closed"))
+                    self.anomaly = None
+
+            self.times.extend(times)
+            self.values.extend(scaled)
+            return events
+
+    def _scale(self, values: Sequence[float]) -> list[float]:
+        if self.scaler is None or not len(values):
+            return [float(value) for value in values]
+        return self.scaler.transform(np.asarray(values, dtype=np.float32).reshape(-1, 1)).flatten().tolist()
+
+    def _errors(self, windows: torch.Tensor) -> np.ndarray:
+        """Absolute reconstruction errors of every time step of each window, shape [windows, sequence_length]."""
+        if not len(windows):
+            return np.zeros((0, self.sequence_length))
+        windows = windows.to(self.device)
+        with torch.no_grad():
+            prediction = self.model(windows)
+        return torch.abs(windows - prediction)[..., 0].cpu().numpy()
+
+    def _score(self, error: float) -> float:
+        """Modified z-score of the log reconstruction error."""
+        log_error = np.log(error + 1e-6)
+        return float(0.6745 * (log_error - self.statistics["median"]) / (self.statistics["mad"] + 1e-8))
+
+    def _event(self, status: str, value: Optional[float] = None, score: Optional[float] = None) -> dict:
+        start, end = self.anomaly  # type: ignore
+        event = {"dataset_id": self.dataset_id, "status": status, "start": start, "end": end}
+        if value is not None:
+            event |= {"value": float(value), "score": score}
+        return event
+
+
+def load_latest_datapoints(session: Session, dataset_id: int, count: int) -> tuple[list[datetime], list[float]]:
+    """The `count` latest datapoints of a dataset, in time order."""
+    if count <= 0:
+        return [], []
+    statement = (
+        select(Datapoint.time, Datapoint.value)
+        .where(Datapoint.dataset_id == dataset_id)
+        .order_by(col(Datapoint.time).desc())
+        .limit(count)
+    )
+    rows = list(reversed(session.exec(statement).all()))
+    return [time for time, _value in rows], [value for _time, value in rows]
+
+
+def streaming_analysis(uow: UnitOfWork, analysis_id: int) -> tuple[Analysis, AnalysisConfig]:
+    """The analysis to stream with and its configuration."""
+    analysis = uow.analyses.get_by_id(analysis_id)
+    if analysis is None:
+        raise ValueError(f"Analysis with id={analysis_id} does not exist")
+    if analysis.detection_method != "lstmae":
+        raise ValueError(f"Streaming is not supported for detection method {analysis.detection_method}")
+    return analysis, AnalysisConfig.model_validate(analysis.config or {})
+
+
+def streaming_model_id(session: Session, analysis_id: int) -> int:
+    """
+    Id of the model load_streaming_scorer would load, without loading it.
+
+    It changes when the model is retrained, so a scorer loaded earlier is stale. Later analyses scoring the
+    dataset with the same model leave it unchanged, and the scorer keeps the datapoints waiting for a score and
+    the anomaly range it is in.
+    """
+    analysis, config = streaming_analysis(UnitOfWork(session=session), analysis_id)
+    statement = (
+        select(TrainedModel.id)
+        .where(
+            TrainedModel.dataset_id == analysis.dataset_id,
+            TrainedModel.detection_method == "lstmae",
+            TrainedModel.config_hash == config.model_hash(),
+        )
+        .order_by(col(TrainedModel.id).desc())
+        .limit(1)
+    )
+    trained_model_id = session.exec(statement).first()
+    if trained_model_id is None:
+        raise ValueError(f"No trained model found for dataset_id={analysis.dataset_id} with this configuration")
+    return trained_model_id
+
+
+def load_streaming_scorer(session: Session, analysis_id: int) -> StreamingScorer:
+    """
+    Streaming scorer with the model and configuration of an analysis, primed with the latest stored datapoints.
+
+    The model is the latest one registered for the dataset of the analysis with its configuration, which needs
+    scoring statistics from a completed analysis.
+    """
+    uow = UnitOfWork(session=session)
+    analysis, config = streaming_analysis(uow, analysis_id)
+    registered = load_registered_model(uow, analysis.dataset_id, config)
+    if registered.statistics is None:
+        raise ValueError(f"Trained model with id={registered.id} has no stored scoring statistics")
+
+    scorer = StreamingScorer(
+        dataset_id=analysis.dataset_id,
+        model=registered.model,
+        scaler=registered.scaler,
+        sequence_length=config.dataset.sequence_length,
+        statistics=registered.statistics,
+        threshold=config.threshold,
+        device=config.device,
+        model_id=registered.id,
+    )
+    scorer.prime(*load_latest_datapoints(session, analysis.dataset_id, count=config.dataset.sequence_length - 1))
+    return scorer
@@ -1,12 +1,27 @@
-from typing import Optional
+import time
+from typing import Callable, Dict, Literal, Optional
 
 import torch
+from loguru import logger
 from torch import nn, optim
 from torch.utils.data import DataLoader
 
 
 class AutoencoderTrainer:
-    """Trainer class for autoencoder models."""
+    """
+    Trainer class for autoencoder models.
+
+    With `patience` set, training stops once the test loss has not improved by more than `min_delta` for
+    `patience` epochs, and with `time_budget` set, once the next epoch would exceed that many seconds.
+    The weights of the epoch with the lowest test loss are restored afterwards, unless `restore_best`
+    is disabled.
+
+    `scheduler` anneals the learning rate over the run: "onecycle" warms up to `learning_rate` and anneals
+    per batch, "cosine" anneals per epoch and "plateau" reduces it when the test loss stops improving.
+
+    Losses are accumulated on the device and synced once per epoch. After every epoch the progress is
+    passed to `on_epoch_end`, and logged every `log_interval` epochs unless `quiet` is set.
+    """
 
     def __init__(
         self,
@@ -16,6 +31,13 @@ class AutoencoderTrainer:
         epochs: int,
         learning_rate: float,
         log_interval: int,
+        patience: Optional[int] = None,
+        min_delta: float = 0.0,
+        restore_best: bool = True,
+        time_budget: Optional[float] = None,
+        scheduler: Optional[Literal["onecycle", "cosine", "plateau"]] = None,
+        on_epoch_end: Optional[Callable[[dict], None]] = None,
+        quiet: bool = False,
     ):
         self.device = device
         self.model = model.to(device)
@@ -23,6 +45,14 @@ class AutoencoderTrainer:
         self.epochs = epochs
         self.learning_rate = learning_rate
         self.log_interval = log_interval
+        self.patience = patience
+        self.min_delta = min_delta
+        self.restore_best = restore_best
+        self.time_budget = time_budget
+        self.scheduler_name = scheduler
+        self.on_epoch_end = on_epoch_end
+        self.quiet = quiet
+        self.scheduler: Optional[optim.lr_scheduler.LRScheduler] = None
 
         self.loss_fn = nn.MSELoss()
         self.optimizer = optim.Adam(self.model.parameters(), lr=self.learning_rate)
@@ -30,14 +60,20 @@ class AutoencoderTrainer:
         self.train_losses: list[float] = []
         self.test_losses: list[float] = []
 
+        self.best_epoch: Optional[int] = None
+        self.stop_reason: Optional[str] = None
+        self.training_seconds = 0.0
+        self._best_loss = float("inf")
+        self._best_state: Optional[Dict[str, torch.Tensor]] = None
+
     def train_epoch(self, dataloader: DataLoader) -> float:
         """Train for one epoch."""
         # Enable dropout and batch normalization.
         self.model.train()
-        train_loss = 0.0
-        size = len(dataloader.dataset)  # type: ignore
+        # Kept on the device, so batches do not wait on a host sync.
+        train_loss = torch.zeros((), device=self.device)
 
-        for batch_idx, batch in enumerate(dataloader):
+        for batch in dataloader:
             batch = batch.to(self.device)
 
             # Forward pass
@@ -48,46 +84,126 @@ class AutoencoderTrainer:
             # Backward pass
             loss.backward()
             self.optimizer.step()
+            if isinstance(self.scheduler, optim.lr_scheduler.OneCycleLR):
+                self.scheduler.step()
 
-            train_loss += loss.item()
+            train_loss += loss.detach()
 
-            # Logging
-            if batch_idx % self.log_interval == 0:
-                current = (batch_idx + 1) * len(batch)
-                print(f"loss: {loss.item():>7f} [{current:>5d}/{size:>5d}]")
-
-        avg_loss = train_loss / len(dataloader)
-        return avg_loss
+        return train_loss.item() / len(dataloader)
 
     def test_epoch(self, dataloader: DataLoader) -> float:
         """Evaluate on test set."""
         self.model.eval()
-        test_loss = 0.0
+        test_loss = torch.zeros((), device=self.device)
 
         with torch.no_grad():
             for batch in dataloader:
                 batch = batch.to(self.device)
                 pred = self.model(batch)
-                test_loss += self.loss_fn(pred, batch).item()
-        avg_loss = test_loss / len(dataloader)
-        print(f"Test Error: \n Avg loss: {avg_loss:>8f} \n")
-        return avg_loss
+                test_loss += self.loss_fn(pred, batch)
+        return test_loss.item() / len(dataloader)
 
     def fit(
         self, train_dataloader: DataLoader, test_dataloader: Optional[DataLoader] = None, epochs: Optional[int] = None
     ):
         epochs = epochs or self.epochs
-        for epoch in range(1, epochs + 1):
-            print(f"Epoch {epoch}\n-------------------------------")
+        self.stop_reason = None
+        self.scheduler = self._create_scheduler(epochs=epochs, steps_per_epoch=len(train_dataloader))
+        start = time.perf_counter()
 
+        for epoch in range(1, epochs + 1):
             train_loss = self.train_epoch(train_dataloader)
             self.train_losses.append(train_loss)
 
             if test_dataloader is not None:
                 test_loss = self.test_epoch(test_dataloader)
                 self.test_losses.append(test_loss)
-
-        print("Training complete!")
+                self._track_best(test_loss)
+
+            if isinstance(self.scheduler, optim.lr_scheduler.ReduceLROnPlateau):
+                self.scheduler.step(self.test_losses[-1] if self.test_losses else train_loss)
+            elif isinstance(self.scheduler, optim.lr_scheduler.CosineAnnealingLR):
+                self.scheduler.step()
+
+            self.training_seconds = time.perf_counter() - start
+            if epoch < epochs:
+                self.stop_reason = self._stop_reason(seconds_per_epoch=self.training_seconds / epoch)
+            self._report_progress(epoch, epochs)
+            if self.stop_reason is not None:
+                break
+
+        if self.restore_best and self._best_state is not None:
+            self.model.load_state_dict(self._best_state)
+
+        if not self.quiet:
+            logger.info(
+                f"Training finished after {self.epochs_run}/{epochs} epochs in {self.training_seconds:.1f}s"
+                + (f", stopped early on {self.stop_reason}" if self.stop_reason else "")
+            )
+
+    def progress(self, epoch: int, epochs: int) -> dict:
+        return {
+            "epoch": epoch,
+            "epochs": epochs,
+            "train_loss": self.train_losses[-1],
+            "test_loss": self.test_losses[-1] if self.test_losses else None,
+            "learning_rate": self.optimizer.param_groups[0]["lr"],
+            "elapsed_seconds": round(self.training_seconds, 3),
+        }
+
+    def _report_progress(self, epoch: int, epochs: int):
+        progress = self.progress(epoch, epochs)
+        if self.on_epoch_end is not None:
+            self.on_epoch_end(progress)
+        if not self.quiet and (epoch % self.log_interval == 0 or epoch == epochs or self.stop_reason is not None):
+            test_loss = f"{progress['test_loss']:.6f}" if progress["test_loss"] is not None else "-"
+            logger.info(f"Epoch {epoch}/{epochs}: train loss {progress['train_loss']:.6f}, test loss {test_loss}")
+
+    def _create_scheduler(self, epochs: int, steps_per_epoch: int):
+        match self.scheduler_name:
+            case "onecycle":
+                return optim.lr_scheduler.OneCycleLR(
+                    self.optimizer, max_lr=self.learning_rate, epochs=epochs, steps_per_epoch=max(steps_per_epoch, 1)
+                )
+            case "cosine":
+                return optim.lr_scheduler.CosineAnnealingLR(self.optimizer, T_max=epochs)
+            case "plateau":
+                return optim.lr_scheduler.ReduceLROnPlateau(self.optimizer, factor=0.5, patience=3)
+            case None:
+                return None
+            case _:
+                raise ValueError(f"Unrecognized scheduler: {self.scheduler_name}")
+
+    def _track_best(self, test_loss: float):
+        if test_loss < self._best_loss - self.min_delta:
+            self._best_loss = test_loss
+            self.best_epoch = len(self.test_losses)
+            self._best_state = {key: value.detach().clone() for key, value in self.model.state_dict().items()}
+
+    def _stop_reason(self, seconds_per_epoch: float) -> Optional[str]:
+        if self.patience is not None and self.best_epoch is not None:
+            if len(self.test_losses) - self.best_epoch >= self.patience:
+                return "patience"
+        if self.time_budget is not None and self.training_seconds + seconds_per_epoch > self.time_budget:
+            return "time_budget"
+        return None
+
+    @property
+    def epochs_run(self) -> int:
+        return len(self.train_losses)
+
+    def summary(self) -> dict:
+        """Epochs actually run, and the training time saved compared to running all configured epochs."""
+        seconds_per_epoch = self.training_seconds / self.epochs_run if self.epochs_run else 0.0
+        return {
+            "epochs": self.epochs,
+            "epochs_run": self.epochs_run,
+            "best_epoch": self.best_epoch,
+            "stop_reason": self.stop_reason,
+            "training_seconds": round(self.training_seconds, 3),
+            "time_saved_seconds": round(max(self.epochs - self.epochs_run, 0) * seconds_per_epoch, 3),
+            "final_learning_rate": self.optimizer.param_groups[0]["lr"],
+        }
 
     def save_model(self, path: str):
         """Save model checkpoint"""
@@ -100,7 +216,7 @@ class AutoencoderTrainer:
             },
             path,
         )
-        print(f"Model saved to {path}")
+        logger.info(f"Model saved to {path}")
 
     def load_model(self, path: str):
         """Load model checkpoint"""
@@ -109,4 +225,4 @@ class AutoencoderTrainer:
         self.optimizer.load_state_dict(checkpoint["optimizer_state_dict"])
         self.train_losses = checkpoint.get("train_losses", [])
         self.test_losses = checkpoint.get("test_losses", [])
-        print(f"Model loaded from {path}")
+        logger.info(f"Model loaded from {path}")
@@ -0,0 +1,212 @@
+import json
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+import torch
+from loguru import logger
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlmodel import Session
+from time_series.database import UnitOfWork, get_engine
+from time_series.outlier_detection.executor import AnalysisExecutor
+from time_series.outlier_detection.helpers import AnalysisConfig
+from time_series.outlier_detection.run import describe_error, run_lstmae_analysis, run_statistical_analysis
+from time_series.outlier_detection.statistical import STATISTICAL_DETECTORS
+from time_series.settings import get_outlier_detection_settings
+
+# Detection methods the workers execute; analyses of other methods are left alone.
+DETECTION_METHODS = ["lstmae", *STATISTICAL_DETECTORS]
+
+# Failures worth another attempt: lost database connections, running out of memory or the job process
+# being killed, e.g. because other analyses were using the machine at the same time, and jobs cancelled
+# before they ran when the process pool was shut down or recreated.
+RETRYABLE_ERRORS = (DBAPIError, BrokenProcessPool, MemoryError, torch.OutOfMemoryError, CancelledError)
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, DBAPIError):
+        # Errors such as constraint violations or bad statements fail the same way every time.
+        return error.connection_invalidated or isinstance(error, OperationalError)
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+def run_analysis_job(analysis_id: int):
+    """Run a claimed analysis with the configuration stored on it."""
+    with Session(get_engine()) as session:
+        analysis = UnitOfWork(session=session).analyses.get_by_id(analysis_id)
+        if analysis is None:
+            raise ValueError(f"Analysis with id={analysis_id} does not exist")
+        dataset_id, detection_method, config = analysis.dataset_id, analysis.detection_method, analysis.config
+
+    match detection_method:
+        case "lstmae":
+            run_lstmae_analysis(
+                dataset_id=dataset_id, analysis_id=analysis_id, config=AnalysisConfig.model_validate(config or {})
+            )
+        case method if method in STATISTICAL_DETECTORS:
+            run_statistical_analysis(
+                dataset_id=dataset_id,
+                analysis_id=analysis_id,
+                config=STATISTICAL_DETECTORS[method].model_validate(config or {}),
+            )
+        case _:
+            raise ValueError(f"Unsupported detection method: {detection_method}")
+
+
+class AnalysisWorker:
+    """
+    Claims pending analyses from the database and runs up to `concurrency` of them at once, each in its own
+    process with `threads_per_job` torch threads (by default the cores divided by `concurrency`).
+
+    Running analyses get a heartbeat every `heartbeat_interval` seconds. Analyses left in processing
+    without a heartbeat for `stale_after` seconds, e.g. because their worker was killed, and analyses
+    failing with a transient error are requeued until they used `max_attempts` attempts.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 1,
+        poll_interval: float = 5,
+        heartbeat_interval: float = 30,
+        stale_after: float = 300,
+        max_attempts: int = 3,
+        threads_per_job: Optional[int] = None,
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+
+        self.executor = AnalysisExecutor(concurrency=concurrency, threads=threads_per_job)
+        self._running: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def run(self):
+        logger.info(
+            f"Analysis worker started with concurrency={self.concurrency}, threads_per_job={self.executor.threads}"
+        )
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="analysis-heartbeat", daemon=True)
+        heartbeat.start()
+
+        last_recovery = float("-inf")
+        while not self._stop.is_set():
+            if time.monotonic() - last_recovery >= self.heartbeat_interval:
+                self.recover_stale()
+                last_recovery = time.monotonic()
+
+            if not self.fill():
+                self._stop.wait(self.poll_interval)
+
+        logger.info("Analysis worker stopping, waiting for running analyses")
+        self.executor.shutdown(wait=True)
+
+    def stop(self):
+        self._stop.set()
+
+    def fill(self) -> int:
+        """Claim and start analyses until every slot is busy or the queue is empty."""
+        started = 0
+        while len(self._running) < self.concurrency:
+            analysis_id = self.claim()
+            if analysis_id is None:
+                break
+            self.submit(analysis_id)
+            started += 1
+        return started
+
+    def claim(self) -> Optional[int]:
+        with Session(get_engine()) as session, UnitOfWork(session=session) as uow:
+            analysis = uow.analyses.claim_pending(DETECTION_METHODS)
+            analysis_id = analysis.id if analysis else None
+            uow.commit()
+        return analysis_id
+
+    def submit(self, analysis_id: int):
+        logger.info(f"Starting analysis {analysis_id}")
+        with self._lock:
+            future = self.executor.submit(run_analysis_job, analysis_id)
+            self._running[analysis_id] = future
+        future.add_done_callback(lambda done: self._finish(analysis_id, done))
+
+    def recover_stale(self):
+        with Session(get_engine()) as session, UnitOfWork(session=session) as uow:
+            analyses = uow.analyses.recover_stale(
+                stale_after=timedelta(seconds=self.stale_after), max_attempts=self.max_attempts
+            )
+            for analysis in analyses:
+                logger.warning(f"Analysis {analysis.id} stopped sending heartbeats, marked as {analysis.status.value}")
+            uow.commit()
+
+    def _finish(self, analysis_id: int, future: Future):
+        with self._lock:
+            self._running.pop(analysis_id, None)
+
+        # exception() raises for a cancelled job instead of returning.
+        error = CancelledError("Cancelled before it ran") if future.cancelled() else future.exception()
+        if error is None:
+            logger.info(f"Analysis {analysis_id} completed, {self.executor.analyses_per_hour():.1f} analyses/hour")
+            return
+
+        with Session(get_engine()) as session, UnitOfWork(session=session) as uow:
+            analysis = uow.analyses.fail(
+                analysis_id, error=describe_error(error), max_attempts=self.max_attempts, retry=is_retryable(error)
+            )
+            uow.commit()
+            status = analysis.status.value if analysis else "missing"
+        logger.opt(exception=error).error(f"Analysis {analysis_id} failed, marked as {status}")
+
+    def _heartbeat_loop(self):
+        # Keeps beating after stop() until the running analyses have finished.
+        while not (self._stop.is_set() and not self._running):
+            time.sleep(self.heartbeat_interval)
+            with self._lock:
+                analysis_ids = list(self._running)
+            if not analysis_ids:
+                continue
+            try:
+                with Session(get_engine()) as session, UnitOfWork(session=session) as uow:
+                    uow.analyses.heartbeat(analysis_ids)
+                    uow.commit()
+            except Exception:
+                logger.exception("Failed to send heartbeat")
+
+
+def serve_metrics(worker: AnalysisWorker, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve the worker's executor metrics as JSON on /metrics from a background thread."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = json.dumps(worker.executor.metrics()).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="worker-metrics", daemon=True).start()
+    return server
+
+
+def create_worker() -> AnalysisWorker:
+    settings = get_outlier_detection_settings()
+    return AnalysisWorker(
+        concurrency=settings.worker_concurrency,
+        poll_interval=settings.worker_poll_interval_seconds,
+        heartbeat_interval=settings.worker_heartbeat_interval_seconds,
+        stale_after=settings.worker_stale_after_seconds,
+        max_attempts=settings.max_attempts,
+        threads_per_job=settings.worker_threads_per_job,
+    )
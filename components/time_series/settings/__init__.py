@@ -1,15 +1,23 @@
 from time_series.settings.config import (
     DatabaseSettings,
     Environment,
+    ForecastingSettings,
+    OutlierDetectionSettings,
     Settings,
     get_database_settings,
+    get_forecasting_settings,
+    get_outlier_detection_settings,
     get_settings,
 )
 
 __all__ = [
     "Environment",
     "DatabaseSettings",
+    "ForecastingSettings",
+    "OutlierDetectionSettings",
     "Settings",
     "get_database_settings",
+    "get_forecasting_settings",
+    "get_outlier_detection_settings",
     "get_settings",
 ]
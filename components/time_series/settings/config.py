@@ -1,5 +1,6 @@
 from enum import Enum
 from functools import lru_cache
+from typing import Optional
 
 from pydantic import PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -58,6 +59,46 @@ class Settings(BaseSettings):
     default_page_size: int = 100
 
 
+class ForecastingSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env", env_prefix="forecasting_", case_sensitive=False, extra="ignore")
+
+    # Periodic forecasting of stored datasets, disabled unless an interval is set.
+    schedule_interval_minutes: Optional[int] = None
+    schedule_dataset_ids: list[int] = []
+    schedule_model_name: str = "lstm_energy_weather"
+    schedule_city: str = "London"
+
+    # Model inference runs on its own bounded pool instead of the server threadpool.
+    inference_workers: int = 1
+    inference_queue_size: int = 32
+
+    weather_cache_ttl_seconds: float = 1800
+    weather_timeout_seconds: float = 10
+    # Serve this fixed temperature instead of querying the weather service, e.g. in tests.
+    weather_static_temperature: Optional[float] = None
+
+
+class OutlierDetectionSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env", env_prefix="outlier_detection_", case_sensitive=False, extra="ignore"
+    )
+
+    # Directory for memory-mapped copies of dataset columns, disabled unless set.
+    cache_dir: Optional[str] = None
+
+    # Analysis workers
+    worker_concurrency: int = 1
+    # Torch threads per analysis process, by default the cores divided by worker_concurrency.
+    worker_threads_per_job: Optional[int] = None
+    # Port for the worker's /metrics endpoint, disabled unless set.
+    worker_metrics_port: Optional[int] = None
+    worker_poll_interval_seconds: float = 5
+    worker_heartbeat_interval_seconds: float = 30
+    # Processing analyses without a heartbeat for this long are requeued, or failed after max_attempts.
+    worker_stale_after_seconds: float = 300
+    max_attempts: int = 3
+
+
 @lru_cache
 def get_settings(*args, **kwargs):
     return Settings(*args, **kwargs)
@@ -66,3 +107,13 @@ def get_settings(*args, **kwargs):
 @lru_cache
 def get_database_settings(*args, **kwargs):
     return DatabaseSettings(*args, **kwargs)
+
+
+@lru_cache
+def get_forecasting_settings(*args, **kwargs):
+    return ForecastingSettings(*args, **kwargs)
+
+
+@lru_cache
+def get_outlier_detection_settings(*args, **kwargs):
+    return OutlierDetectionSettings(*args, **kwargs)
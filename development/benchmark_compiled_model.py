@@ -0,0 +1,90 @@
+"""
+Compare eager, torch.compile and TorchScript traced execution of the LSTM autoencoder on CPU.
+
+Reports the median time of a training step (forward, backward and optimizer step) and of scoring a
+batch, per batch size. Compilation time is reported separately, as it is paid once per analysis.
+
+    python development/benchmark_compiled_model.py --batch-sizes 32 256 1024
+"""
+
+import argparse
+import statistics
+import time
+
+import torch
+from time_series.outlier_detection import LSTMAutoencoder
+from time_series.outlier_detection.acceleration import compile_model, trace_model
+
+
+def median_seconds(fn, repeats: int) -> float:
+    fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def train_step_seconds(model: torch.nn.Module, batch: torch.Tensor, repeats: int) -> float:
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
+    loss_fn = torch.nn.MSELoss()
+    model.train()
+
+    def step():
+        optimizer.zero_grad()
+        loss = loss_fn(model(batch), batch)
+        loss.backward()
+        optimizer.step()
+
+    return median_seconds(step, repeats)
+
+
+def inference_seconds(model: torch.nn.Module, batch: torch.Tensor, repeats: int) -> float:
+    model.eval()
+    with torch.no_grad():
+        return median_seconds(lambda: model(batch), repeats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32, 256, 1024])
+    parser.add_argument("--sequence-length", type=int, default=32)
+    parser.add_argument("--hidden-size", type=int, default=32)
+    parser.add_argument("--internal-size", type=int, default=16)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'batch':>6} {'mode':<8} {'setup s':>8} {'train ms':>9} {'speedup':>8} {'score ms':>9} {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        torch.manual_seed(0)
+        batch = torch.randn(batch_size, args.sequence_length, 1)
+        eager = LSTMAutoencoder(args.sequence_length, 1, args.internal_size, args.hidden_size)
+
+        baseline_train = train_step_seconds(eager, batch, args.repeats)
+        baseline_score = inference_seconds(eager, batch, args.repeats)
+        print(f"{batch_size:>6} {'eager':<8} {0:>8.2f} {baseline_train * 1e3:>9.2f} {1:>8.2f} ", end="")
+        print(f"{baseline_score * 1e3:>9.2f} {1:>8.2f}")
+
+        for mode in ("compile", "trace"):
+            start = time.perf_counter()
+            if mode == "compile":
+                model = compile_model(eager.train(), batch)
+                # Scoring runs without gradients, which needs its own graph.
+                with torch.no_grad():
+                    model.eval()(batch)
+            else:
+                model = trace_model(eager, batch)
+            setup = time.perf_counter() - start
+
+            score = inference_seconds(model, batch, args.repeats)
+            train = train_step_seconds(model, batch, args.repeats) if mode == "compile" else None
+            train_columns = (
+                f"{train * 1e3:>9.2f} {baseline_train / train:>8.2f}" if train is not None else f"{'-':>9} {'-':>8}"
+            )
+            print(f"{batch_size:>6} {mode:<8} {setup:>8.2f} {train_columns} ", end="")
+            print(f"{score * 1e3:>9.2f} {baseline_score / score:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compare learning rate schedules and large-batch training for the LSTM autoencoder.
+
+Trains on a synthetic seasonal series with injected spikes and reports, per configuration, the epochs
+run (with early stopping), training time, best test loss and how well the spikes are detected.
+
+    python development/benchmark_lr_schedules.py --length 5000 --epochs 50
+"""
+
+import argparse
+import time
+
+import numpy as np
+import torch
+from synthetic_series import SyntheticDataset, make_series
+from time_series.outlier_detection import AnalysisConfig
+from time_series.outlier_detection.run import create_outlier_mask, run_lstmae_prediction, train_lstmae
+
+CONFIGS = {
+    "bs32 constant": {"batch_size": 32},
+    "bs256 constant": {"batch_size": 256},
+    "bs256 linear": {"batch_size": 256, "lr_scaling": "linear"},
+    "bs256 sqrt onecycle": {"batch_size": 256, "lr_scaling": "sqrt", "scheduler": "onecycle"},
+    "bs256 sqrt cosine": {"batch_size": 256, "lr_scaling": "sqrt", "scheduler": "cosine"},
+    "bs256 sqrt plateau": {"batch_size": 256, "lr_scaling": "sqrt", "scheduler": "plateau"},
+    "bs1024 sqrt onecycle": {"batch_size": 1024, "lr_scaling": "sqrt", "scheduler": "onecycle"},
+}
+
+
+def f1_score(predicted: np.ndarray, labels: np.ndarray) -> float:
+    true_positives = np.sum(predicted & labels)
+    precision = true_positives / max(predicted.sum(), 1)
+    recall = true_positives / max(labels.sum(), 1)
+    return 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--length", type=int, default=5000)
+    parser.add_argument("--anomalies", type=int, default=10)
+    parser.add_argument("--sequence-length", type=int, default=32)
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    values, labels = make_series(args.length, args.anomalies, args.seed)
+    dataset = SyntheticDataset(values, args.sequence_length)
+
+    print(f"{'config':<22} {'lr':>8} {'epochs':>6} {'train s':>8} {'s/epoch':>8} {'test loss':>10} {'F1':>5}")
+    for name, hyperparameters in CONFIGS.items():
+        torch.manual_seed(args.seed)
+        config = AnalysisConfig(
+            seed=args.seed,
+            device="cpu",
+            dataset={"sequence_length": args.sequence_length},
+            hyperparameters=hyperparameters,
+            training={"epochs": args.epochs, "quiet": True},
+        )
+
+        start = time.perf_counter()
+        trainer = train_lstmae(dataset, config=config)
+        train_seconds = time.perf_counter() - start
+
+        _prediction, error = run_lstmae_prediction(dataset, model=trainer.model, config=config)  # type: ignore
+        outlier_mask = create_outlier_mask(error, threshold=config.threshold).numpy()
+
+        print(
+            f"{name:<22} {config.hyperparameters.effective_learning_rate:>8.4f} {trainer.epochs_run:>6d} "
+            f"{train_seconds:>8.2f} {train_seconds / trainer.epochs_run:>8.3f} {min(trainer.test_losses):>10.6f} "
+            f"{f1_score(outlier_mask, labels):>5.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
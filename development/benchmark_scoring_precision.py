@@ -0,0 +1,67 @@
+"""
+Compare fp32, bfloat16 autocast and int8 dynamically quantized scoring of the LSTM autoencoder on CPU.
+
+Trains a model on a synthetic series with injected spikes, scores the series in every precision and
+reports the scoring throughput and how well the outlier masks agree with the fp32 mask.
+
+    python development/benchmark_scoring_precision.py --length 50000 --hidden-size 128
+"""
+
+import argparse
+import time
+
+import torch
+from synthetic_series import SyntheticDataset, make_series
+from time_series.outlier_detection import AnalysisConfig
+from time_series.outlier_detection.run import (
+    compare_outlier_masks,
+    create_outlier_mask,
+    run_lstmae_prediction,
+    train_lstmae,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--length", type=int, default=20000)
+    parser.add_argument("--sequence-length", type=int, default=32)
+    parser.add_argument("--hidden-size", type=int, default=32)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    torch.manual_seed(args.seed)
+    values, _labels = make_series(args.length, n_anomalies=max(args.length // 500, 1), seed=args.seed)
+    dataset = SyntheticDataset(values, args.sequence_length)
+    config = AnalysisConfig(
+        seed=args.seed,
+        device="cpu",
+        dataset={"sequence_length": args.sequence_length},
+        hyperparameters={"batch_size": 256, "hidden_size": args.hidden_size, "internal_size": args.hidden_size // 2},
+        training={"epochs": args.epochs, "quiet": True},
+    )
+    model = train_lstmae(dataset, config=config).model
+
+    reference_mask = None
+    reference_seconds = None
+    print(f"{'precision':<10} {'score s':>8} {'windows/s':>10} {'speedup':>8} {'agreement':>10} {'jaccard':>8}")
+    for precision in ("fp32", "bf16", "int8"):
+        scoring_config = config.model_copy(
+            update={"scoring": config.scoring.model_copy(update={"precision": precision})}
+        )
+        start = time.perf_counter()
+        _prediction, error = run_lstmae_prediction(dataset, model=model, config=scoring_config)  # type: ignore
+        seconds = time.perf_counter() - start
+        mask = create_outlier_mask(error, threshold=config.threshold)
+
+        if reference_mask is None:
+            reference_mask, reference_seconds = mask, seconds
+        parity = compare_outlier_masks(reference_mask, mask)
+        print(
+            f"{precision:<10} {seconds:>8.2f} {len(dataset) / seconds:>10.0f} {reference_seconds / seconds:>8.2f} "
+            f"{parity['agreement']:>10.5f} {parity['jaccard']:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
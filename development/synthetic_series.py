@@ -0,0 +1,28 @@
+"""Synthetic series with injected spikes, shared by the benchmarks in this directory."""
+
+import numpy as np
+import torch
+from time_series.outlier_detection import SlidingWindowDataset
+
+
+class SyntheticDataset(SlidingWindowDataset):
+    """Sliding windows over an in-memory series, shaped like DatapointSQLDataset for scoring."""
+
+    def __init__(self, values: np.ndarray, sequence_length: int):
+        super().__init__(
+            torch.from_numpy(values).unsqueeze(-1), window_size=sequence_length, overlap=sequence_length - 1
+        )
+        self.sequence_length = sequence_length
+        self.timestamps = np.arange(len(values))
+
+
+def make_series(length: int, n_anomalies: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """A seasonal series with `n_anomalies` spikes of 3 datapoints, and the mask of the spiked datapoints."""
+    rng = np.random.default_rng(seed)
+    steps = np.arange(length)
+    values = np.sin(2 * np.pi * steps / 96) + 0.3 * np.sin(2 * np.pi * steps / 24) + rng.normal(0, 0.05, length)
+    labels = np.zeros(length, dtype=bool)
+    for start in rng.choice(np.arange(100, length - 100), size=n_anomalies, replace=False):
+        values[start : start + 3] += rng.choice([-1, 1]) * rng.uniform(1.5, 3)
+        labels[start : start + 3] = True
+    return values.astype(np.float32), labels
@@ -0,0 +1,30 @@
+import os
+
+os.environ.setdefault("PORT", "8000")
+os.environ.setdefault("DATABASE_USERNAME", "test_user")
+os.environ.setdefault("DATABASE_PASSWORD", "test_password")
+os.environ.setdefault("DATABASE_HOST", "localhost")
+os.environ.setdefault("DATABASE_PORT", "5432")
+os.environ.setdefault("DATABASE_NAME", "test_db")
+# Keep the tests offline by serving a fixed temperature instead of querying the weather service.
+os.environ.setdefault("FORECASTING_WEATHER_STATIC_TEMPERATURE", "10")
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from time_series.forecasting_api.helpers import get_session
+from time_series.forecasting_api.routes.forecasting import router
+
+
+@pytest.fixture
+def client(test_session):
+    """Create a FastAPI test client with a minimal app containing only the forecasting router."""
+    test_app = FastAPI()
+    test_app.include_router(router, prefix="/forecasting")
+
+    def override_get_session():
+        yield test_session
+
+    test_app.dependency_overrides[get_session] = override_get_session
+    with TestClient(test_app) as test_client:
+        yield test_client
+    test_app.dependency_overrides.clear()
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from time_series.database import UnitOfWork
+from time_series.forecasting.prediction import TIMESTEPS
+
+
+@pytest.fixture
+def windows(monkeypatch):
+    """Windows forecast by a stand-in for the model, which predicts the last reading 12 times"""
+    windows = []
+
+    def fake_predict_batch(batch, temperature=None):
+        windows.extend(batch)
+        return [[window[-1]] * 12 for window in batch]
+
+    monkeypatch.setattr("time_series.forecasting_api.routes.forecasting.predict_batch", fake_predict_batch)
+    return windows
+
+
+def create_dataset(test_session, count: int) -> int:
+    uow = UnitOfWork(test_session)
+    dataset = uow.datasets.create(name="Energy")
+    base_time = datetime(2024, 1, 1, 12, 0)
+    uow.datapoints.bulk_create(
+        [
+            {"dataset_id": dataset.id, "time": base_time + timedelta(minutes=30 * i), "value": float(i)}
+            for i in range(count)
+        ]
+    )
+    uow.commit()
+    return dataset.id  # type: ignore
+
+
+def test_forecast_from_stored_datapoints(client: TestClient, test_session, windows):
+    """Test that a forecast without user_data uses the newest TIMESTEPS stored datapoints, oldest first"""
+    dataset_id = create_dataset(test_session, TIMESTEPS + 2)
+
+    response = client.post(f"/forecasting/{dataset_id}", params={"model_name": "lstm", "city": "London"})
+
+    assert response.status_code == 201
+    assert windows == [[float(i) for i in range(2, TIMESTEPS + 2)]]
+    predictions = UnitOfWork(test_session).prediction.get_by_analysis(response.json())
+    assert [prediction.value for prediction in predictions] == [float(TIMESTEPS + 1)] * 12
+
+
+def test_forecast_from_too_few_stored_datapoints(client: TestClient, test_session, windows):
+    dataset_id = create_dataset(test_session, TIMESTEPS - 1)
+
+    response = client.post(f"/forecasting/{dataset_id}", params={"model_name": "lstm", "city": "London"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "NOT_ENOUGH_DATAPOINTS"
+    assert windows == []
+
+
+def test_forecast_prefers_user_data(client: TestClient, test_session, windows):
+    dataset_id = create_dataset(test_session, TIMESTEPS)
+
+    response = client.post(
+        f"/forecasting/{dataset_id}", params={"model_name": "lstm", "city": "London"}, json=[1.0] * TIMESTEPS
+    )
+
+    assert response.status_code == 201
+    assert windows == [[1.0] * TIMESTEPS]
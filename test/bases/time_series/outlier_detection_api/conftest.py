@@ -0,0 +1,28 @@
+import os
+
+os.environ.setdefault("PORT", "8000")
+os.environ.setdefault("DATABASE_USERNAME", "test_user")
+os.environ.setdefault("DATABASE_PASSWORD", "test_password")
+os.environ.setdefault("DATABASE_HOST", "localhost")
+os.environ.setdefault("DATABASE_PORT", "5432")
+os.environ.setdefault("DATABASE_NAME", "test_db")
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from time_series.outlier_detection_api.helpers import get_session
+from time_series.outlier_detection_api.routes.stream import router
+
+
+@pytest.fixture
+def client(test_session):
+    """Create a FastAPI test client with a minimal app containing only the stream router."""
+    test_app = FastAPI()
+    test_app.include_router(router, prefix="/stream")
+
+    def override_get_session():
+        yield test_session
+
+    test_app.dependency_overrides[get_session] = override_get_session
+    with TestClient(test_app) as test_client:
+        yield test_client
+    test_app.dependency_overrides.clear()
@@ -0,0 +1,156 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from time_series.database import UnitOfWork
+from time_series.outlier_detection import AnalysisConfig, LSTMAutoencoder
+from time_series.outlier_detection.registry import register_model
+from time_series.outlier_detection_api.routes import stream
+
+BASE_TIME = datetime(2024, 1, 1, 12, 0)
+CONFIG = AnalysisConfig(device="cpu", dataset={"sequence_length": 4})
+
+
+@pytest.fixture(autouse=True)
+def clear_scorers():
+    stream._scorers.clear()
+    yield
+    stream._scorers.clear()
+
+
+def register(uow: UnitOfWork, dataset_id: int, last_time: datetime):
+    trained_model = register_model(
+        uow,
+        dataset_id,
+        model=LSTMAutoencoder(sequence_length=4, n_features=1, internal_size=2, hidden_size=4),
+        scaler=None,
+        config=CONFIG,
+        last_time=last_time,
+        statistics={"median": 0.0, "mad": 1.0},
+    )
+    uow.commit()
+    return trained_model
+
+
+def create_analysis(uow: UnitOfWork, name: str):
+    """An lstmae analysis of a new dataset of 10 datapoints, with a registered model"""
+    dataset = uow.datasets.create(name=name)
+    uow.datapoints.bulk_create(
+        [{"dataset_id": dataset.id, "time": BASE_TIME + timedelta(minutes=i), "value": float(i)} for i in range(10)]
+    )
+    analysis = uow.analyses.create(
+        dataset_id=dataset.id, detection_method="lstmae", name=name, config=CONFIG.model_dump(mode="json")
+    )
+    register(uow, dataset.id, last_time=BASE_TIME + timedelta(minutes=9))
+    return analysis
+
+
+def datapoints(*offsets: int) -> list[dict]:
+    return [{"time": (BASE_TIME + timedelta(minutes=i)).isoformat(), "value": float(i)} for i in offsets]
+
+
+def test_score_datapoints(client: TestClient, test_session):
+    analysis = create_analysis(UnitOfWork(session=test_session), "Stream")
+
+    response = client.post(f"/stream/{analysis.id}/datapoints", json=datapoints(10, 11, 12, 13))
+
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
+
+
+def test_score_datapoints_rejects_old_datapoints(client: TestClient, test_session):
+    analysis = create_analysis(UnitOfWork(session=test_session), "Stream")
+
+    response = client.post(f"/stream/{analysis.id}/datapoints", json=datapoints(5))
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "INVALID_INPUT"
+
+
+def test_score_datapoints_without_analysis(client: TestClient):
+    response = client.post("/stream/999/datapoints", json=datapoints(10))
+
+    assert response.status_code == 404
+    assert response.json()["detail"]["code"] == "NO_STREAMING_MODEL"
+
+
+def test_score_datapoints_reloads_retrained_model(client: TestClient, test_session):
+    """Test that a scorer of an earlier model is replaced once the model is retrained"""
+    uow = UnitOfWork(session=test_session)
+    analysis = create_analysis(uow, "Stream")
+    client.post(f"/stream/{analysis.id}/datapoints", json=datapoints(10))
+    scorer = next(iter(stream._scorers.values()))
+
+    retrained = register(uow, analysis.dataset_id, last_time=BASE_TIME + timedelta(minutes=9))
+    client.post(f"/stream/{analysis.id}/datapoints", json=datapoints(11))
+
+    assert list(stream._scorers) == [(analysis.id, retrained.id)]
+    assert stream._scorers[(analysis.id, retrained.id)] is not scorer
+
+
+def test_score_datapoints_keeps_scorer_of_same_model(client: TestClient, test_session):
+    analysis = create_analysis(UnitOfWork(session=test_session), "Stream")
+    client.post(f"/stream/{analysis.id}/datapoints", json=datapoints(10))
+    scorer = next(iter(stream._scorers.values()))
+
+    client.post(f"/stream/{analysis.id}/datapoints", json=datapoints(11))
+
+    assert list(stream._scorers.values()) == [scorer]
+    assert list(scorer.values)[-1] == 11.0
+
+
+def test_score_datapoints_keeps_scorer_when_model_scores_again(client: TestClient, test_session):
+    """Test that a later analysis moving the model's last scored time keeps the stream state of its scorer"""
+    uow = UnitOfWork(session=test_session)
+    analysis = create_analysis(uow, "Stream")
+    client.post(f"/stream/{analysis.id}/datapoints", json=datapoints(10, 11))
+    (key, scorer), *_ = stream._scorers.items()
+
+    uow.trained_models.update(key[1], last_time=BASE_TIME + timedelta(minutes=11))
+    uow.commit()
+    client.post(f"/stream/{analysis.id}/datapoints", json=datapoints(12))
+
+    assert list(stream._scorers.values()) == [scorer]
+    assert len(scorer.pending) == 3
+
+
+def test_scorers_are_bounded(client: TestClient, test_session, monkeypatch):
+    """Test that the least recently used scorer is evicted beyond MAX_SCORERS"""
+    monkeypatch.setattr(stream, "MAX_SCORERS", 1)
+    uow = UnitOfWork(session=test_session)
+    first, second = create_analysis(uow, "First"), create_analysis(uow, "Second")
+
+    client.post(f"/stream/{first.id}/datapoints", json=datapoints(10))
+    client.post(f"/stream/{second.id}/datapoints", json=datapoints(10))
+
+    assert [key[0] for key in stream._scorers] == [second.id]
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def test_stream_events_sends_published_events():
+    """Test that subscribers of the SSE stream receive published events and unsubscribe on disconnect"""
+
+    async def receive():
+        request = FakeRequest()
+        response = await stream.stream_events(7, request)  # type: ignore
+        stream.publish(7, [{"dataset_id": 1, "status": "open", "start": BASE_TIME, "end": BASE_TIME}])
+        message = await response.body_iterator.__anext__()  # type: ignore
+        request.disconnected = True
+        await response.body_iterator.aclose()  # type: ignore
+        return message
+
+    message = asyncio.run(receive())
+
+    event, data = message.strip().split("\n")
+    assert event == "event: anomaly"
+    assert json.loads(data.removeprefix("data: "))["status"] == "open"
+    assert 7 not in stream._subscribers
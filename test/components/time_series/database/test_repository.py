@@ -8,7 +8,9 @@ from time_series.database import (
     AnomalyType,
     DatapointRepository,
     DatasetRepository,
+    TrainedModelRepository,
 )
+from time_series.database.models import StatusType
 
 
 @pytest.fixture(scope="function")
@@ -217,6 +219,13 @@ class TestDatapointRepository:
         for dp in datapoints:
             assert start_time <= dp.time <= end_time
 
+    def test_get_latest_datapoints(self, dataset_with_datapoints, datapoint_repo):
+        """Test retrieving the newest datapoints in chronological order"""
+        base_time = datetime(2024, 1, 1, 12, 0, 0)
+        datapoints = datapoint_repo.get_latest(dataset_with_datapoints.id, limit=3)
+
+        assert [dp.time for dp in datapoints] == [base_time + timedelta(minutes=i) for i in (7, 8, 9)]
+
     def test_delete_old_datapoints(self, dataset_with_datapoints, datapoint_repo):
         """Test deleting old datapoints"""
         before_count = len(datapoint_repo.get_by_dataset(dataset_with_datapoints.id))
@@ -850,3 +859,122 @@ class TestSMAPWorkflows:
         remaining = analysis_repo.get_by_dataset(sample_dataset.id)
         assert len(remaining) == 3
         assert set(a.id for a in remaining) == set(a.id for a in created[2:])
+
+
+class TestAnalysisJobQueue:
+    """Tests for claiming and recovering queued analyses"""
+
+    def test_claim_pending_oldest_first(self, sample_dataset, analysis_repo):
+        """Test that the oldest pending analysis of a queued method is claimed"""
+        analysis_repo.create(dataset_id=sample_dataset.id, detection_method="forecast", name="Forecast")
+        first = analysis_repo.create(
+            dataset_id=sample_dataset.id, detection_method="lstmae", name="First", config={"threshold": 3.0}
+        )
+        analysis_repo.create(dataset_id=sample_dataset.id, detection_method="lstmae", name="Second")
+
+        claimed = analysis_repo.claim_pending(["lstmae"])
+
+        assert claimed is not None
+        assert claimed.id == first.id
+        assert claimed.status == StatusType.processing
+        assert claimed.attempts == 1
+        assert claimed.heartbeat_at is not None
+        assert claimed.config == {"threshold": 3.0}
+
+    def test_claim_pending_empty_queue(self, sample_analysis, analysis_repo):
+        """Test that nothing is claimed when no analysis of the method is pending"""
+        assert analysis_repo.claim_pending(["lstmae"]) is None
+
+    def test_heartbeat_updates_processing_analyses(self, sample_dataset, analysis_repo):
+        """Test that heartbeats only touch processing analyses"""
+        analysis_repo.create(dataset_id=sample_dataset.id, detection_method="lstmae", name="Running")
+        claimed = analysis_repo.claim_pending(["lstmae"])
+        pending = analysis_repo.create(dataset_id=sample_dataset.id, detection_method="lstmae", name="Pending")
+
+        assert analysis_repo.heartbeat([claimed.id, pending.id]) == 1
+
+    def test_recover_stale_requeues_then_fails(self, sample_dataset, analysis_repo):
+        """Test that stale analyses are requeued until they run out of attempts"""
+        analysis_repo.create(dataset_id=sample_dataset.id, detection_method="lstmae", name="Stale")
+        claimed = analysis_repo.claim_pending(["lstmae"])
+        analysis_repo.update(claimed.id, heartbeat_at=datetime(2024, 1, 1))
+
+        recovered = analysis_repo.recover_stale(stale_after=timedelta(minutes=5), max_attempts=2)
+        assert [analysis.status for analysis in recovered] == [StatusType.pending]
+
+        claimed = analysis_repo.claim_pending(["lstmae"])
+        analysis_repo.update(claimed.id, heartbeat_at=datetime(2024, 1, 1))
+
+        recovered = analysis_repo.recover_stale(stale_after=timedelta(minutes=5), max_attempts=2)
+        assert [analysis.status for analysis in recovered] == [StatusType.error]
+        assert claimed.attempts == 2
+
+    def test_recover_stale_ignores_recent_heartbeats(self, sample_dataset, analysis_repo):
+        """Test that analyses with a recent heartbeat are left running"""
+        analysis_repo.create(dataset_id=sample_dataset.id, detection_method="lstmae", name="Running")
+        analysis_repo.claim_pending(["lstmae"])
+
+        assert analysis_repo.recover_stale(stale_after=timedelta(minutes=5), max_attempts=2) == []
+
+    def test_fail_requeues_until_attempts_are_used(self, sample_dataset, analysis_repo):
+        """Test that failed attempts are retried only while attempts are left"""
+        analysis_repo.create(dataset_id=sample_dataset.id, detection_method="lstmae", name="Flaky")
+        claimed = analysis_repo.claim_pending(["lstmae"])
+
+        failed = analysis_repo.fail(claimed.id, error="OperationalError: gone", max_attempts=2)
+        assert failed.status == StatusType.pending
+        assert failed.error == "OperationalError: gone"
+
+        analysis_repo.claim_pending(["lstmae"])
+        assert analysis_repo.fail(claimed.id, error="OperationalError: gone", max_attempts=2).status == StatusType.error
+
+    def test_fail_without_retry(self, sample_dataset, analysis_repo):
+        """Test that non-retryable failures are marked as failed right away"""
+        analysis_repo.create(dataset_id=sample_dataset.id, detection_method="lstmae", name="Broken")
+        claimed = analysis_repo.claim_pending(["lstmae"])
+
+        failed = analysis_repo.fail(claimed.id, error="ValueError: bad", max_attempts=3, retry=False)
+
+        assert failed.status == StatusType.error
+
+
+class TestTrainedModelRepository:
+    """Tests for the trained model registry"""
+
+    def test_get_latest_matches_method_and_config(self, sample_dataset, test_session):
+        """Test that the newest model with the same method and config hash is returned"""
+        repo = TrainedModelRepository(session=test_session)
+
+        def create(config_hash):
+            return repo.create(
+                dataset_id=sample_dataset.id,
+                detection_method="lstmae",
+                config_hash=config_hash,
+                config={},
+                state=b"weights",
+                last_time=datetime(2024, 1, 1),
+            )
+
+        create("a")
+        latest = create("a")
+        create("b")
+
+        assert repo.get_latest(sample_dataset.id, "lstmae", "a").id == latest.id
+        assert repo.get_latest(sample_dataset.id, "lstmae", "c") is None
+        assert repo.get_latest(sample_dataset.id, "iforest", "a") is None
+
+    def test_deleting_dataset_deletes_models(self, sample_dataset, dataset_repo, test_session):
+        """Test that trained models are deleted with their dataset"""
+        repo = TrainedModelRepository(session=test_session)
+        trained_model = repo.create(
+            dataset_id=sample_dataset.id,
+            detection_method="lstmae",
+            config_hash="a",
+            config={},
+            state=b"weights",
+            last_time=datetime(2024, 1, 1),
+        )
+
+        dataset_repo.delete(sample_dataset.id)
+
+        assert repo.get_by_id(trained_model.id) is None
@@ -0,0 +1,4 @@
+import os
+
+# Keep the forecasting tests offline by serving a fixed temperature instead of querying the weather service.
+os.environ.setdefault("FORECASTING_WEATHER_STATIC_TEMPERATURE", "10")
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+
+import pytest
+from time_series.forecasting import InferenceExecutor, InferenceQueueFull
+
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    yield executor
+    executor.shutdown()
+
+
+def test_run_returns_result(executor):
+    assert asyncio.run(executor.run(sum, [1, 2, 3])) == 6
+    assert executor.metrics()["completed"] == 1
+
+
+def test_run_propagates_errors(executor):
+    def fail():
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run(fail))
+    assert executor.metrics()["failed"] == 1
+
+
+def test_run_rejects_when_queue_is_full(executor):
+    release = threading.Event()
+
+    async def burst():
+        jobs = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        metrics = executor.metrics()
+        with pytest.raises(InferenceQueueFull):
+            await executor.run(release.wait)
+        release.set()
+        await asyncio.gather(*jobs)
+        return metrics
+
+    metrics = asyncio.run(burst())
+    assert metrics["running"] == 1
+    assert metrics["queue_depth"] == 1
+    assert executor.metrics()["rejected"] == 1
+    assert executor.metrics()["queue_depth"] == 0
+
+
+def test_shutdown_releases_cancelled_jobs(executor):
+    """Test that a job cancelled while queued at shutdown is counted as failed and frees its slot"""
+    release = threading.Event()
+
+    async def shutdown_with_queued_job():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        executor.shutdown()
+        release.set()
+        await running
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+
+    asyncio.run(shutdown_with_queued_job())
+    metrics = executor.metrics()
+    assert (metrics["completed"], metrics["failed"], metrics["queue_depth"]) == (1, 1, 0)
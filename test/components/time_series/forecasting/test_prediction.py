@@ -1,7 +1,9 @@
+import numpy as np
 import pytest
 
 # Import the module (so we can monkeypatch its functions)
 import time_series.forecasting as forecasting
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
 
 TEST_DATA = [
     0.143,
@@ -90,3 +92,39 @@ def test_predict_return_type():
     assert len(result) == 12
     for num in result:
         assert isinstance(num, (int, float))
+
+
+def test_predict_batch_matches_single():
+    windows = [TEST_DATA[:48], TEST_DATA[24:72]]
+    result = forecasting.predict_batch(windows, city="Aalborg")
+
+    assert len(result) == 2
+    for window, batch_prediction in zip(windows, result):
+        assert len(batch_prediction) == 12
+        assert batch_prediction == pytest.approx(forecasting.predict(window, city="Aalborg"), rel=1e-4)
+
+
+def test_predict_batch_raises_if_any_too_short():
+    with pytest.raises(ValueError):
+        forecasting.predict_batch([TEST_DATA[:48], TEST_DATA[:47]], city="Aalborg")
+
+
+def test_scaler_params_match_sklearn_scalers():
+    rng = np.random.default_rng(0)
+    values = rng.normal(3, 2, size=(100, 2))
+    scalers = {
+        "energy(kWh/hh)": MinMaxScaler().fit(values[:, :1]),
+        "temperature": StandardScaler().fit(values[:, 1:]),
+    }
+    params = forecasting.prediction.ScalerParams(scalers)
+
+    batch = rng.normal(3, 2, size=(4, 48, 2))
+    expected = np.stack(
+        [
+            scalers["energy(kWh/hh)"].transform(batch[..., 0].reshape(-1, 1)).reshape(4, 48),
+            scalers["temperature"].transform(batch[..., 1].reshape(-1, 1)).reshape(4, 48),
+        ],
+        axis=-1,
+    )
+    np.testing.assert_allclose(params.transform(batch), expected)
+    np.testing.assert_allclose(params.inverse_transform(expected), batch)
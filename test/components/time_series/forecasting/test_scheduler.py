@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from time_series.database import UnitOfWork
+from time_series.forecasting.prediction import TIMESTEPS
+from time_series.forecasting.scheduler import forecast_datasets, run_forecast_schedule
+
+
+def create_dataset(uow: UnitOfWork, name: str, count: int) -> int:
+    dataset = uow.datasets.create(name=name)
+    base_time = datetime(2024, 1, 1, 12, 0)
+    uow.datapoints.bulk_create(
+        [{"dataset_id": dataset.id, "time": base_time + timedelta(minutes=30 * i), "value": 0.1} for i in range(count)]
+    )
+    uow.commit()
+    return dataset.id  # type: ignore
+
+
+@pytest.fixture
+def scheduled(test_session, test_engine, monkeypatch):
+    """A dataset with enough datapoints and one with too few, forecast with a stand-in for the model"""
+    monkeypatch.setattr("time_series.forecasting.scheduler.get_engine", lambda: test_engine)
+    windows = []
+
+    def fake_predict_batch(batch, temperature=None):
+        windows.extend(batch)
+        return [[float(temperature)] * 12 for _ in batch]
+
+    monkeypatch.setattr("time_series.forecasting.scheduler.predict_batch", fake_predict_batch)
+    uow = UnitOfWork(test_session)
+    return create_dataset(uow, "Long", TIMESTEPS), create_dataset(uow, "Short", TIMESTEPS - 1), windows
+
+
+def test_forecast_datasets_skips_short_datasets(test_session, scheduled):
+    """Test that a dataset with too few datapoints is skipped instead of failing the whole batch"""
+    long_id, short_id, windows = scheduled
+
+    analysis_ids = asyncio.run(forecast_datasets([short_id, long_id], model_name="lstm", city="London"))
+
+    uow = UnitOfWork(test_session)
+    assert [uow.analyses.get_by_id(analysis_id).dataset_id for analysis_id in analysis_ids] == [long_id]
+    assert windows == [[0.1] * TIMESTEPS]
+    assert [prediction.value for prediction in uow.prediction.get_by_analysis(analysis_ids[0])] == [10.0] * 12
+
+
+def test_forecast_datasets_without_enough_datapoints(scheduled):
+    _long_id, short_id, windows = scheduled
+
+    assert asyncio.run(forecast_datasets([short_id], model_name="lstm", city="London")) == []
+    assert windows == []
+
+
+def test_run_forecast_schedule_forecasts_every_interval(test_session, scheduled, monkeypatch):
+    long_id, _short_id, _windows = scheduled
+    intervals = []
+
+    async def stop_after_first_run(seconds):
+        intervals.append(seconds)
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr("time_series.forecasting.scheduler.asyncio.sleep", stop_after_first_run)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(run_forecast_schedule(interval_minutes=5, dataset_ids=[long_id], model_name="lstm", city="London"))
+
+    assert intervals == [300]
+    assert len(UnitOfWork(test_session).analyses.get_by_dataset(long_id)) == 1
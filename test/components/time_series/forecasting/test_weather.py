@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from time_series.forecasting import StaticWeatherBackend, WeatherProvider
+
+
+class SlowBackend(StaticWeatherBackend):
+    async def fetch(self, city):
+        await asyncio.sleep(0.05)
+        return await super().fetch(city)
+
+
+class FailingBackend(StaticWeatherBackend):
+    async def fetch(self, city):
+        self.calls += 1
+        raise RuntimeError("service unavailable")
+
+
+@pytest.fixture
+def make_provider():
+    providers = []
+
+    def make(backend, **kwargs):
+        provider = WeatherProvider(backend=backend, **kwargs)
+        providers.append(provider)
+        return provider
+
+    yield make
+    for provider in providers:
+        provider.close()
+
+
+def test_get_temperature_is_cached_per_city(make_provider):
+    backend = StaticWeatherBackend(temperature=12.5)
+    provider = make_provider(backend)
+
+    assert provider.get_temperature("Aalborg") == 12.5
+    assert provider.get_temperature("aalborg ") == 12.5
+    assert backend.calls == 1
+
+    assert provider.get_temperature("London") == 12.5
+    assert backend.calls == 2
+
+
+def test_expired_entries_are_refetched(make_provider):
+    backend = StaticWeatherBackend(temperature=12.5)
+    provider = make_provider(backend, ttl_seconds=0)
+
+    provider.get_temperature("Aalborg")
+    provider.get_temperature("Aalborg")
+    assert backend.calls == 2
+
+
+def test_concurrent_lookups_are_coalesced(make_provider):
+    backend = SlowBackend(temperature=8)
+    provider = make_provider(backend)
+
+    async def lookup_many():
+        return await asyncio.gather(*(provider.aget_temperature("Aalborg") for _ in range(10)))
+
+    assert asyncio.run(lookup_many()) == [8] * 10
+    assert backend.calls == 1
+
+
+def test_failed_lookup_returns_none_and_is_cached(make_provider):
+    backend = FailingBackend(temperature=0)
+    provider = make_provider(backend)
+
+    assert provider.get_temperature("Aalborg") is None
+    assert provider.get_temperature("Aalborg") is None
+    assert backend.calls == 1
@@ -0,0 +1,16 @@
+from datetime import datetime, timedelta
+
+import pytest
+from time_series.database import DatapointRepository, DatasetRepository
+
+
+@pytest.fixture
+def dataset_with_datapoints(test_session):
+    """Create a dataset with 20 datapoints valued 0..19"""
+    dataset = DatasetRepository(session=test_session).create(name="Test Dataset")
+    base_time = datetime(2024, 1, 1, 12, 0, 0)
+    DatapointRepository(session=test_session).bulk_create(
+        [{"dataset_id": dataset.id, "time": base_time + timedelta(minutes=i), "value": float(i)} for i in range(20)]
+    )
+    test_session.commit()
+    yield dataset
@@ -0,0 +1,62 @@
+import pytest
+import torch
+from time_series.outlier_detection import LSTMAutoencoder
+from time_series.outlier_detection.acceleration import (
+    autocast,
+    compile_model,
+    quantize_model,
+    trace_model,
+    unwrap_model,
+)
+
+
+def test_trace_model_matches_eager():
+    model = LSTMAutoencoder(sequence_length=8, n_features=1, internal_size=4, hidden_size=8).eval()
+    example = torch.randn(4, 8, 1)
+
+    traced = trace_model(model, example)
+
+    batch = torch.randn(16, 8, 1)
+    with torch.no_grad():
+        assert torch.allclose(traced(batch), model(batch), atol=1e-6)
+
+
+def test_compile_model_falls_back_to_eager(monkeypatch):
+    def broken_compile(model):
+        def run(x):
+            raise RuntimeError("no C++ compiler")
+
+        return run
+
+    monkeypatch.setattr(torch, "compile", broken_compile)
+    model = LSTMAutoencoder(sequence_length=8, n_features=1, internal_size=4, hidden_size=8)
+
+    assert compile_model(model, torch.randn(4, 8, 1)) is model
+
+
+def test_unwrap_model_of_eager_model():
+    model = torch.nn.Linear(1, 1)
+    assert unwrap_model(model) is model
+
+
+def test_quantize_model_keeps_outputs_close():
+    model = LSTMAutoencoder(sequence_length=8, n_features=1, internal_size=4, hidden_size=8).eval()
+    batch = torch.randn(16, 8, 1)
+
+    quantized = quantize_model(model, device="cpu")
+
+    assert quantized is not model
+    with torch.no_grad():
+        assert torch.allclose(quantized(batch), model(batch), atol=0.05)
+
+
+def test_quantize_model_requires_cpu():
+    with pytest.raises(ValueError):
+        quantize_model(torch.nn.Linear(1, 1), device="cuda")
+
+
+def test_autocast_runs_model_in_bfloat16():
+    with autocast("bf16", device="cpu"):
+        assert torch.nn.Linear(2, 2)(torch.randn(1, 2)).dtype == torch.bfloat16
+    with autocast("fp32", device="cpu"):
+        assert torch.nn.Linear(2, 2)(torch.randn(1, 2)).dtype == torch.float32
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+from time_series.database import DatapointRepository
+from time_series.outlier_detection import DatapointSQLDataset, DatasetArrayCache
+
+
+def test_cache_stores_memory_mapped_entry(tmp_path, test_session, dataset_with_datapoints):
+    """Test that the first load stores the columns and later loads memory-map them"""
+    cache = DatasetArrayCache(tmp_path)
+
+    timestamps, values = cache.load(test_session, dataset_with_datapoints.id)
+    entries = list((tmp_path / str(dataset_with_datapoints.id)).iterdir())
+
+    assert len(entries) == 1
+    assert isinstance(values, np.memmap)
+    assert values.tolist() == list(range(20))
+    assert timestamps.dtype == np.dtype("datetime64[ns]")
+
+
+def test_cache_is_invalidated_by_new_datapoints(tmp_path, test_session, dataset_with_datapoints):
+    """Test that appending datapoints replaces the stale entry"""
+    cache = DatasetArrayCache(tmp_path)
+    cache.load(test_session, dataset_with_datapoints.id)
+    old_marker = cache.marker(test_session, dataset_with_datapoints.id)
+
+    DatapointRepository(session=test_session).create(dataset_with_datapoints.id, datetime(2024, 1, 2), 100.0)
+    test_session.commit()
+    _, values = cache.load(test_session, dataset_with_datapoints.id)
+    entries = [entry.name for entry in (tmp_path / str(dataset_with_datapoints.id)).iterdir()]
+
+    assert len(values) == 21
+    assert entries == [cache.marker(test_session, dataset_with_datapoints.id)]
+    assert old_marker not in entries
+
+
+def test_cache_is_invalidated_by_value_preserving_edits(tmp_path, test_session, dataset_with_datapoints):
+    """Test that swapping two values, which keeps the count, range and sum, still replaces the entry"""
+    cache = DatasetArrayCache(tmp_path)
+    cache.load(test_session, dataset_with_datapoints.id)
+    old_marker = cache.marker(test_session, dataset_with_datapoints.id)
+
+    base_time = datetime(2024, 1, 1, 12, 0, 0)
+    datapoints = DatapointRepository(session=test_session)
+    datapoints.delete_before(dataset_with_datapoints.id, base_time + timedelta(minutes=2))
+    datapoints.bulk_create(
+        [
+            {"dataset_id": dataset_with_datapoints.id, "time": base_time, "value": 1.0},
+            {"dataset_id": dataset_with_datapoints.id, "time": base_time + timedelta(minutes=1), "value": 0.0},
+        ]
+    )
+    test_session.commit()
+    _, values = cache.load(test_session, dataset_with_datapoints.id)
+
+    assert cache.marker(test_session, dataset_with_datapoints.id) != old_marker
+    assert values.tolist()[:3] == [1.0, 0.0, 2.0]
+
+
+def test_dataset_reads_through_cache(tmp_path, test_session, dataset_with_datapoints):
+    """Test that a dataset built from the cache has the same windows as one built from the database"""
+    cached = DatapointSQLDataset(
+        session=test_session,
+        dataset_id=dataset_with_datapoints.id,
+        sequence_length=5,
+        stride=1,
+        cache=DatasetArrayCache(tmp_path),
+    )
+    direct = DatapointSQLDataset(
+        session=test_session, dataset_id=dataset_with_datapoints.id, sequence_length=5, stride=1
+    )
+
+    assert np.array_equal(cached.timestamps, direct.timestamps)
+    assert cached.windows.equal(direct.windows)
@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import numpy as np
+import torch
+from time_series.outlier_detection import (
+    SlidingWindowDataset,
+    create_window_dataloader,
+    load_datapoint_columns,
+    load_datapoint_tail,
+    sliding_windows,
+)
+
+
+def test_sliding_windows_is_a_view():
+    """Test that windows share storage with the data instead of copying it"""
+    data = torch.arange(10, dtype=torch.float32)
+    windows = sliding_windows(data, window_size=4, stride=3)
+
+    assert windows.shape == (3, 4)
+    assert windows.data_ptr() == data.data_ptr()
+    assert windows[1].tolist() == [3, 4, 5, 6]
+
+
+def test_sliding_windows_keeps_feature_dimension():
+    """Test that multivariate data is windowed along time only"""
+    data = torch.arange(20, dtype=torch.float32).reshape(10, 2)
+    windows = sliding_windows(data, window_size=4, stride=1)
+
+    assert windows.shape == (7, 4, 2)
+    assert torch.equal(windows[2], data[2:6])
+
+
+def test_sliding_windows_shorter_than_window():
+    """Test that data shorter than one window yields no windows"""
+    assert len(sliding_windows(torch.arange(3), window_size=4, stride=1)) == 0
+
+
+def test_sliding_window_dataset_batch_indexing():
+    """Test that a list of indices returns the same windows as indexing one by one"""
+    dataset = SlidingWindowDataset(torch.arange(12, dtype=torch.float32), window_size=4, overlap=2)
+
+    batch = dataset[[0, 2, 4]]
+
+    assert len(dataset) == 5
+    assert torch.equal(batch, torch.stack([dataset[0], dataset[2], dataset[4]]))
+
+
+def test_create_window_dataloader_yields_whole_batches():
+    """Test that the dataloader yields every window once in batches"""
+    dataset = SlidingWindowDataset(torch.arange(12, dtype=torch.float32), window_size=4, overlap=3)
+    generator = torch.Generator().manual_seed(0)
+
+    batches = list(create_window_dataloader(dataset, batch_size=4, shuffle=True, generator=generator))
+
+    assert [len(batch) for batch in batches] == [4, 4, 1]
+    assert sorted(batch[0].item() for batch in torch.cat(batches)) == list(range(9))
+
+
+def test_load_datapoint_columns(test_session, dataset_with_datapoints):
+    """Test that time and value columns are loaded as typed arrays in time order"""
+    timestamps, values = load_datapoint_columns(test_session, dataset_with_datapoints.id)
+
+    assert timestamps.dtype == np.dtype("datetime64[ns]")
+    assert values.dtype == np.float32
+    assert timestamps[0] == np.datetime64("2024-01-01T12:00")
+    assert (np.diff(timestamps) == np.timedelta64(1, "m")).all()
+    assert values.tolist() == list(range(20))
+
+
+def test_load_datapoint_columns_empty(test_session, dataset_with_datapoints):
+    """Test that a dataset without datapoints gives empty arrays"""
+    timestamps, values = load_datapoint_columns(test_session, dataset_with_datapoints.id + 1)
+
+    assert len(timestamps) == 0
+    assert len(values) == 0
+
+
+def test_load_datapoint_tail(test_session, dataset_with_datapoints):
+    """Test that only the datapoints after a time are loaded, preceded by the overlap"""
+    timestamps, values, overlap_count = load_datapoint_tail(
+        test_session, dataset_with_datapoints.id, after=datetime(2024, 1, 1, 12, 15), overlap=3
+    )
+
+    assert overlap_count == 3
+    assert values.tolist() == list(range(13, 20))
+    assert timestamps[overlap_count] == np.datetime64("2024-01-01T12:16")
+
+
+def test_load_datapoint_tail_without_new_datapoints(test_session, dataset_with_datapoints):
+    """Test that the overlap is loaded even when nothing was appended"""
+    _timestamps, values, overlap_count = load_datapoint_tail(
+        test_session, dataset_with_datapoints.id, after=datetime(2024, 1, 1, 12, 19), overlap=2
+    )
+
+    assert overlap_count == 2
+    assert values.tolist() == [18, 19]
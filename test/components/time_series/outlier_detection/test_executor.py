@@ -0,0 +1,40 @@
+import os
+
+import torch
+from time_series.outlier_detection.executor import AnalysisExecutor, threads_per_job
+
+
+def test_threads_per_job_splits_cores():
+    assert threads_per_job(concurrency=4, cpu_count=16) == 4
+    assert threads_per_job(concurrency=3, cpu_count=16) == 5
+    assert threads_per_job(concurrency=8, cpu_count=4) == 1
+
+
+def test_jobs_run_in_separate_budgeted_processes():
+    executor = AnalysisExecutor(concurrency=2, threads=1)
+    try:
+        pids = [executor.submit(os.getpid).result(timeout=120) for _ in range(2)]
+        num_threads = executor.submit(torch.get_num_threads).result(timeout=120)
+    finally:
+        executor.shutdown()
+
+    assert os.getpid() not in pids
+    assert pids[0] != pids[1]
+    assert num_threads == 1
+
+    metrics = executor.metrics()
+    assert metrics["completed"] == 3
+    assert metrics["failed"] == 0
+    assert metrics["running"] == 0
+    assert metrics["analyses_per_hour"] > 0
+
+
+def test_failed_jobs_are_counted():
+    executor = AnalysisExecutor(concurrency=1, threads=1)
+    try:
+        future = executor.submit(int, "not a number")
+        assert isinstance(future.exception(timeout=120), ValueError)
+    finally:
+        executor.shutdown()
+
+    assert executor.metrics()["failed"] == 1
@@ -0,0 +1,48 @@
+import numpy as np
+from time_series.outlier_detection import IsolationForestConfig
+from time_series.outlier_detection.isolation_forest import feature_chunks, isolation_forest, rolling_features
+from time_series.outlier_detection.statistical import detect_outliers
+
+
+def test_rolling_features():
+    features = rolling_features(np.arange(5.0), lags=1, windows=[2])
+
+    np.testing.assert_allclose(features[:, 0], [0, 1, 2, 3, 4])
+    # The first lag repeats the first value.
+    np.testing.assert_allclose(features[:, 1], [0, 0, 1, 2, 3])
+    np.testing.assert_allclose(features[:, 2], [0, 0.5, 1.5, 2.5, 3.5])
+    np.testing.assert_allclose(features[:, 3], [0, 0.5, 0.5, 0.5, 0.5])
+
+
+def test_rolling_features_of_multivariate_series():
+    assert rolling_features(np.zeros((10, 3)), lags=2, windows=[4, 8]).shape == (10, 3 * (1 + 2 + 2 * 2))
+
+
+def test_feature_chunks_match_whole_series():
+    values = np.random.default_rng(0).normal(size=1000)
+    config = IsolationForestConfig(lags=3, windows=[5, 20], chunk_size=128)
+
+    chunked = np.concatenate([features for _start, features in feature_chunks(values, config)])
+
+    np.testing.assert_allclose(chunked, rolling_features(values, lags=3, windows=[5, 20]))
+
+
+def test_isolation_forest_flags_spikes():
+    rng = np.random.default_rng(0)
+    values = rng.normal(0, 0.1, 5000)
+    values[[1000, 4000]] += 5
+
+    mask = isolation_forest(
+        values, IsolationForestConfig(n_estimators=50, contamination=0.01, chunk_size=1000, n_jobs=1, seed=1)
+    )
+
+    assert mask[[1000, 4000]].all()
+    assert mask.mean() <= 0.011
+
+
+def test_iforest_is_a_detection_method():
+    values = np.random.default_rng(0).normal(size=2000)
+
+    mask = detect_outliers(values, IsolationForestConfig(n_estimators=10, n_jobs=1, seed=1))
+
+    assert mask.shape == values.shape
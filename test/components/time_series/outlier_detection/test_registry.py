@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+import torch
+from sklearn.preprocessing import RobustScaler
+from time_series.database import UnitOfWork
+from time_series.outlier_detection import AnalysisConfig, LSTMAutoencoder
+from time_series.outlier_detection.registry import (
+    deserialize_model,
+    load_registered_model,
+    register_model,
+    serialize_model,
+)
+
+
+def test_serialize_model_roundtrip():
+    model = LSTMAutoencoder(sequence_length=8, n_features=1, internal_size=4, hidden_size=8).eval()
+    scaler = RobustScaler().fit(np.arange(10, dtype=np.float32).reshape(-1, 1))
+
+    restored, restored_scaler = deserialize_model(serialize_model(model, scaler), device="cpu")
+
+    batch = torch.randn(2, 8, 1)
+    with torch.no_grad():
+        assert torch.equal(restored.eval()(batch), model(batch))
+    assert restored_scaler.center_ == scaler.center_
+
+
+def test_config_hash_ignores_scoring_settings():
+    config = AnalysisConfig(device="cpu", dataset={"sequence_length": 8})
+
+    assert config.model_hash() == config.model_copy(update={"threshold": 2.0, "seed": 7}).model_hash()
+    assert config.model_hash() != AnalysisConfig(device="cpu", dataset={"sequence_length": 16}).model_hash()
+
+
+def test_load_registered_model_matches_config(test_session, dataset_with_datapoints):
+    uow = UnitOfWork(session=test_session)
+    config = AnalysisConfig(device="cpu", dataset={"sequence_length": 8})
+    model = LSTMAutoencoder(sequence_length=8, n_features=1, internal_size=4, hidden_size=8)
+    trained_model = register_model(
+        uow, dataset_with_datapoints.id, model=model, scaler=None, config=config, last_time=datetime(2024, 1, 1)
+    )
+
+    registered = load_registered_model(uow, dataset_with_datapoints.id, config)
+    assert registered.id == trained_model.id
+    assert registered.scaler is None
+    assert registered.last_time == datetime(2024, 1, 1)
+
+    with pytest.raises(ValueError):
+        load_registered_model(uow, dataset_with_datapoints.id, AnalysisConfig(dataset={"sequence_length": 16}))
+
+
+def test_register_model_deletes_superseded_models(test_session, dataset_with_datapoints):
+    """Test that registering a model deletes earlier models of the same configuration only"""
+    uow = UnitOfWork(session=test_session)
+    config = AnalysisConfig(device="cpu", dataset={"sequence_length": 8})
+    other_config = AnalysisConfig(device="cpu", dataset={"sequence_length": 8}, hyperparameters={"hidden_size": 16})
+
+    def register(config):
+        model = LSTMAutoencoder(
+            sequence_length=8, n_features=1, internal_size=4, hidden_size=config.hyperparameters.hidden_size
+        )
+        return register_model(
+            uow, dataset_with_datapoints.id, model=model, scaler=None, config=config, last_time=datetime(2024, 1, 1)
+        )
+
+    first, other = register(config), register(other_config)
+    first_id, other_id = first.id, other.id
+    latest = register(config)
+
+    assert uow.trained_models.get_by_id(first_id) is None
+    assert uow.trained_models.get_by_id(other_id) is not None
+    assert load_registered_model(uow, dataset_with_datapoints.id, config).id == latest.id
@@ -0,0 +1,529 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import torch
+from time_series.database import (
+    AnalysisRepository,
+    AnomalyRepository,
+    DatapointRepository,
+    TrainedModelRepository,
+    UnitOfWork,
+)
+from time_series.database.models import StatusType
+from time_series.outlier_detection import (
+    AnalysisConfig,
+    DatapointSQLDataset,
+    GroupingConfig,
+    LSTMAutoencoder,
+    RollingZScoreConfig,
+)
+from time_series.outlier_detection.run import (
+    compare_outlier_masks,
+    continue_runs,
+    create_outlier_mask,
+    group_anomalies,
+    group_runs,
+    outlier_statistics,
+    run_lstmae_analysis,
+    run_lstmae_prediction,
+    run_statistical_analysis,
+    store_runs,
+)
+
+
+class ShiftModel(torch.nn.Module):
+    """Reconstructs every window off by one, so every error is exactly 1."""
+
+    def forward(self, x):
+        return x + 1
+
+
+@pytest.mark.parametrize("stride", [1, 3, 4])
+def test_run_lstmae_prediction_overlap_add(test_session, dataset_with_datapoints, stride):
+    """Test that overlapping window predictions are averaged per time step for any stride"""
+    config = AnalysisConfig(device="cpu", dataset={"sequence_length": 5, "stride": stride}, scoring={"batch_size": 2})
+    dp_ds = DatapointSQLDataset(
+        session=test_session, dataset_id=dataset_with_datapoints.id, sequence_length=5, stride=stride
+    )
+
+    prediction, error = run_lstmae_prediction(dp_ds, model=ShiftModel(), config=config)
+
+    covered = (len(dp_ds) - 1) * stride + 5
+    assert torch.equal(prediction[:covered], torch.arange(covered, dtype=torch.float32) + 1)
+    assert torch.equal(error[:covered], torch.ones(covered))
+    assert torch.isnan(error[covered:]).all()
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 7, 1024])
+@pytest.mark.parametrize("stride", [1, 2, 3])
+def test_run_lstmae_prediction_matches_per_window_reference(test_session, dataset_with_datapoints, batch_size, stride):
+    """Test that batched scoring gives the results of reconstructing and averaging one window at a time"""
+    model = LSTMAutoencoder(sequence_length=5, n_features=1, internal_size=4, hidden_size=8).eval()
+    dp_ds = DatapointSQLDataset(
+        session=test_session, dataset_id=dataset_with_datapoints.id, sequence_length=5, stride=stride
+    )
+    config = AnalysisConfig(
+        device="cpu", dataset={"sequence_length": 5, "stride": stride}, scoring={"batch_size": batch_size}
+    )
+
+    prediction, error = run_lstmae_prediction(dp_ds, model=model, config=config)
+
+    pred_sums, error_sums, counts = torch.zeros(20), torch.zeros(20), torch.zeros(20)
+    with torch.no_grad():
+        for index in range(len(dp_ds)):
+            window = dp_ds[index][:, 0]
+            window_prediction = model(window.reshape(1, 5, 1))[0, :, 0]
+            positions = slice(index * stride, index * stride + 5)
+            pred_sums[positions] += window_prediction
+            error_sums[positions] += torch.abs(window - window_prediction)
+            counts[positions] += 1
+    torch.testing.assert_close(prediction, pred_sums / counts, equal_nan=True)
+    torch.testing.assert_close(error, error_sums / counts, equal_nan=True)
+
+
+def test_run_lstmae_prediction_traced_matches_eager(test_session, dataset_with_datapoints):
+    """Test that scoring with a TorchScript traced model gives the eager results"""
+    dp_ds = DatapointSQLDataset(
+        session=test_session, dataset_id=dataset_with_datapoints.id, sequence_length=5, stride=1
+    )
+    model = LSTMAutoencoder(sequence_length=5, n_features=1, internal_size=4, hidden_size=8)
+
+    results = [
+        run_lstmae_prediction(
+            dp_ds, model=model, config=AnalysisConfig(device="cpu", execution=execution, scoring={"batch_size": 4})
+        )
+        for execution in ("eager", "trace")
+    ]
+
+    assert torch.allclose(results[0][1], results[1][1], atol=1e-6)
+
+
+@pytest.mark.parametrize("precision", ["bf16", "int8"])
+def test_run_lstmae_prediction_reduced_precision(test_session, dataset_with_datapoints, precision):
+    """Test that reduced precision scoring stays close to fp32 and returns float32 results"""
+    dp_ds = DatapointSQLDataset(
+        session=test_session, dataset_id=dataset_with_datapoints.id, sequence_length=5, stride=1
+    )
+    model = LSTMAutoencoder(sequence_length=5, n_features=1, internal_size=4, hidden_size=8)
+
+    _prediction, reference = run_lstmae_prediction(dp_ds, model=model, config=AnalysisConfig(device="cpu"))
+    prediction, error = run_lstmae_prediction(
+        dp_ds, model=model, config=AnalysisConfig(device="cpu", scoring={"precision": precision})
+    )
+
+    assert prediction.dtype == error.dtype == torch.float32
+    assert torch.allclose(error, reference, rtol=0.05, atol=0.05)
+
+
+def test_compare_outlier_masks():
+    reference = torch.tensor([True, True, False, False])
+    candidate = torch.tensor([True, False, True, False])
+
+    assert compare_outlier_masks(reference, candidate) == {
+        "agreement": 0.5,
+        "jaccard": 1 / 3,
+        "reference_outliers": 2,
+        "outliers": 2,
+    }
+    assert compare_outlier_masks(torch.zeros(3, dtype=torch.bool), torch.zeros(3, dtype=torch.bool))["jaccard"] == 1.0
+
+
+def test_create_outlier_mask_flags_spikes_and_ignores_nan():
+    """Test that a spike is flagged and unscored time steps are not"""
+    error = torch.full((100,), 0.1) + torch.linspace(0, 0.01, 100)
+    error[50] = 10.0
+    error[-3:] = float("nan")
+
+    mask = create_outlier_mask(error, threshold=3.5)
+
+    assert mask.nonzero().flatten().tolist() == [50]
+
+
+def test_create_outlier_mask_with_stored_statistics():
+    """Test that stored statistics set the threshold instead of those of the scored errors"""
+    reference = torch.full((100,), 0.1) + torch.linspace(0, 0.01, 100)
+    statistics = outlier_statistics(reference)
+
+    # All elevated, so relative to their own median none of them stands out.
+    error = torch.full((10,), 1.0)
+
+    assert not create_outlier_mask(error, threshold=3.5).any()
+    assert create_outlier_mask(error, threshold=3.5, statistics=statistics).all()
+
+
+def test_create_outlier_mask_in_chunks():
+    """Test that chunked thresholding flags like thresholding all errors at once"""
+    error = torch.full((1000,), 0.1) + torch.linspace(0, 0.01, 1000)
+    error[[100, 700]] = 10.0
+    error[-3:] = float("nan")
+
+    mask = create_outlier_mask(error, threshold=3.5, chunk_size=128)
+
+    assert mask.nonzero().flatten().tolist() == [100, 700]
+    assert torch.equal(mask, create_outlier_mask(error, threshold=3.5))
+
+
+def test_create_outlier_mask_with_threshold_window():
+    """Test that local thresholds follow a change in the error level"""
+    error = torch.cat([torch.full((100,), 0.01), torch.full((100,), 1.0)]) * (1 + torch.linspace(0, 0.01, 200))
+    error[[50, 150]] *= 100
+
+    # Against the whole series, the spike in the low regime is not even above the high regime.
+    assert create_outlier_mask(error, threshold=3.5).nonzero().flatten().tolist() != [50, 150]
+    assert create_outlier_mask(error, threshold=3.5, window=100).nonzero().flatten().tolist() == [50, 150]
+
+
+def score_in_two_parts(uow, analysis, mask, split, grouping):
+    """Store the runs of the mask scored up to `split` and then continued incrementally, like two analyses."""
+    timestamps = np.array([datetime(2024, 1, 1, 12, minute) for minute in range(len(mask))], dtype="datetime64[us]")
+    starts, ends = continue_runs(mask[:split], boundary=None, max_gap=grouping.max_gap)
+    boundary = store_runs(uow, analysis.id, timestamps[:split], starts, ends, boundary=None, grouping=grouping)
+    starts, ends = continue_runs(mask[split:], boundary=boundary, max_gap=grouping.max_gap)
+    boundary = store_runs(uow, analysis.id, timestamps[split:], starts, ends, boundary=boundary, grouping=grouping)
+    anomalies = uow.anomalies.get_by_analysis(analysis.id)
+    return [(a.start, a.end) for a in anomalies], boundary
+
+
+@pytest.mark.parametrize(
+    "grouping",
+    [
+        GroupingConfig(),
+        GroupingConfig(max_gap=2),
+        GroupingConfig(min_length=3),
+        GroupingConfig(max_gap=2, min_length=4),
+    ],
+)
+@pytest.mark.parametrize("split", [2, 3, 5, 6, 7])
+def test_incremental_runs_match_full_grouping(test_session, analysis, grouping, split):
+    """Test that runs continued across the boundary between two analyses are grouped like in one analysis"""
+    mask = np.array([False, False, True, False, True, True, False, False, True, True, False, False])
+    timestamps = np.array([datetime(2024, 1, 1, 12, minute) for minute in range(len(mask))], dtype="datetime64[us]")
+
+    anomalies, _boundary = score_in_two_parts(UnitOfWork(session=test_session), analysis, mask, split, grouping)
+
+    expected = group_anomalies(analysis.id, timestamps, mask, **grouping.model_dump())
+    assert anomalies == [(a["start"], a["end"]) for a in expected]
+
+
+def test_incremental_runs_extend_boundary_range_in_place(test_session, analysis):
+    """Test that a stored range continued across the boundary is extended rather than stored again"""
+    uow = UnitOfWork(session=test_session)
+    mask = np.array([True, False, False, True, True, False, False, True, False, False])
+    t = [datetime(2024, 1, 1, 12, minute) for minute in range(len(mask))]
+
+    anomalies, boundary = score_in_two_parts(uow, analysis, mask, split=6, grouping=GroupingConfig(max_gap=2))
+
+    assert anomalies == [(t[0], t[7])]
+    assert boundary == {"start": t[0].isoformat(), "length": 8, "trailing": 2, "anomaly_id": boundary["anomaly_id"]}
+    assert uow.anomalies.get_by_id(boundary["anomaly_id"]).end == t[7]
+
+
+@pytest.mark.parametrize("delete_earlier", [False, True])
+def test_incremental_runs_move_continued_range_to_later_analysis(test_session, analysis, delete_earlier):
+    """Test that a range continued across the boundary is held by the later analysis, even if it was deleted"""
+    uow = UnitOfWork(session=test_session)
+    later = uow.analyses.create(dataset_id=analysis.dataset_id, detection_method="lstmae", name="Later")
+    grouping = GroupingConfig()
+    t = [datetime(2024, 1, 1, 12, minute) for minute in range(4)]
+    timestamps = np.array(t, dtype="datetime64[us]")
+    mask = np.array([False, True, True, False])
+
+    starts, ends = continue_runs(mask[:2], boundary=None)
+    boundary = store_runs(uow, analysis.id, timestamps[:2], starts, ends, boundary=None, grouping=grouping)
+    if delete_earlier:
+        uow.analyses.delete(analysis.id)
+    starts, ends = continue_runs(mask[2:], boundary=boundary)
+    store_runs(uow, later.id, timestamps[2:], starts, ends, boundary=boundary, grouping=grouping)
+
+    assert uow.anomalies.get_by_analysis(analysis.id) == []
+    assert [(a.start, a.end) for a in uow.anomalies.get_by_analysis(later.id)] == [(t[1], t[2])]
+
+
+def test_incremental_runs_close_boundary_beyond_max_gap(test_session, analysis):
+    uow = UnitOfWork(session=test_session)
+    mask = np.array([False, True, True, False, False, False])
+
+    _anomalies, boundary = score_in_two_parts(uow, analysis, mask, split=3, grouping=GroupingConfig(max_gap=2))
+
+    assert boundary is None
+
+
+def test_group_runs():
+    mask = [True, True, False, True, False, False, False, True]
+
+    starts, ends = group_runs(mask)
+    assert list(zip(starts.tolist(), ends.tolist())) == [(0, 1), (3, 3), (7, 7)]
+
+    starts, ends = group_runs(mask, max_gap=1)
+    assert list(zip(starts.tolist(), ends.tolist())) == [(0, 3), (7, 7)]
+
+    starts, ends = group_runs(mask, max_gap=1, min_length=2)
+    assert list(zip(starts.tolist(), ends.tolist())) == [(0, 3)]
+
+    assert [len(indices) for indices in group_runs([False, False])] == [0, 0]
+
+
+def test_group_anomalies_with_irregular_sampling():
+    """Test that consecutive flagged datapoints form one range however far apart they are"""
+    timestamps = np.array(
+        ["2024-01-01T12:00", "2024-01-01T12:01", "2024-01-01T12:05", "2024-01-01T13:00"], dtype="datetime64[ns]"
+    )
+
+    anomalies = group_anomalies(1, timestamps, torch.tensor([False, True, True, False]))
+
+    assert [(a["start"], a["end"]) for a in anomalies] == [(datetime(2024, 1, 1, 12, 1), datetime(2024, 1, 1, 12, 5))]
+
+
+class FakeTrainer:
+    """Stands in for training, with an untrained model."""
+
+    def __init__(self):
+        self.model = LSTMAutoencoder(sequence_length=4, n_features=1, internal_size=2, hidden_size=4)
+
+    def summary(self):
+        return {"epochs_run": 1}
+
+
+@pytest.fixture
+def analysis(test_session, test_engine, dataset_with_datapoints, monkeypatch):
+    monkeypatch.setattr("time_series.outlier_detection.run.get_engine", lambda: test_engine)
+    analysis = AnalysisRepository(session=test_session).create(
+        dataset_id=dataset_with_datapoints.id, detection_method="lstmae", name="Test Analysis"
+    )
+    test_session.commit()
+    return analysis
+
+
+def test_run_lstmae_analysis_records_profile(test_session, analysis, monkeypatch):
+    """Test that a completed analysis stores its stage timings and peak memory"""
+    monkeypatch.setattr("time_series.outlier_detection.run.train_lstmae", lambda *args, **kwargs: FakeTrainer())
+    config = AnalysisConfig(device="cpu", dataset={"sequence_length": 4})
+
+    run_lstmae_analysis(dataset_id=analysis.dataset_id, analysis_id=analysis.id, config=config)
+
+    test_session.refresh(analysis)
+    assert analysis.status == StatusType.completed
+    assert analysis.error is None
+    assert set(analysis.metrics["timings_seconds"]) == {"load", "train", "score", "persist"}
+    assert analysis.metrics["peak_memory_mb"] > 0
+    assert analysis.metrics["training"]["epochs_run"] == 1
+
+
+def test_run_lstmae_analysis_records_failure(test_session, analysis, monkeypatch):
+    """Test that a failing analysis is marked as failed with the reason instead of staying in processing"""
+
+    def diverge(*args, **kwargs):
+        raise RuntimeError("loss diverged")
+
+    monkeypatch.setattr("time_series.outlier_detection.run.train_lstmae", diverge)
+    config = AnalysisConfig(device="cpu", dataset={"sequence_length": 4})
+
+    with pytest.raises(RuntimeError):
+        run_lstmae_analysis(dataset_id=analysis.dataset_id, analysis_id=analysis.id, config=config)
+
+    test_session.refresh(analysis)
+    assert analysis.status == StatusType.error
+    assert analysis.error == "RuntimeError: loss diverged"
+    assert set(analysis.metrics["timings_seconds"]) == {"load", "train"}
+
+
+def test_run_lstmae_analysis_with_existing_model(test_session, analysis, dataset_with_datapoints, monkeypatch):
+    """Test that an analysis in existing mode scores with the registered model instead of training"""
+    monkeypatch.setattr("time_series.outlier_detection.run.train_lstmae", lambda *args, **kwargs: FakeTrainer())
+    config = AnalysisConfig(device="cpu", dataset={"sequence_length": 4, "normalize": "zscore"})
+    run_lstmae_analysis(dataset_id=analysis.dataset_id, analysis_id=analysis.id, config=config)
+    test_session.refresh(analysis)
+
+    def fail_training(*args, **kwargs):
+        raise AssertionError("existing mode must not train")
+
+    monkeypatch.setattr("time_series.outlier_detection.run.train_lstmae", fail_training)
+    reuse = AnalysisRepository(session=test_session).create(
+        dataset_id=dataset_with_datapoints.id, detection_method="lstmae", name="Reuse"
+    )
+    test_session.commit()
+    reuse_config = config.model_copy(update={"mode": "existing", "threshold": 2.0})
+
+    run_lstmae_analysis(dataset_id=reuse.dataset_id, analysis_id=reuse.id, config=reuse_config)
+
+    test_session.refresh(reuse)
+    assert reuse.status == StatusType.completed
+    assert reuse.metrics["training"]["trained_model_id"] == analysis.metrics["training"]["trained_model_id"]
+    assert "train" not in reuse.metrics["timings_seconds"]
+
+
+def test_run_lstmae_analysis_without_existing_model(test_session, analysis):
+    """Test that existing mode fails when no model was trained with the configuration"""
+    config = AnalysisConfig(device="cpu", mode="existing", dataset={"sequence_length": 4})
+
+    with pytest.raises(ValueError):
+        run_lstmae_analysis(dataset_id=analysis.dataset_id, analysis_id=analysis.id, config=config)
+
+    test_session.refresh(analysis)
+    assert analysis.status == StatusType.error
+
+
+def test_run_lstmae_analysis_incremental(test_session, analysis, dataset_with_datapoints, monkeypatch):
+    """Test that incremental mode scores only the appended datapoints and stores only their anomalies"""
+    monkeypatch.setattr("time_series.outlier_detection.run.train_lstmae", lambda *args, **kwargs: FakeTrainer())
+    config = AnalysisConfig(device="cpu", dataset={"sequence_length": 4, "normalize": "zscore"})
+    run_lstmae_analysis(dataset_id=analysis.dataset_id, analysis_id=analysis.id, config=config)
+    test_session.refresh(analysis)
+    trained_model_id = analysis.metrics["training"]["trained_model_id"]
+    previous = [(a.start, a.end) for a in AnomalyRepository(session=test_session).get_by_analysis(analysis.id)]
+
+    base_time = datetime(2024, 1, 1, 12, 20)
+    DatapointRepository(session=test_session).bulk_create(
+        [
+            {"dataset_id": dataset_with_datapoints.id, "time": base_time + timedelta(minutes=i), "value": 20.0 + i}
+            for i in range(5)
+        ]
+    )
+    incremental = AnalysisRepository(session=test_session).create(
+        dataset_id=dataset_with_datapoints.id, detection_method="lstmae", name="Incremental"
+    )
+    test_session.commit()
+
+    run_lstmae_analysis(
+        dataset_id=incremental.dataset_id,
+        analysis_id=incremental.id,
+        config=config.model_copy(update={"mode": "incremental"}),
+    )
+
+    test_session.refresh(incremental)
+    assert incremental.status == StatusType.completed
+    assert incremental.metrics["incremental"] == {"new_datapoints": 5, "overlap_datapoints": 3, "scored": True}
+    assert "train" not in incremental.metrics["timings_seconds"]
+
+    assert incremental.previous_analysis_id == analysis.id
+
+    # Earlier ranges stay with the earlier analysis, except one reaching the boundary, which may have been
+    # extended and moved to the incremental analysis.
+    earlier = [(a.start, a.end) for a in AnomalyRepository(session=test_session).get_by_analysis(analysis.id)]
+    assert earlier in (previous, previous[:-1])
+    anomalies = AnomalyRepository(session=test_session).get_by_analysis(incremental.id)
+    continued = [a.start for a in anomalies if a.start < datetime(2024, 1, 1, 12, 20)]
+    assert continued == [start for start, _end in previous[len(earlier) :]]
+    assert all(anomaly.end <= datetime(2024, 1, 1, 12, 24) for anomaly in anomalies)
+
+    trained_model = TrainedModelRepository(session=test_session).get_by_id(trained_model_id)
+    test_session.refresh(trained_model)
+    assert trained_model.last_time == datetime(2024, 1, 1, 12, 24)
+    assert trained_model.analysis_id == incremental.id
+
+
+def test_run_lstmae_analysis_incremental_without_new_datapoints(test_session, analysis, monkeypatch):
+    """Test that incremental mode without appended datapoints stores no anomalies and links the earlier analysis"""
+    monkeypatch.setattr("time_series.outlier_detection.run.train_lstmae", lambda *args, **kwargs: FakeTrainer())
+    config = AnalysisConfig(device="cpu", dataset={"sequence_length": 4})
+    run_lstmae_analysis(dataset_id=analysis.dataset_id, analysis_id=analysis.id, config=config)
+    previous = AnomalyRepository(session=test_session).get_by_analysis(analysis.id)
+
+    incremental = AnalysisRepository(session=test_session).create(
+        dataset_id=analysis.dataset_id, detection_method="lstmae", name="Incremental"
+    )
+    test_session.commit()
+
+    run_lstmae_analysis(
+        dataset_id=incremental.dataset_id,
+        analysis_id=incremental.id,
+        config=config.model_copy(update={"mode": "incremental"}),
+    )
+
+    test_session.refresh(incremental)
+    assert incremental.metrics["incremental"] == {"new_datapoints": 0, "overlap_datapoints": 3, "scored": False}
+    assert incremental.previous_analysis_id == analysis.id
+    assert AnomalyRepository(session=test_session).get_by_analysis(incremental.id) == []
+    assert len(AnomalyRepository(session=test_session).get_by_analysis(analysis.id)) == len(previous)
+
+
+def test_run_lstmae_analysis_incremental_after_previous_analysis_deleted(
+    test_session, analysis, dataset_with_datapoints, monkeypatch
+):
+    """Test that incremental mode starts without a boundary once the analysis holding its range is deleted"""
+    monkeypatch.setattr("time_series.outlier_detection.run.train_lstmae", lambda *args, **kwargs: FakeTrainer())
+    # Every datapoint is flagged, so the full scoring leaves a range at the boundary.
+    monkeypatch.setattr(
+        "time_series.outlier_detection.run.create_outlier_mask",
+        lambda error, **kwargs: torch.ones(len(error), dtype=torch.bool),
+    )
+    config = AnalysisConfig(device="cpu", dataset={"sequence_length": 4})
+    run_lstmae_analysis(dataset_id=analysis.dataset_id, analysis_id=analysis.id, config=config)
+    test_session.refresh(analysis)
+    trained_model_id = analysis.metrics["training"]["trained_model_id"]
+
+    AnalysisRepository(session=test_session).delete(analysis.id)
+    base_time = datetime(2024, 1, 1, 12, 20)
+    DatapointRepository(session=test_session).bulk_create(
+        [
+            {"dataset_id": dataset_with_datapoints.id, "time": base_time + timedelta(minutes=i), "value": 20.0 + i}
+            for i in range(5)
+        ]
+    )
+    incremental = AnalysisRepository(session=test_session).create(
+        dataset_id=dataset_with_datapoints.id, detection_method="lstmae", name="Incremental"
+    )
+    test_session.commit()
+
+    run_lstmae_analysis(
+        dataset_id=incremental.dataset_id,
+        analysis_id=incremental.id,
+        config=config.model_copy(update={"mode": "incremental"}),
+    )
+
+    test_session.refresh(incremental)
+    assert incremental.status == StatusType.completed
+    assert incremental.previous_analysis_id is None
+    anomalies = AnomalyRepository(session=test_session).get_by_analysis(incremental.id)
+    assert [(a.start, a.end) for a in anomalies] == [(base_time, datetime(2024, 1, 1, 12, 24))]
+    trained_model = TrainedModelRepository(session=test_session).get_by_id(trained_model_id)
+    test_session.refresh(trained_model)
+    assert trained_model.boundary["anomaly_id"] == anomalies[0].id
+
+
+def test_run_lstmae_analysis_locks_registered_model(test_session, analysis, monkeypatch):
+    """Test that existing and incremental mode lock the registered model they update"""
+    monkeypatch.setattr("time_series.outlier_detection.run.train_lstmae", lambda *args, **kwargs: FakeTrainer())
+    config = AnalysisConfig(device="cpu", dataset={"sequence_length": 4})
+    run_lstmae_analysis(dataset_id=analysis.dataset_id, analysis_id=analysis.id, config=config)
+
+    locks = []
+    get_latest = TrainedModelRepository.get_latest
+
+    def record_lock(self, *args, for_update=False, **kwargs):
+        locks.append(for_update)
+        return get_latest(self, *args, for_update=for_update, **kwargs)
+
+    monkeypatch.setattr(TrainedModelRepository, "get_latest", record_lock)
+    for mode in ["existing", "incremental"]:
+        rerun = AnalysisRepository(session=test_session).create(
+            dataset_id=analysis.dataset_id, detection_method="lstmae", name=mode
+        )
+        test_session.commit()
+        run_lstmae_analysis(
+            dataset_id=rerun.dataset_id, analysis_id=rerun.id, config=config.model_copy(update={"mode": mode})
+        )
+        test_session.refresh(rerun)
+        assert rerun.status == StatusType.completed
+
+    assert locks == [True, True]
+
+
+def test_run_statistical_analysis(test_session, analysis, dataset_with_datapoints):
+    """Test that a statistical detector stores the anomalies of its outlier mask"""
+    # The datapoints rise by 1 every minute, so the datapoint after a jump stands out from the window before it.
+    DatapointRepository(session=test_session).bulk_create(
+        [{"dataset_id": dataset_with_datapoints.id, "time": datetime(2024, 1, 1, 12, 20), "value": 100.0}]
+    )
+    test_session.commit()
+
+    run_statistical_analysis(
+        dataset_id=analysis.dataset_id, analysis_id=analysis.id, config=RollingZScoreConfig(window=5, threshold=10.0)
+    )
+
+    test_session.refresh(analysis)
+    assert analysis.status == StatusType.completed
+    assert analysis.metrics["outliers"] == 1
+    anomalies = AnomalyRepository(session=test_session).get_by_analysis(analysis.id)
+    assert [(a.start, a.end) for a in anomalies] == [(datetime(2024, 1, 1, 12, 20), datetime(2024, 1, 1, 12, 20))]
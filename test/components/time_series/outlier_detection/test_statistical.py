@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from time_series.outlier_detection import EWMAConfig, HampelConfig, RollingZScoreConfig, SeasonalConfig
+from time_series.outlier_detection.statistical import (
+    STATISTICAL_DETECTORS,
+    centered_mean,
+    detect_outliers,
+    rolling_median,
+    rolling_zscore,
+)
+
+SPIKES = [500, 2000, 3500]
+
+
+@pytest.fixture
+def series():
+    """Daily seasonality of minute data with noise and three spikes"""
+    rng = np.random.default_rng(0)
+    values = np.sin(np.arange(4 * 1440) * 2 * np.pi / 1440) + rng.normal(0, 0.05, 4 * 1440)
+    values[SPIKES] += 3
+    return values
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        RollingZScoreConfig(window=30, threshold=5.0),
+        HampelConfig(window=15, threshold=5.0),
+        SeasonalConfig(period=1440, threshold=5.0),
+    ],
+)
+def test_detectors_flag_spikes(series, config):
+    mask = detect_outliers(series, config)
+
+    assert mask[SPIKES].all()
+    assert mask.mean() < 0.01
+
+
+def test_ewma_flags_level_shift():
+    """Test that the EWMA chart flags a small sustained shift that no single datapoint shows"""
+    rng = np.random.default_rng(0)
+    values = rng.normal(0, 1, 2000)
+    values[1500:] += 1.5
+
+    mask = detect_outliers(values, EWMAConfig(alpha=0.1, threshold=3.0))
+
+    assert mask[1550:].mean() > 0.9
+    assert mask[:1500].mean() < 0.05
+
+
+def test_rolling_zscore_flags_spike_in_constant_series():
+    values = np.full(100, 5.0)
+    values[80] = 6.0
+
+    assert rolling_zscore(values, window=10, threshold=3.0).nonzero()[0].tolist() == [80]
+
+
+def test_rolling_zscore_does_not_flag_constant_run_after_noise():
+    """Test that a flat stretch following varied data is not flagged, only a spike within it"""
+    values = np.concatenate([np.random.default_rng(0).normal(0, 1, 1000), np.full(200, 0.1)])
+    values[1100] = 1.1
+
+    assert rolling_zscore(values, window=10, threshold=3.0)[1010:].nonzero()[0].tolist() == [90]
+
+
+def test_rolling_zscore_shorter_than_window():
+    assert not rolling_zscore(np.arange(5.0), window=10, threshold=3.0).any()
+
+
+def test_rolling_median_matches_naive():
+    values = np.random.default_rng(0).normal(size=50)
+    padded = np.pad(values, 2, mode="reflect")
+
+    expected = [np.median(padded[i : i + 5]) for i in range(50)]
+
+    np.testing.assert_allclose(rolling_median(values, 5), expected)
+
+
+def test_centered_mean_shrinks_at_the_ends():
+    np.testing.assert_allclose(centered_mean(np.arange(5.0), 3), [0.5, 1.0, 2.0, 3.0, 3.5])
+
+
+def test_every_detection_method_has_a_detector():
+    values = np.random.default_rng(0).normal(size=100)
+    for config_type in STATISTICAL_DETECTORS.values():
+        assert detect_outliers(values, config_type()).shape == values.shape
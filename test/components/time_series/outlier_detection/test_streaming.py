@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+
+import pytest
+import torch
+from time_series.database import UnitOfWork
+from time_series.outlier_detection import AnalysisConfig, DatapointSQLDataset, LSTMAutoencoder
+from time_series.outlier_detection.registry import register_model
+from time_series.outlier_detection.run import run_lstmae_prediction
+from time_series.outlier_detection.streaming import (
+    StreamingScorer,
+    load_latest_datapoints,
+    load_streaming_scorer,
+    streaming_model_id,
+)
+
+
+class ZeroModel(torch.nn.Module):
+    """Reconstructs every window as zeros, so the error of a datapoint is its value."""
+
+    def forward(self, x):
+        return torch.zeros_like(x)
+
+
+def minutes(*offsets: int) -> list[datetime]:
+    return [datetime(2024, 1, 1, 12, 0) + timedelta(minutes=offset) for offset in offsets]
+
+
+@pytest.fixture
+def scorer():
+    # Errors of 1 have a log error of 0, the median; an error of 100 is far above the threshold.
+    scorer = StreamingScorer(
+        dataset_id=1, model=ZeroModel(), scaler=None, sequence_length=3, statistics={"median": 0.0, "mad": 0.1}
+    )
+    scorer.prime(minutes(0, 1), [1.0, 1.0])
+    return scorer
+
+
+def test_streaming_scorer_emits_anomaly_events(scorer):
+    """Test that a flagged run opens an anomaly range, extends it and closes it"""
+    t = minutes(2, 3, 4, 5, 6, 7)
+
+    events = scorer.update(t, [1.0, 100.0, 100.0, 1.0, 1.0, 1.0])
+
+    assert [(event["status"], event["start"], event["end"]) for event in events] == [
+        ("open", t[1], t[1]),
+        ("open", t[1], t[2]),
+        ("closed", t[1], t[2]),
+    ]
+    assert events[0]["value"] == 100.0
+    assert len(scorer.values) == 3
+
+
+def test_streaming_scorer_keeps_range_open_across_batches(scorer):
+    """Test that an anomaly range continues into the next micro-batch"""
+    t = minutes(2, 3, 4, 5)
+    scorer.update(t[:3], [100.0, 100.0, 1.0])
+
+    events = scorer.update(t[3:], [1.0])
+
+    assert (events[0]["start"], events[0]["end"]) == (t[0], t[1])
+
+
+def test_streaming_scorer_waits_for_every_window():
+    """Test that datapoints are only scored once the window is full and every window covering them is scored"""
+    scorer = StreamingScorer(
+        dataset_id=1, model=ZeroModel(), scaler=None, sequence_length=3, statistics={"median": 0.0, "mad": 0.1}
+    )
+
+    assert scorer.update(minutes(0, 1), [100.0, 100.0]) == []
+    assert scorer.update(minutes(2, 3), [100.0, 100.0]) == []
+    assert [(event["status"], event["start"]) for event in scorer.update(minutes(4), [100.0])] == [
+        ("open", minutes(2)[0])
+    ]
+
+
+def test_streaming_scorer_matches_batch_scoring(test_session, dataset_with_datapoints):
+    """Test that streamed datapoints get the z-scores of their errors averaged over every window, like in batches"""
+    config = AnalysisConfig(device="cpu", dataset={"sequence_length": 4})
+    model = LSTMAutoencoder(sequence_length=4, n_features=1, internal_size=2, hidden_size=4)
+    dp_ds = DatapointSQLDataset(
+        session=test_session, dataset_id=dataset_with_datapoints.id, sequence_length=4, stride=1
+    )
+    _prediction, error = run_lstmae_prediction(dp_ds, model=model, config=config)
+
+    # Flags everything, so every scored datapoint reports its score.
+    scorer = StreamingScorer(
+        dataset_id=1, model=model, scaler=None, sequence_length=4, statistics={"median": 0.0, "mad": 1.0}, threshold=-1
+    )
+    scorer.prime(minutes(0, 1, 2), [0.0, 1.0, 2.0])
+    events = scorer.update(minutes(*range(3, 20)), [float(value) for value in range(3, 20)])
+
+    # Datapoints 3 to 16 are covered by 4 windows; the last 3 wait for theirs.
+    assert [event["end"] for event in events] == minutes(*range(3, 17))
+    expected = 0.6745 * torch.log(error[3:17] + 1e-6) / (1.0 + 1e-8)
+    assert torch.allclose(torch.tensor([event["score"] for event in events]), expected, atol=1e-4)
+
+
+def test_streaming_scorer_rejects_old_datapoints(scorer):
+    with pytest.raises(ValueError):
+        scorer.update(minutes(1), [1.0])
+    with pytest.raises(ValueError):
+        scorer.update(minutes(3, 2), [1.0, 1.0])
+
+
+def test_load_latest_datapoints(test_session, dataset_with_datapoints):
+    times, values = load_latest_datapoints(test_session, dataset_with_datapoints.id, count=3)
+
+    assert values == [17.0, 18.0, 19.0]
+    assert times == minutes(17, 18, 19)
+
+
+def test_load_streaming_scorer(test_session, dataset_with_datapoints):
+    """Test that a scorer is loaded with the model of an analysis and primed with the latest datapoints"""
+    uow = UnitOfWork(session=test_session)
+    config = AnalysisConfig(device="cpu", dataset={"sequence_length": 4})
+    analysis = uow.analyses.create(
+        dataset_id=dataset_with_datapoints.id,
+        detection_method="lstmae",
+        name="Test Analysis",
+        config=config.model_dump(mode="json"),
+    )
+    trained_model = register_model(
+        uow,
+        dataset_with_datapoints.id,
+        model=LSTMAutoencoder(sequence_length=4, n_features=1, internal_size=2, hidden_size=4),
+        scaler=None,
+        config=config,
+        last_time=minutes(19)[0],
+        analysis_id=analysis.id,
+        statistics={"median": 0.0, "mad": 1.0},
+    )
+
+    scorer = load_streaming_scorer(test_session, analysis.id)
+
+    assert list(scorer.values) == [17.0, 18.0, 19.0]
+    assert scorer.model_id == trained_model.id
+    assert streaming_model_id(test_session, analysis.id) == trained_model.id
+    assert len(scorer.update(minutes(20, 21, 22, 23), [20.0, 21.0, 22.0, 23.0])) <= 1
+
+    with pytest.raises(ValueError):
+        load_streaming_scorer(test_session, analysis.id + 1)
@@ -0,0 +1,113 @@
+import pytest
+import torch
+from time_series.outlier_detection import AutoencoderTrainer, HyperparameterConfig, LSTMAutoencoder
+from torch.utils.data import DataLoader
+
+
+class ScriptedTrainer(AutoencoderTrainer):
+    """Reports the given test losses and sets the model bias to the epoch number, without training."""
+
+    def __init__(self, test_losses, **kwargs):
+        kwargs.setdefault("epochs", len(test_losses))
+        super().__init__(model=torch.nn.Linear(1, 1), device="cpu", learning_rate=1e-3, log_interval=1, **kwargs)
+        self.scripted_losses = iter(test_losses)
+
+    def train_epoch(self, dataloader):
+        with torch.no_grad():
+            self.model.bias.fill_(len(self.train_losses) + 1)
+        return 0.0
+
+    def test_epoch(self, dataloader):
+        return next(self.scripted_losses)
+
+
+def test_runs_all_epochs_without_early_stopping():
+    trainer = ScriptedTrainer([5.0, 4.0, 4.5, 4.6], restore_best=False)
+    trainer.fit(train_dataloader=[], test_dataloader=[])
+
+    assert trainer.epochs_run == 4
+    assert trainer.stop_reason is None
+    assert trainer.model.bias.item() == 4
+
+
+def test_patience_stops_and_restores_best_epoch():
+    trainer = ScriptedTrainer([5.0, 4.0, 3.0, 3.5, 3.2, 3.1, 3.05, 3.01, 2.0], patience=3)
+    trainer.fit(train_dataloader=[], test_dataloader=[])
+
+    assert trainer.epochs_run == 6
+    assert trainer.stop_reason == "patience"
+    assert trainer.best_epoch == 3
+    assert trainer.model.bias.item() == 3
+
+    summary = trainer.summary()
+    assert summary["epochs"] == 9
+    assert summary["epochs_run"] == 6
+    assert summary["time_saved_seconds"] >= 0
+
+
+def test_min_delta_ignores_tiny_improvements():
+    trainer = ScriptedTrainer([5.0, 4.99, 4.98, 4.97], patience=2, min_delta=0.1)
+    trainer.fit(train_dataloader=[], test_dataloader=[])
+
+    assert trainer.epochs_run == 3
+    assert trainer.best_epoch == 1
+
+
+def test_time_budget_stops_training():
+    trainer = ScriptedTrainer([5.0, 4.0, 3.0], time_budget=1e-9)
+    trainer.fit(train_dataloader=[], test_dataloader=[])
+
+    assert trainer.epochs_run == 1
+    assert trainer.stop_reason == "time_budget"
+
+
+@pytest.mark.parametrize("scheduler", ["onecycle", "cosine", "plateau"])
+def test_schedulers_adjust_learning_rate(scheduler):
+    model = LSTMAutoencoder(sequence_length=4, n_features=1, internal_size=2, hidden_size=4)
+    trainer = AutoencoderTrainer(
+        model, device="cpu", epochs=6, learning_rate=1e-2, log_interval=100, scheduler=scheduler
+    )
+    batches = DataLoader(torch.randn(16, 4, 1), batch_size=8)
+    # A constant test loss makes the plateau scheduler reduce the learning rate.
+    trainer.test_epoch = lambda dataloader: 1.0
+
+    trainer.fit(train_dataloader=batches, test_dataloader=batches)
+
+    assert trainer.summary()["final_learning_rate"] < 1e-2
+
+
+@pytest.mark.parametrize(
+    ("lr_scaling", "expected"), [(None, 1e-3), ("linear", 8e-3), ("sqrt", pytest.approx(1e-3 * 8**0.5))]
+)
+def test_effective_learning_rate_scales_with_batch_size(lr_scaling, expected):
+    hyperparameters = HyperparameterConfig(batch_size=256, learning_rate=1e-3, lr_scaling=lr_scaling)
+    assert hyperparameters.effective_learning_rate == expected
+
+
+def test_scaled_learning_rate_above_one_is_rejected():
+    with pytest.raises(ValueError):
+        HyperparameterConfig(batch_size=4096, learning_rate=0.05, lr_scaling="linear")
+    assert HyperparameterConfig(batch_size=4096, learning_rate=0.05, lr_scaling="sqrt").effective_learning_rate <= 1.0
+
+
+def test_progress_is_reported_every_epoch():
+    reported = []
+    trainer = ScriptedTrainer([5.0, 4.0, 4.5], on_epoch_end=reported.append, quiet=True)
+    trainer.fit(train_dataloader=[], test_dataloader=[])
+
+    assert [progress["epoch"] for progress in reported] == [1, 2, 3]
+    assert reported[-1]["epochs"] == 3
+    assert reported[-1]["test_loss"] == 4.5
+    assert reported[-1]["learning_rate"] == 1e-3
+
+
+def test_epoch_losses_are_batch_averages():
+    model = LSTMAutoencoder(sequence_length=4, n_features=1, internal_size=2, hidden_size=4)
+    trainer = AutoencoderTrainer(model, device="cpu", epochs=1, learning_rate=1e-2, log_interval=1)
+    batches = DataLoader(torch.randn(16, 4, 1), batch_size=8)
+
+    model.eval()
+    with torch.no_grad():
+        expected = sum(trainer.loss_fn(model(batch), batch).item() for batch in batches) / 2
+
+    assert trainer.test_epoch(batches) == pytest.approx(expected)
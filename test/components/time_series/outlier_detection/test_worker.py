@@ -0,0 +1,38 @@
+from concurrent.futures import CancelledError, Future
+from concurrent.futures.process import BrokenProcessPool
+
+from sqlalchemy.exc import IntegrityError, OperationalError
+from time_series.database import AnalysisRepository
+from time_series.database.models import StatusType
+from time_series.outlier_detection.worker import AnalysisWorker, is_retryable
+
+
+def test_is_retryable():
+    assert is_retryable(OperationalError("SELECT 1", {}, Exception("server closed the connection")))
+    assert is_retryable(BrokenProcessPool("killed"))
+    assert is_retryable(MemoryError())
+    assert is_retryable(CancelledError())
+
+    assert not is_retryable(IntegrityError("INSERT", {}, Exception("duplicate key")))
+    assert not is_retryable(ValueError("sequence_length too long"))
+
+
+def test_finish_requeues_cancelled_analysis(test_session, test_engine, dataset_with_datapoints, monkeypatch):
+    """Test that an analysis cancelled before it ran is requeued instead of waiting for stale recovery"""
+    monkeypatch.setattr("time_series.outlier_detection.worker.get_engine", lambda: test_engine)
+    analyses = AnalysisRepository(session=test_session)
+    analysis = analyses.create(dataset_id=dataset_with_datapoints.id, detection_method="lstmae", name="Test Analysis")
+    analyses.update(analysis.id, status=StatusType.processing, attempts=1)
+    test_session.commit()
+    future: Future = Future()
+    future.cancel()
+
+    worker = AnalysisWorker(max_attempts=3)
+    try:
+        worker._finish(analysis.id, future)
+    finally:
+        worker.executor.shutdown()
+
+    test_session.refresh(analysis)
+    assert analysis.status == StatusType.pending
+    assert analysis.error.startswith("CancelledError")
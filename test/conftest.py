@@ -0,0 +1,29 @@
+import pytest
+from sqlalchemy import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+
+@pytest.fixture(scope="function")
+def test_engine():
+    # One shared connection, so the attached schema is visible to every session and to the API's threads.
+    engine = create_engine(
+        "sqlite:///file:memdb?mode=memory&cache=shared&uri=true",
+        echo=False,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ATTACH DATABASE ':memory:' AS timeseries")
+        conn.commit()
+    SQLModel.metadata.create_all(engine)
+
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def test_session(test_engine):
+    """Create a test database session"""
+    with Session(test_engine) as session:
+        yield session
+        session.rollback()